@@ -8,15 +8,25 @@ from streamlit_echarts import st_echarts
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 
+from backend.monthly_summary import MonthlySummaryServices
+from backend.cache import user_data_cache, chart_option_cache
+from models.task_model import PlanStatusStore
+from config import CHART_MAX_POINTS, KPI_VERIFY
+
 class KpiServices:
     @staticmethod
-    def analysis_user_stats(user_task_status: pd.DataFrame):
+    def analysis_user_stats(user_task_status, verify=KPI_VERIFY):
         """
         Analyze user task statistics.
 
         Args:
-            user_task_status (pd.DataFrame): DataFrame with columns:
+            user_task_status (PlanStatusStore | pd.DataFrame): A store returns
+                its running aggregates in O(1); a DataFrame with columns
                 ["Date", "completed_task", "total_task", "completion_percentage"]
+                is scanned in full.
+            verify (bool): For a store, also run the full scan and compare;
+                on a mismatch the difference is logged, the aggregates are
+                rebuilt and the scan result is returned.
 
         Returns:
             dict: {
@@ -30,6 +40,12 @@ class KpiServices:
         """
 
 
+        if isinstance(user_task_status, PlanStatusStore):
+            stats = user_task_status.kpis.stats()
+            if verify:
+                return KpiServices.verify_user_stats(user_task_status, stats)
+            return stats
+
         if user_task_status is None:
             return {
                 "total_dates": 0,
@@ -65,12 +81,74 @@ class KpiServices:
             "incomplete_tasks_list": incomplete_tasks_list
         }
 
+    @staticmethod
+    def verify_user_stats(store, stats):
+        """
+        Cross-check running aggregates against a full scan of the store.
+
+        Returns:
+            dict: The full-scan stats.
+        """
+        if not len(store):
+            scanned = KpiServices.analysis_user_stats(None)
+        else:
+            scanned = KpiServices.analysis_user_stats(store.to_frame())
+        mismatched = {
+            key: (stats[key], scanned[key]) for key in scanned
+            if (abs(stats[key] - scanned[key]) > 0.01 if key == "avg_completion_percentage"
+                else stats[key] != scanned[key])
+        }
+        if mismatched:
+            print(f"KPI aggregates out of sync (aggregate, scan): {mismatched}")
+            store.rebuild_kpis()
+        return scanned
+
 class GraphServices:
+    @staticmethod
+    def graph_options(user_id, user_tasks_obj, filter_status,
+                      bg_color="#fff",
+                      title_color="#333",
+                      indicator_color="#4c9f70",
+                      zoom=None):
+        """
+        graph_analysis for a user's UserTasks, memoized in chart_option_cache.
+
+        Entries are keyed by the plan_status data version, the user's
+        user_data_cache generation, the filter, the theme colors and today's
+        date (for the relative filters). The generation moves whenever the
+        user's data is written (TaskSerives, PlanServies, a task_write_queue
+        flush, a monthly_summary rebuild), which the "Month" and "Year"
+        charts need: they read monthly_summary, which those writes update
+        through triggers without touching plan_status. Entries also expire
+        after USER_CACHE_TTL. The returned options are shared and must not
+        be mutated.
+        """
+        zoom = GraphServices.zoom_window(zoom)
+        key = ("chart", user_tasks_obj.plan_status_store.data_version,
+               user_data_cache.generation(user_id), filter_status,
+               bg_color, title_color, indicator_color, date.today().isoformat(), zoom)
+        option = chart_option_cache.get(user_id, key)
+        if option is None:
+            option = GraphServices.graph_analysis(user_tasks_obj.plan_status, filter_status,
+                                                  bg_color, title_color, indicator_color,
+                                                  user_id=user_id, zoom=zoom)
+            chart_option_cache.put(user_id, key, option)
+        return option
+
     @staticmethod
     def graph_analysis(user_task_status, filter_status,
                        bg_color="#fff",
                        title_color="#333",
-                       indicator_color="#4c9f70"):
+                       indicator_color="#4c9f70",
+                       user_id=None,
+                       zoom=None):
+        """
+        Build the chart options for `filter_status`.
+
+        With a user_id, the "Month" and "Year" views read the pre-aggregated
+        monthly_summary table instead of grouping the whole plan history.
+        `zoom` is the "All Time" dataZoom window, (start %, end %).
+        """
         if user_task_status is None:
             return GraphServices.make_graph([], [], "No Dates Available",
                                             bg_color, title_color, indicator_color)
@@ -82,87 +160,241 @@ class GraphServices:
             return GraphServices.last_month(user_task_status,
                                             bg_color, title_color, indicator_color)
         elif "Month" in filter_status:
+            if user_id is not None:
+                try:
+                    return GraphServices.summary_month(user_id,
+                                                       bg_color, title_color, indicator_color)
+                except Exception as e:
+                    print(f"Error reading monthly summary: {e}")
             return GraphServices.month(user_task_status,
                                        bg_color, title_color, indicator_color)
         elif "Year" in filter_status:
+            if user_id is not None:
+                try:
+                    return GraphServices.summary_year(user_id,
+                                                      bg_color, title_color, indicator_color)
+                except Exception as e:
+                    print(f"Error reading monthly summary: {e}")
             return GraphServices.year(user_task_status,
                                       bg_color, title_color, indicator_color)
         elif "All Time" in filter_status:
             return GraphServices.all_time(user_task_status,
-                                          bg_color, title_color, indicator_color)
+                                          bg_color, title_color, indicator_color,
+                                          zoom=zoom)
         else:
             return GraphServices.make_graph([], [], "No Dates Available",
                                             bg_color, title_color, indicator_color)
 
+    @staticmethod
+    def _dates(df):
+        """Date column as datetime64[D] values, without touching `df`."""
+        return df["Date"].to_numpy(dtype="datetime64[D]")
+
+    @staticmethod
+    def _rollup(df, unit):
+        """
+        Completion % per calendar `unit` ("M" or "Y") from one groupby-sum.
+
+        Returns:
+            tuple: (labels, percentages) in calendar order.
+        """
+        periods = GraphServices._dates(df).astype(f"datetime64[{unit}]")
+        sums = df[["completed_task", "total_task"]].groupby(periods).sum()
+        completed = sums["completed_task"].to_numpy(dtype=np.float64)
+        total = sums["total_task"].to_numpy(dtype=np.float64)
+        percentage = np.divide(completed, total, out=np.zeros_like(completed), where=total > 0) * 100
+        labels = np.datetime_as_string(sums.index.to_numpy(dtype=f"datetime64[{unit}]"), unit=unit)
+        return labels.tolist(), percentage.tolist()
+
+    @staticmethod
+    def _month_days(df, month):
+        dates = GraphServices._dates(df)
+        mask = dates.astype("datetime64[M]") == month
+        return (np.datetime_as_string(dates[mask], unit="D").tolist(),
+                df["completion_percentage"].to_numpy()[mask].tolist())
+
     @staticmethod
     def current_month(df, bg_color, title_color, indicator_color):
-        df["Date"] = pd.to_datetime(df["Date"])
-        now = datetime.now()
-        filtered = df[(df["Date"].dt.month == now.month) & (df["Date"].dt.year == now.year)]
+        x_data, y_data = GraphServices._month_days(df, np.datetime64(datetime.now(), "M"))
         return GraphServices.make_graph(
-            filtered["Date"].dt.strftime("%Y-%m-%d").tolist(),
-            filtered["completion_percentage"].tolist(),
+            x_data,
+            y_data,
             "Completion % - Current Month",
             bg_color, title_color, indicator_color
         )
 
     @staticmethod
     def last_month(df, bg_color, title_color, indicator_color):
-        df["Date"] = pd.to_datetime(df["Date"])
         if df.empty:
             return GraphServices.make_graph([], [], "No Dates Available",
                                             bg_color, title_color, indicator_color)
-        last_date = df["Date"].max()
-        prev_month = last_date.month - 1 if last_date.month > 1 else 12
-        prev_year = last_date.year if last_date.month > 1 else last_date.year - 1
-        filtered = df[(df["Date"].dt.month == prev_month) & (df["Date"].dt.year == prev_year)]
+        prev_month = GraphServices._dates(df).max().astype("datetime64[M]") - 1
+        x_data, y_data = GraphServices._month_days(df, prev_month)
         return GraphServices.make_graph(
-            filtered["Date"].dt.strftime("%Y-%m-%d").tolist(),
-            filtered["completion_percentage"].tolist(),
+            x_data,
+            y_data,
             "Completion % - Last Month",
             bg_color, title_color, indicator_color
         )
 
     @staticmethod
     def month(df, bg_color, title_color, indicator_color):
-        df["Date"] = pd.to_datetime(df["Date"])
-        df["Month"] = df["Date"].dt.strftime("%Y-%m")
-        grouped = df.groupby("Month").apply(
-            lambda x: (x["completed_task"].sum() / x["total_task"].sum()) * 100
-            if x["total_task"].sum() > 0 else 0
-        )
+        x_data, y_data = GraphServices._rollup(df, "M")
         return GraphServices.make_graph(
-            grouped.index.tolist(),
-            grouped.tolist(),
+            x_data,
+            y_data,
             "Completion % - Month Wise",
             bg_color, title_color, indicator_color
         )
 
     @staticmethod
     def year(df, bg_color, title_color, indicator_color):
-        df["Date"] = pd.to_datetime(df["Date"])
-        df["Year"] = df["Date"].dt.year
-        grouped = df.groupby("Year").apply(
-            lambda x: (x["completed_task"].sum() / x["total_task"].sum()) * 100
-            if x["total_task"].sum() > 0 else 0
-        )
+        x_data, y_data = GraphServices._rollup(df, "Y")
         return GraphServices.make_graph(
-            grouped.index.astype(str).tolist(),
-            grouped.tolist(),
+            x_data,
+            y_data,
             "Completion % - Year Wise",
             bg_color, title_color, indicator_color
         )
 
     @staticmethod
-    def all_time(df, bg_color, title_color, indicator_color):
-        df["Date"] = pd.to_datetime(df["Date"])
+    def summary_month(user_id, bg_color, title_color, indicator_color):
+        months = MonthlySummaryServices.get_months(user_id)
         return GraphServices.make_graph(
-            df["Date"].dt.strftime("%Y-%m-%d").tolist(),
-            df["completion_percentage"].tolist(),
-            "Completion % - All Time",
+            [m["year_month"] for m in months],
+            [MonthlySummaryServices.completion_percentage(m) for m in months],
+            "Completion % - Month Wise",
+            bg_color, title_color, indicator_color
+        )
+
+    @staticmethod
+    def summary_year(user_id, bg_color, title_color, indicator_color):
+        years = MonthlySummaryServices.get_years(user_id)
+        return GraphServices.make_graph(
+            [y["year"] for y in years],
+            [MonthlySummaryServices.completion_percentage(y) for y in years],
+            "Completion % - Year Wise",
             bg_color, title_color, indicator_color
         )
 
+    @staticmethod
+    def zoom_window(zoom):
+        """
+        Normalize a dataZoom window to (start %, end %), rounded so nearby
+        windows share cache entries, or None for the full range.
+        """
+        try:
+            start, end = (min(max(float(v), 0.0), 100.0) for v in zoom)
+        except (TypeError, ValueError):
+            return None
+        if start >= end or (start == 0.0 and end == 100.0):
+            return None
+        return (round(start, 1), round(end, 1))
+
+    @staticmethod
+    def lttb(x, y, threshold):
+        """
+        Largest-Triangle-Three-Buckets downsampling.
+
+        Keeps the first and last points and, from each of threshold - 2
+        equal-width buckets in between, the point forming the largest
+        triangle with the previously kept point and the next bucket's mean,
+        so peaks and dips survive.
+
+        Args:
+            x (np.ndarray): Ascending x values.
+            y (np.ndarray): y values.
+            threshold (int): Number of points to keep.
+
+        Returns:
+            np.ndarray: Ascending indices of the kept points.
+        """
+        n = len(x)
+        if threshold >= n or threshold < 3:
+            return np.arange(n)
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        # bucket i covers [starts[i], starts[i + 1]); the last point is its own bucket
+        starts = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+        counts = np.diff(np.append(starts, n))
+        mean_x = np.add.reduceat(x, starts) / counts
+        mean_y = np.add.reduceat(y, starts) / counts
+
+        kept = np.empty(threshold, dtype=np.int64)
+        kept[0], kept[-1] = 0, n - 1
+        a = 0
+        for i in range(threshold - 2):
+            lo, hi = starts[i], starts[i + 1]
+            area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a])
+                          - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+            a = lo + int(np.argmax(area))
+            kept[i + 1] = a
+        return kept
+
+    @staticmethod
+    def all_time(df, bg_color, title_color, indicator_color,
+                 zoom=None, max_points=CHART_MAX_POINTS):
+        """
+        Daily completion % on a time axis with dataZoom.
+
+        The full history is downsampled to `max_points` with LTTB. When the
+        user has zoomed in, the dates inside the window are added at full
+        resolution (downsampled again only if they exceed `max_points`).
+        """
+        dates = GraphServices._dates(df)
+        order = np.argsort(dates, kind="stable")
+        dates = dates[order]
+        values = df["completion_percentage"].to_numpy(dtype=np.float64)[order]
+        days = dates.astype(np.int64)
+
+        kept = GraphServices.lttb(days, values, max_points)
+        zoom = GraphServices.zoom_window(zoom)
+        if zoom is not None and len(days):
+            span = days[-1] - days[0]
+            lo = days[0] + span * zoom[0] / 100
+            hi = days[0] + span * zoom[1] / 100
+            window = np.flatnonzero((days >= np.floor(lo)) & (days <= np.ceil(hi)))
+            if len(window) > max_points:
+                window = window[GraphServices.lttb(days[window], values[window], max_points)]
+            kept = np.union1d(kept, window)
+
+        return GraphServices.make_time_graph(
+            np.datetime_as_string(dates[kept], unit="D").tolist(),
+            values[kept].tolist(),
+            "Completion % - All Time",
+            bg_color, title_color, indicator_color,
+            zoom=zoom
+        )
+
+    @staticmethod
+    def make_time_graph(x_data, y_data, title,
+                        bg_color, title_color, indicator_color,
+                        zoom=None):
+        """
+        make_graph on a time axis, with a zoom slider; `zoom` is the initial
+        (start %, end %) window.
+        """
+        option = GraphServices.make_graph(x_data, y_data, title,
+                                          bg_color, title_color, indicator_color)
+        if not option["series"]:
+            return option
+
+        start, end = zoom if zoom is not None else (0, 100)
+        option["xAxis"] = {
+            "type": "time",
+            "axisLine": {"lineStyle": {"color": title_color}}
+        }
+        option["series"][0]["data"] = [list(point) for point in zip(x_data, y_data)]
+        option["series"][0]["showSymbol"] = False
+        option["dataZoom"] = [
+            {"type": "inside", "start": start, "end": end, "throttle": 300},
+            {"type": "slider", "start": start, "end": end, "throttle": 300,
+             "textStyle": {"color": title_color}},
+        ]
+        option["grid"] = {"bottom": 70}
+        return option
+
     @staticmethod
     def make_graph(x_data, y_data, title,
                    bg_color, title_color, indicator_color):
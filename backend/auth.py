@@ -5,7 +5,8 @@ import pymysql
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 
-from backend.database import SqlConnection
+from backend.database import SqlConnection, SchemaRegistry
+from backend.utils import IdAllocator
 
 class ValidateUser:
     @staticmethod
@@ -156,12 +157,8 @@ class VerifyUser:
             if not connect.connect():
                 raise ConnectionError("Failed to connect to database")
             
-            # Verify that the users table exists in the database
-            table_check_sql = "SHOW TABLES LIKE 'users'"
-            with connect.connection.cursor() as cursor:
-                cursor.execute(table_check_sql)
-                if not cursor.fetchone():
-                    raise RuntimeError("Users table not found in database")
+            # Verify that the users table exists in the database (cached)
+            SchemaRegistry.require_table(connect, "users")
             
             
             fetch_sql = "SELECT password FROM users WHERE email = %s"
@@ -208,6 +205,71 @@ class VerifyUser:
                 # Ignore disconnection errors during cleanup
                 pass
 
+    @staticmethod
+    def authenticate(email, password):
+        """
+        Validate credentials and fetch the user row in a single query
+
+        Replaces the if_user_exists → verify_user → user_deserialization
+        sequence used at sign-in with one connection and one round trip.
+
+        Args:
+            email (str): User's email address
+            password (str): Plain-text password entered by the user
+
+        Returns:
+            dict: User data dictionary {user_id, name, email, password, theme}
+
+        Raises:
+            ValueError: If email or password is missing or too long
+            ConnectionError: If the database is unreachable
+            LookupError: If no user exists with the provided email
+            PermissionError: If the password does not match
+        """
+        if not email or not password:
+            raise ValueError("Email and password are required")
+
+        email = str(email).strip()
+        password = str(password).strip()
+
+        if not email or not password:
+            raise ValueError("Email and password cannot be empty")
+
+        # Validate email length against database schema constraint (VARCHAR(100))
+        if len(email) > 100:
+            raise ValueError("Email exceeds maximum allowed length")
+
+        connect = SqlConnection()
+        try:
+            if not connect.connect():
+                raise ConnectionError("Failed to connect to database")
+
+            fetch_sql = "SELECT user_id, username, email, password, theme FROM users WHERE email = %s"
+            with connect.connection.cursor() as cursor:
+                cursor.execute(fetch_sql, (email,))
+                result = cursor.fetchone()
+
+            if not result:
+                raise LookupError("No user found with the provided email")
+
+            if result['password'] != UserServies.encrypt_password(email, password):
+                raise PermissionError("Invalid password - authentication failed")
+
+            return {
+                'user_id': result['user_id'],
+                'name': result['username'],
+                'email': result['email'],
+                'password': result['password'],
+                'theme': result['theme']
+            }
+
+        except pymysql.Error as e:
+            print(f"Error authenticating user: {e}")
+            raise ConnectionError("Database error during authentication") from e
+
+        finally:
+            connect.disconnect()
+
 
 class UserServies:
 
@@ -223,45 +285,38 @@ class UserServies:
             return "u"+str(uid)
     
     @staticmethod
-    def generate_user_id():
+    def generate_user_id(cursor=None):
         """
-        Generate a new user ID by checking the database for existing users
+        Generate a new user ID from the "user" id sequence
         
+        Args:
+            cursor (optional): Cursor of an open transaction. The ID is then
+                reserved inside that transaction and released again if it
+                rolls back. Without a cursor a pooled connection is used and
+                the reservation is committed immediately.
+
         Returns:
-            int: Next available user ID
+            str: Next available user ID (e.g. "u0001")
             
         Raises:
             Exception: If database connection fails or other database errors occur
         """
+        if cursor is not None:
+            return UserServies.create_ids(IdAllocator.reserve(cursor, "user"))
+
         connect = SqlConnection()
         
         try:
             if not connect.connect():
                 raise Exception("Failed to connect to database")
             
-            # Check if users table exists
-            table_check_sql = "SHOW TABLES LIKE 'users'"
-            with connect.connection.cursor() as cursor:
-                cursor.execute(table_check_sql)
-                table_exists = cursor.fetchone()
-                
-                if not table_exists:
-                    raise Exception("Users table does not exist in database")
+            # Check if users table exists (cached)
+            SchemaRegistry.require_table(connect, "users")
             
-            # Get the count of existing users
-            count_sql = "SELECT COUNT(*) as count FROM users"
             with connect.connection.cursor() as cursor:
-                cursor.execute(count_sql)
-                result = cursor.fetchone()
-                
-                if result:
-                    user_count = result['count']
-                    user_count += 1
-                    uid = user_count
-                else:
-                    uid = 1
-                    
-            return UserServies.create_ids(uid)
+                user_id = UserServies.create_ids(IdAllocator.reserve(cursor, "user"))
+            connect.connection.commit()
+            return user_id
             
         except Exception as e:
             print(f"Error generating user ID: {e}")
@@ -288,7 +343,8 @@ class UserServies:
         
         Args:
             user_obj (User): User class instance with populated data:
-                            - user_id: generated user ID
+                            - user_id: generated user ID, or None to
+                              allocate one in the same transaction as the INSERT
                             - name: user's name
                             - email: user's email
                             - password: user's hashed password
@@ -309,7 +365,7 @@ class UserServies:
                 raise ValueError("user_obj must be a User class instance with required attributes")
             
             # Validate required fields are not None or empty
-            if not user_obj.user_id or not str(user_obj.user_id).strip():
+            if user_obj.user_id is not None and not str(user_obj.user_id).strip():
                 raise ValueError("User ID cannot be empty")
             
             if not user_obj.name or not str(user_obj.name).strip():
@@ -327,7 +383,7 @@ class UserServies:
             
                         
             # Validate field lengths according to database schema
-            if len(str(user_obj.user_id)) > 10:
+            if user_obj.user_id is not None and len(str(user_obj.user_id)) > 10:
                 raise ValueError("User ID cannot exceed 10 characters")
             
             if len(user_obj.name) > 50:
@@ -336,21 +392,27 @@ class UserServies:
             if len(user_obj.email) > 100:
                 raise ValueError("Email cannot exceed 100 characters")
             
-            # Prepare SQL and data tuple outside cursor block
+            # Prepare SQL outside cursor block
             insert_sql = """
             INSERT INTO users (user_id, username, email, password) 
             VALUES (%s, %s, %s, %s)
             """
             
-            user_tuple = (
-                user_obj.user_id,
-                user_obj.name,
-                user_obj.email,
-                user_obj.password
-            )
-            
             # Insert user into database
             with connect.connection.cursor() as cursor:
+                # Reserve the id in the INSERT's transaction so concurrent
+                # signups never share one and a failed INSERT gives it back
+                user_id = user_obj.user_id
+                if user_id is None:
+                    user_id = UserServies.generate_user_id(cursor)
+
+                user_tuple = (
+                    user_id,
+                    user_obj.name,
+                    user_obj.email,
+                    user_obj.password
+                )
+
                 affected_rows = cursor.execute(insert_sql, user_tuple)
                 
                 if affected_rows == 0:
@@ -359,7 +421,8 @@ class UserServies:
                 # Commit the transaction
                 connect.connection.commit()
                 
-                # Update user_exist flag to True after successful insertion
+                # Update user_id and user_exist flag after successful insertion
+                user_obj.user_id = user_id
                 user_obj.user_exist = True
                 
                 
@@ -417,12 +480,8 @@ class UserServies:
             if not connect.connect():
                 raise ConnectionError("Failed to connect to database")
             
-            # Verify that the users table exists in the database
-            table_check_sql = "SHOW TABLES LIKE 'users'"
-            with connect.connection.cursor() as cursor:
-                cursor.execute(table_check_sql)
-                if not cursor.fetchone():
-                    raise RuntimeError("Users table not found in database")
+            # Verify that the users table exists in the database (cached)
+            SchemaRegistry.require_table(connect, "users")
             
             # Fetch user data from database based on email
             fetch_sql = "SELECT user_id, username, email, password FROM users WHERE email = %s"
@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from config import USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL, CHART_CACHE_MAX_ENTRIES
+
+
+class UserDataCache:
+    """
+    Process-wide LRU cache of per-user query results shared by every
+    Streamlit session, so two tabs of the same user hit MySQL once.
+
+    Entries are keyed by (user_id, key), expire after `ttl` seconds and the
+    least recently used entry is evicted past `max_entries`. Writers call
+    invalidate(user_id) after changing a user's data. Other app processes do
+    not see that invalidation, so `ttl` bounds how stale a read can be.
+    Cached values are shared between sessions and must not be mutated.
+    Caches registered with add_dependent() are invalidated along with this
+    one, for values derived from the cached data.
+
+    Every invalidation also bumps the user's generation(). A reader that
+    puts the generation it saw before querying into its key cannot have a
+    result read just before a write served after that write's
+    invalidation: the entry lands under the old generation.
+    """
+
+    def __init__(self, max_entries=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # {(user_id, key): (stored_at, value)}
+        self._dependents = []
+        self._generation = 0      # bumped by invalidate() of the whole cache
+        self._generations = {}    # {user_id: bumped by invalidate(user_id)}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, user_id, key):
+        """
+        Returns:
+            The cached value, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[(user_id, key)]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, user_id, key, value):
+        with self._lock:
+            self._entries[(user_id, key)] = (time.monotonic(), value)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def generation(self, user_id):
+        """
+        Returns:
+            tuple: Changes whenever `user_id`'s entries are invalidated.
+        """
+        with self._lock:
+            return (self._generation, self._generations.get(user_id, 0))
+
+    def add_dependent(self, cache):
+        """Invalidate `cache` whenever this cache is invalidated."""
+        with self._lock:
+            self._dependents.append(cache)
+
+    def invalidate(self, user_id=None):
+        """Drop every entry of `user_id`, or the whole cache."""
+        with self._lock:
+            if user_id is None:
+                dropped = list(self._entries)
+                self._generation += 1
+            else:
+                dropped = [k for k in self._entries if k[0] == user_id]
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for k in dropped:
+                del self._entries[k]
+            self._stats["invalidations"] += len(dropped)
+            dependents = list(self._dependents)
+        for cache in dependents:
+            cache.invalidate(user_id)
+
+    def stats(self):
+        """
+        Returns:
+            dict: {"entries", "max_entries", "hits", "misses", "evictions",
+                   "expirations", "invalidations"}
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+user_data_cache = UserDataCache()
+
+# ECharts options built by GraphServices.graph_options
+chart_option_cache = UserDataCache(max_entries=CHART_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL)
+user_data_cache.add_dependent(chart_option_cache)
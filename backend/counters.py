@@ -0,0 +1,266 @@
+"""
+daily_plan counter maintenance. Run as a module to reconcile every plan's
+total_task / completed_task with the tasks table:
+
+    python -m backend.counters --batch-size 1000 [--dry-run]
+"""
+import os
+import sys
+import time
+import argparse
+from contextlib import contextmanager
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection, mark_session_state, clear_session_state
+from config import RECONCILE_BATCH_SIZE
+
+
+class CounterServices:
+    """
+    Bulk maintenance of the daily_plan.total_task / completed_task counters.
+
+    The task triggers keep the counters up to date one row at a time. Inside
+    bulk_writes() the triggers skip that work (they check the session
+    variable @disable_counter_triggers) and the affected plans are recomputed
+    once, from one grouped aggregate over tasks, before the caller commits.
+    """
+
+    # counts per plan; {filter} restricts the plans scanned
+    AGGREGATE_SQL = """
+        SELECT plan_id,
+               COUNT(*) AS total_task,
+               COALESCE(SUM(status = 'Completed'), 0) AS completed_task
+        FROM tasks
+        {filter}
+        GROUP BY plan_id
+    """
+
+    @staticmethod
+    def _placeholders(values):
+        return ", ".join(["%s"] * len(values))
+
+    @staticmethod
+    @contextmanager
+    def bulk_writes(cursor, plan_ids):
+        """
+        Run task INSERT/UPDATE/DELETEs without per-row counter updates.
+
+        Args:
+            cursor: Cursor of the caller's open transaction.
+            plan_ids (iterable[str]): Plans whose tasks the block writes;
+                more may be added to the yielded set inside the block.
+
+        Yields:
+            set[str]: The plan_ids recomputed when the block exits.
+
+        The counters are recomputed only if the block completes. The session
+        variable is cleared on the way out; if that fails the connection
+        stays flagged and the pool resets (or closes) it on release, so the
+        triggers are never left off for the connection's next borrower.
+        """
+        affected = set(plan_ids)
+        mark_session_state(cursor.connection)
+        cursor.execute("SET @disable_counter_triggers = 1")
+        try:
+            yield affected
+            CounterServices.recompute(cursor, affected)
+        finally:
+            cursor.execute("SET @disable_counter_triggers = NULL")
+            clear_session_state(cursor.connection)
+
+    @staticmethod
+    def recompute(cursor, plan_ids):
+        """
+        Set the counters of `plan_ids` from the tasks table in one UPDATE.
+
+        Args:
+            cursor: Cursor of the caller's open transaction.
+            plan_ids (iterable[str]): Plans to recompute.
+
+        Returns:
+            int: Number of plan rows whose counters changed.
+        """
+        plan_ids = list(plan_ids)
+        if not plan_ids:
+            return 0
+
+        marks = CounterServices._placeholders(plan_ids)
+        aggregate = CounterServices.AGGREGATE_SQL.format(filter=f"WHERE plan_id IN ({marks})")
+        cursor.execute(
+            f"""
+            UPDATE daily_plan d
+            LEFT JOIN ({aggregate}) t ON t.plan_id = d.plan_id
+            SET d.total_task = COALESCE(t.total_task, 0),
+                d.completed_task = COALESCE(t.completed_task, 0)
+            WHERE d.plan_id IN ({marks})
+            """,
+            (*plan_ids, *plan_ids)
+        )
+        return cursor.rowcount
+
+    @staticmethod
+    def check(user_id=None, plan_ids=None, cursor=None):
+        """
+        Compare stored counters with the tasks table.
+
+        Args:
+            user_id (str, optional): Only check this user's plans.
+            plan_ids (iterable[str], optional): Only check these plans.
+            cursor (optional): Cursor to run on; a pooled connection is used
+                when omitted.
+
+        Returns:
+            list[dict]: One row per inconsistent plan: plan_id, total_task,
+            completed_task, expected_total, expected_completed.
+
+        Raises:
+            Exception: If database errors occur.
+        """
+        if cursor is None:
+            with SqlConnection() as connect:
+                with connect.connection.cursor() as own_cursor:
+                    return CounterServices.check(user_id, plan_ids, own_cursor)
+
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("d.user_id = %s")
+            params.append(user_id)
+        if plan_ids is not None:
+            plan_ids = list(plan_ids)
+            if not plan_ids:
+                return []
+            conditions.append(f"d.plan_id IN ({CounterServices._placeholders(plan_ids)})")
+            params.extend(plan_ids)
+        where = " AND ".join(conditions) or "1 = 1"
+        aggregate_filter = f"WHERE plan_id IN (SELECT d.plan_id FROM daily_plan d WHERE {where})" if conditions else ""
+
+        cursor.execute(
+            f"""
+            SELECT d.plan_id, d.total_task, d.completed_task,
+                   COALESCE(t.total_task, 0) AS expected_total,
+                   COALESCE(t.completed_task, 0) AS expected_completed
+            FROM daily_plan d
+            LEFT JOIN ({CounterServices.AGGREGATE_SQL.format(filter=aggregate_filter)}) t ON t.plan_id = d.plan_id
+            WHERE {where}
+              AND (d.total_task <> COALESCE(t.total_task, 0)
+                   OR d.completed_task <> COALESCE(t.completed_task, 0))
+            ORDER BY d.plan_id
+            """,
+            (*params, *params)
+        )
+        return [
+            {
+                "plan_id": row["plan_id"],
+                "total_task": int(row["total_task"]),
+                "completed_task": int(row["completed_task"]),
+                "expected_total": int(row["expected_total"]),
+                "expected_completed": int(row["expected_completed"]),
+            }
+            for row in cursor.fetchall()
+        ]
+
+    @staticmethod
+    def reconcile(batch_size=RECONCILE_BATCH_SIZE, dry_run=False, on_batch=None):
+        """
+        Scan every plan and fix counters that drifted from the tasks table.
+
+        Plans are read in plan_id order, `batch_size` at a time (keyset
+        pagination, so each page is an index range scan), their true counts
+        come from one GROUP BY per batch, and drifted plans are recomputed
+        and committed batch by batch.
+
+        Args:
+            batch_size (int): Plans per batch.
+            dry_run (bool): Report mismatches without fixing them.
+            on_batch (callable, optional): Called with the running report
+                after every batch.
+
+        Returns:
+            dict: {"plans", "batches", "mismatches", "corrected", "seconds",
+                   "plans_per_second"}
+
+        Raises:
+            ValueError: If batch_size is not positive.
+            Exception: If database errors occur.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        report = {"plans": 0, "batches": 0, "mismatches": 0, "corrected": 0}
+        started = time.perf_counter()
+        last_plan_id = ""
+
+        with SqlConnection() as connect:
+            with connect.connection.cursor() as cursor:
+                while True:
+                    cursor.execute(
+                        """
+                        SELECT plan_id, total_task, completed_task
+                        FROM daily_plan
+                        WHERE plan_id > %s
+                        ORDER BY plan_id
+                        LIMIT %s
+                        """,
+                        (last_plan_id, batch_size)
+                    )
+                    plans = cursor.fetchall()
+                    if not plans:
+                        break
+
+                    plan_ids = [row["plan_id"] for row in plans]
+                    cursor.execute(
+                        CounterServices.AGGREGATE_SQL.format(
+                            filter=f"WHERE plan_id IN ({CounterServices._placeholders(plan_ids)})"
+                        ),
+                        tuple(plan_ids)
+                    )
+                    counts = {
+                        row["plan_id"]: (int(row["total_task"]), int(row["completed_task"]))
+                        for row in cursor.fetchall()
+                    }
+
+                    drifted = [
+                        row["plan_id"] for row in plans
+                        if (int(row["total_task"]), int(row["completed_task"])) != counts.get(row["plan_id"], (0, 0))
+                    ]
+                    if drifted and not dry_run:
+                        report["corrected"] += CounterServices.recompute(cursor, drifted)
+                    connect.connection.commit()
+
+                    report["plans"] += len(plans)
+                    report["batches"] += 1
+                    report["mismatches"] += len(drifted)
+                    last_plan_id = plan_ids[-1]
+                    if on_batch:
+                        on_batch(dict(report))
+
+        report["seconds"] = time.perf_counter() - started
+        report["plans_per_second"] = report["plans"] / report["seconds"] if report["seconds"] else 0.0
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile daily_plan counters with the tasks table")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="report mismatches without fixing them")
+    parser.add_argument("--quiet", action="store_true", help="only print the final report")
+    args = parser.parse_args()
+
+    def progress(report):
+        print(f"batch {report['batches']}: {report['plans']} plans, "
+              f"{report['mismatches']} mismatched, {report['corrected']} corrected")
+
+    report = CounterServices.reconcile(
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        on_batch=None if args.quiet else progress
+    )
+    print(f"{report['plans']} plans in {report['batches']} batches, "
+          f"{report['seconds']:.2f}s ({report['plans_per_second']:.0f} plans/s)")
+    print(f"{report['mismatches']} mismatched, {report['corrected']} corrected"
+          + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -40,4 +40,35 @@ CREATE TABLE tasks (
         (status = 'Completed' AND incomplete_reason IS NULL) OR
         (status = 'Incomplete' AND incomplete_reason IS NOT NULL)
     )
-);
\ No newline at end of file
+);
+-- 4️⃣ ID sequences (last id handed out per entity, see backend/utils.py IdAllocator)
+CREATE TABLE id_sequence (
+    name VARCHAR(32) PRIMARY KEY,
+    last_value BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT INTO id_sequence (name, last_value)
+SELECT 'plan', COALESCE(MAX(CAST(SUBSTRING(plan_id, 2) AS UNSIGNED)), 0) FROM daily_plan;
+
+INSERT INTO id_sequence (name, last_value)
+SELECT 'user', COALESCE(MAX(CAST(SUBSTRING(user_id, 2) AS UNSIGNED)), 0) FROM users;
+
+-- 5️⃣ Tombstones of deleted plans/tasks, read by UserTasks.sync (filled by triggers.sql,
+--    expired ones purged by python -m backend.tombstones)
+CREATE TABLE deleted_rows (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity ENUM('plan', 'task') NOT NULL,
+    user_id VARCHAR(20) NOT NULL,
+    plan_id VARCHAR(20) NOT NULL,
+    plan_date DATE NOT NULL,
+    title VARCHAR(255),
+    deleted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_deleted_rows_user (user_id, deleted_at)
+);
+
+-- lets UserTasks.sync find recently changed tasks without scanning history
+CREATE INDEX idx_tasks_updated_at ON tasks (updated_at);
+
+-- Later schema changes are versioned migrations in backend/migrations;
+-- after creating the schema and triggers run: python -m backend.migrate
@@ -1,5 +1,452 @@
+import os
+import sys
+import time
+import atexit
+import threading
+from contextlib import contextmanager
 import pymysql
 from pymysql.cursors import DictCursor
+from pymysql.constants import SERVER_STATUS
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from config import (
+    POOL_MAX_SIZE,
+    POOL_ACQUIRE_TIMEOUT,
+    POOL_IDLE_TIMEOUT,
+    POOL_MAX_LIFETIME,
+    POOL_PING_AFTER,
+)
+
+
+class ConnectionPool:
+    """
+    Process-wide, thread-safe pool of database connections.
+
+    Connections are created lazily by `factory` up to `max_size`. On checkout
+    idle connections past `idle_timeout` or `max_lifetime` are closed, and a
+    connection idle longer than `ping_after` is pinged before it is handed out.
+    Connections flagged with mark_session_state() are passed to `reset` on
+    release, and closed if that fails.
+    """
+
+    def __init__(self, factory, max_size=POOL_MAX_SIZE,
+                 acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+                 idle_timeout=POOL_IDLE_TIMEOUT,
+                 max_lifetime=POOL_MAX_LIFETIME,
+                 ping_after=POOL_PING_AFTER,
+                 reset=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.reset = reset_session if reset is None else reset
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []          # [(connection, created_at, returned_at)] newest last
+        self._in_use = {}        # {id(connection): created_at}
+        self._opening = 0        # connections being created outside the lock
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "acquired": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+        }
+
+    def _size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, created_at, returned_at, now):
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return True
+        if self.idle_timeout and now - returned_at > self.idle_timeout:
+            return True
+        return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(connection):
+        """Liveness check; connections without ping() are trusted."""
+        if getattr(connection, "open", True) is False:
+            return False
+        ping = getattr(connection, "ping", None)
+        if ping is None:
+            return True
+        try:
+            ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """
+        Borrow a connection from the pool.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free slot,
+                defaults to the pool's acquire_timeout.
+
+        Returns:
+            connection: An open database connection.
+
+        Raises:
+            TimeoutError: If no connection became available in time.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        waited = False
+
+        while True:
+            stale = []
+            candidate = None
+            create = False
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        connection, created_at, returned_at = self._idle.pop()
+                        if self._expired(created_at, returned_at, now):
+                            stale.append(connection)
+                            continue
+                        candidate = (connection, created_at, returned_at)
+                        self._in_use[id(connection)] = created_at
+                        break
+                    if candidate:
+                        break
+                    if self._size() < self.max_size:
+                        self._opening += 1
+                        create = True
+                        break
+
+                    remaining = timeout - (now - started)
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        self._stats["closed"] += len(stale)
+                        for connection in stale:
+                            self._close_quietly(connection)
+                        raise TimeoutError("Timed out waiting for a database connection")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                self._stats["closed"] += len(stale)
+
+            for connection in stale:
+                self._close_quietly(connection)
+
+            if create:
+                try:
+                    connection = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use[id(connection)] = time.monotonic()
+                    self._stats["created"] += 1
+                    self._record_acquire(started, waited)
+                return connection
+
+            connection, created_at, returned_at = candidate
+            if (time.monotonic() - returned_at <= self.ping_after) or self._is_alive(connection):
+                with self._cond:
+                    self._record_acquire(started, waited)
+                return connection
+
+            # dead connection: drop it and try again
+            self._discard(connection)
+
+    def _record_acquire(self, started, waited):
+        wait_time = time.monotonic() - started
+        self._stats["acquired"] += 1
+        if waited:
+            self._stats["waits"] += 1
+            self._stats["wait_time_total"] += wait_time
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+
+    def _discard(self, connection):
+        with self._cond:
+            self._in_use.pop(id(connection), None)
+            self._stats["closed"] += 1
+            self._cond.notify()
+        self._close_quietly(connection)
+
+    def release(self, connection):
+        """
+        Return a borrowed connection to the pool.
+
+        Any transaction left open by the borrower is rolled back and flagged
+        session state is reset, so the next user starts clean. Broken or
+        expired connections, and those that fail to reset, are closed instead.
+        """
+        with self._cond:
+            created_at = self._in_use.get(id(connection))
+        if created_at is None:
+            self._close_quietly(connection)
+            return
+
+        try:
+            if getattr(connection, "open", True) is False:
+                raise ConnectionError("connection already closed")
+            if _in_transaction(connection):
+                connection.rollback()
+            if getattr(connection, "_session_state", False):
+                self.reset(connection)
+                connection._session_state = False
+        except Exception:
+            self._discard(connection)
+            return
+
+        now = time.monotonic()
+        with self._cond:
+            self._in_use.pop(id(connection), None)
+            if self._closed or (self.max_lifetime and now - created_at > self.max_lifetime):
+                self._stats["closed"] += 1
+                self._cond.notify()
+                expired = True
+            else:
+                self._idle.append((connection, created_at, now))
+                self._cond.notify()
+                expired = False
+        if expired:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Borrow a connection for the duration of a `with` block.
+
+        Example:
+            with pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    ...
+        """
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self):
+        """
+        Snapshot of pool usage for monitoring.
+
+        Returns:
+            dict: {
+                "in_use", "idle", "max_size", "created", "closed", "acquired",
+                "waits", "timeouts", "wait_time_total", "wait_time_avg", "wait_time_max"
+            }
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats["in_use"] = len(self._in_use)
+            stats["idle"] = len(self._idle)
+            stats["max_size"] = self.max_size
+        stats["wait_time_avg"] = (
+            stats["wait_time_total"] / stats["waits"] if stats["waits"] else 0.0
+        )
+        return stats
+
+    def close(self):
+        """Close idle connections and stop handing out new ones."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for connection, _, _ in idle:
+            self._close_quietly(connection)
+
+
+# User variables the application sets on pooled connections
+# (see backend/counters.py CounterServices.bulk_writes)
+SESSION_VARIABLES = ("disable_counter_triggers",)
+
+
+def mark_session_state(connection):
+    """
+    Flag a pooled connection as carrying session state (SESSION_VARIABLES),
+    so the pool resets it before anyone else borrows it.
+    """
+    connection._session_state = True
+
+
+def clear_session_state(connection):
+    """Undo mark_session_state() once the borrower has reset the state itself."""
+    connection._session_state = False
+
+
+def reset_session(connection):
+    """Default ConnectionPool reset: set every SESSION_VARIABLE back to NULL."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET " + ", ".join(f"@{name} = NULL" for name in SESSION_VARIABLES))
+
+
+def _in_transaction(connection):
+    server_status = getattr(connection, "server_status", None)
+    if server_status is not None:
+        return bool(server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+    return getattr(connection, "in_transaction", True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database, factory=None):
+    """
+    Return the process-wide pool for `database`, creating it on first use.
+
+    Args:
+        database (str): Database name the pool serves.
+        factory (callable, optional): Zero-argument callable opening a new
+            connection; only used when the pool does not exist yet.
+    """
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            if factory is None:
+                raise ValueError(f"No connection pool configured for {database}")
+            pool = ConnectionPool(factory)
+            _pools[database] = pool
+        return pool
+
+
+def configure_pool(database, factory, **options):
+    """
+    Replace the pool for `database` with one built from `factory` and `options`
+    (max_size, acquire_timeout, idle_timeout, max_lifetime, ping_after).
+    """
+    pool = ConnectionPool(factory, **options)
+    with _pools_lock:
+        old = _pools.get(database)
+        _pools[database] = pool
+    if old:
+        old.close()
+    return pool
+
+
+def pool_stats():
+    """
+    Returns:
+        dict: {database: ConnectionPool.stats()} for every pool in this process.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {database: pool.stats() for database, pool in pools.items()}
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all_pools)
+
+
+class SchemaRegistry:
+    """
+    Caches which of the application's tables and triggers exist, so request
+    paths don't issue a SHOW TABLES round trip on every call.
+
+    The schema is read once per database on first use. A table missing from
+    the cache triggers one re-read before failing; call invalidate() after
+    running DDL to force a fresh read.
+    """
+    REQUIRED_TABLES = ("users", "daily_plan", "tasks")
+    REQUIRED_TRIGGERS = ("trg_task_insert", "trg_task_update", "trg_task_delete", "trg_plan_delete")
+
+    _lock = threading.Lock()
+    _schemas = {}   # {database: {"tables": set, "triggers": set}}
+
+    @classmethod
+    def _load(cls, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_NAME AS name FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE()"
+            )
+            tables = {row["name"] for row in cursor.fetchall()}
+            cursor.execute(
+                "SELECT TRIGGER_NAME AS name FROM information_schema.TRIGGERS "
+                "WHERE TRIGGER_SCHEMA = DATABASE()"
+            )
+            triggers = {row["name"] for row in cursor.fetchall()}
+
+        missing_triggers = [t for t in cls.REQUIRED_TRIGGERS if t not in triggers]
+        if missing_triggers:
+            print(f"Warning: missing triggers {missing_triggers}, daily_plan counters will not be maintained")
+        return {"tables": tables, "triggers": triggers}
+
+    @classmethod
+    def validate(cls, db, refresh=False):
+        """
+        Load (or return the cached) schema for an open SqlConnection.
+
+        Returns:
+            dict: {"tables": set, "triggers": set}
+
+        Raises:
+            RuntimeError: If any of REQUIRED_TABLES is missing
+        """
+        with cls._lock:
+            schema = None if refresh else cls._schemas.get(db.database)
+        if schema is None:
+            schema = cls._load(db.connection)
+            missing = [t for t in cls.REQUIRED_TABLES if t not in schema["tables"]]
+            if missing:
+                raise RuntimeError(f"Required tables not found in database: {missing}")
+            with cls._lock:
+                cls._schemas[db.database] = schema
+        return schema
+
+    @classmethod
+    def require_table(cls, db, table):
+        """
+        Raise RuntimeError unless `table` exists, using the cached schema.
+
+        Args:
+            db (SqlConnection): A connected SqlConnection
+            table (str): Table name to check
+        """
+        if table in cls.validate(db)["tables"]:
+            return
+        if table in cls.validate(db, refresh=True)["tables"]:
+            return
+        raise RuntimeError(f"{table} table not found in database")
+
+    @classmethod
+    def invalidate(cls, database=None):
+        """Drop the cached schema for `database`, or for every database."""
+        with cls._lock:
+            if database is None:
+                cls._schemas.clear()
+            else:
+                cls._schemas.pop(database, None)
+
 
 class SqlConnection:
     def __init__(self, database="task_flow"):
@@ -8,34 +455,51 @@ class SqlConnection:
         self.password = "root"
         self.database = database
         self.connection = None
-    
+        self.pool = None
+
+    def open_connection(self):
+        """
+        Open a brand-new (unpooled) connection to the MySQL database
+        """
+        return pymysql.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            port=3306,
+            cursorclass=DictCursor,  # This makes results return as dictionaries
+            autocommit=False,
+            charset = 'utf8mb4',
+        )
+
     def connect(self):
         """
-        Establish connection to the MySQL database
-        
+        Borrow a connection to the MySQL database from the process-wide pool
+
         Returns:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                port=3306,
-                cursorclass=DictCursor,  # This makes results return as dictionaries
-                autocommit=False,
-                charset = 'utf8mb4',
-            )
+            self.pool = get_pool(self.database, self.open_connection)
+            self.connection = self.pool.acquire()
             return True
-        except pymysql.Error as e:
+        except (pymysql.Error, TimeoutError) as e:
             print(f"Error connecting to database: {e}")
             return False
-    
+
     def disconnect(self):
         """
-        Close the database connection
+        Return the database connection to the pool
         """
         if self.connection:
-            self.connection.close()
-            self.connection = None
\ No newline at end of file
+            self.pool.release(self.connection)
+            self.connection = None
+
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError("Failed to connect to database")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disconnect()
+        return False
@@ -0,0 +1,163 @@
+"""
+KPIs for every user in one streamed pass over daily_plan, written as CSV:
+
+    python -m backend.kpi_report kpi_report.csv [--chunk-size N]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import pymysql
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from config import KPI_REPORT_CHUNK_SIZE
+
+
+class KpiReport:
+    """
+    Per-user KPIs (the columns of KpiServices.analysis_user_stats) for all
+    users with plans.
+
+    daily_plan is read in user_id order through a server-side cursor,
+    `chunk_size` rows at a time, and each chunk is aggregated with one
+    groupby-sum. Every user finished within a chunk is written out at once;
+    only the last user of a chunk (who may continue in the next) is carried
+    over, so memory stays bounded by the chunk size whatever the table size.
+    """
+
+    COLUMNS = ["user_id", "total_dates", "sum_completed_tasks", "sum_total_tasks",
+               "avg_completion_percentage", "active_days", "incomplete_tasks_list"]
+    QUERY = """
+        SELECT user_id, completed_task, total_task
+        FROM daily_plan
+        ORDER BY user_id
+    """
+    # running sums per user; the percentage sum is in hundredths
+    _SUMS = ["total_dates", "sum_completed_tasks", "sum_total_tasks", "active_days", "percentage_hundredths"]
+
+    @staticmethod
+    def aggregate_chunk(rows):
+        """
+        Sum one chunk of (user_id, completed_task, total_task) rows per user.
+
+        Returns:
+            pd.DataFrame: Running sums indexed by user_id, in input order.
+        """
+        chunk = pd.DataFrame.from_records(rows, columns=["user_id", "completed_task", "total_task"])
+        completed = chunk["completed_task"].fillna(0).to_numpy(dtype=np.int64)
+        total = chunk["total_task"].fillna(0).to_numpy(dtype=np.int64)
+        # same rounding as PlanStatusStore.completion_percentage, in hundredths
+        hundredths = np.divide(completed * 10000, total,
+                               out=np.zeros(len(total)), where=total > 0)
+        sums = pd.DataFrame({
+            "user_id": chunk["user_id"],
+            "total_dates": np.ones(len(total), dtype=np.int64),
+            "sum_completed_tasks": completed,
+            "sum_total_tasks": total,
+            "active_days": (total > 0).astype(np.int64),
+            "percentage_hundredths": np.round(hundredths).astype(np.int64),
+        })
+        return sums.groupby("user_id", sort=False)[KpiReport._SUMS].sum()
+
+    @staticmethod
+    def finish(sums):
+        """Turn running sums into report rows."""
+        report = sums[["total_dates", "sum_completed_tasks", "sum_total_tasks"]].copy()
+        # Python's round, as KpiAggregates.stats uses (NumPy's differs on ties)
+        average = sums["percentage_hundredths"] / sums["total_dates"] / 100
+        report["avg_completion_percentage"] = [round(value, 2) for value in average.tolist()]
+        report["active_days"] = sums["active_days"]
+        report["incomplete_tasks_list"] = sums["sum_total_tasks"] - sums["sum_completed_tasks"]
+        return report.rename_axis("user_id").reset_index()[KpiReport.COLUMNS]
+
+    @staticmethod
+    def stream(cursor, out, chunk_size=KPI_REPORT_CHUNK_SIZE, on_chunk=None):
+        """
+        Run the report query on `cursor` and write CSV rows to `out`.
+
+        Args:
+            cursor: An unbuffered (server-side) cursor returning tuples.
+            out: Text file to write to.
+            chunk_size (int): Rows fetched and aggregated at a time.
+            on_chunk (callable, optional): Called with the running summary
+                after every chunk.
+
+        Returns:
+            dict: {"rows", "users", "chunks"}
+        """
+        summary = {"rows": 0, "users": 0, "chunks": 0}
+        out.write(",".join(KpiReport.COLUMNS) + "\n")
+        carry = None
+
+        cursor.execute(KpiReport.QUERY)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            sums = KpiReport.aggregate_chunk(rows)
+            if carry is not None:
+                if carry.index[0] == sums.index[0]:
+                    sums.iloc[0] = sums.iloc[0] + carry.iloc[0]
+                else:
+                    sums = pd.concat([carry, sums])
+
+            done = KpiReport.finish(sums.iloc[:-1])
+            done.to_csv(out, header=False, index=False)
+            carry = sums.iloc[-1:]
+
+            summary["rows"] += len(rows)
+            summary["users"] += len(done)
+            summary["chunks"] += 1
+            if on_chunk:
+                on_chunk(dict(summary))
+
+        if carry is not None:
+            KpiReport.finish(carry).to_csv(out, header=False, index=False)
+            summary["users"] += 1
+        return summary
+
+    @staticmethod
+    def generate(path, chunk_size=KPI_REPORT_CHUNK_SIZE, on_chunk=None):
+        """
+        Write the KPI report of every user to `path` as CSV.
+
+        Returns:
+            dict: {"rows", "users", "chunks", "seconds", "rows_per_second", "path"}
+
+        Raises:
+            ValueError: If chunk_size is not positive.
+            Exception: If database errors occur.
+        """
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        started = time.perf_counter()
+        with SqlConnection() as connect, open(path, "w", newline="", encoding="utf-8") as out:
+            # SSCursor streams rows from the server instead of buffering the result
+            with connect.connection.cursor(pymysql.cursors.SSCursor) as cursor:
+                summary = KpiReport.stream(cursor, out, chunk_size, on_chunk)
+            connect.connection.rollback()   # end the read's transaction
+
+        summary["seconds"] = time.perf_counter() - started
+        summary["rows_per_second"] = summary["rows"] / summary["seconds"] if summary["seconds"] else 0.0
+        summary["path"] = path
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write per-user KPIs for every user to a CSV file")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--chunk-size", type=int, default=KPI_REPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    summary = KpiReport.generate(args.output, chunk_size=args.chunk_size)
+    print(f"{summary['users']} users from {summary['rows']} plan rows in {summary['seconds']:.2f}s "
+          f"({summary['rows_per_second']:.0f} rows/s) -> {summary['path']}")
+
+
+if __name__ == "__main__":
+    main()
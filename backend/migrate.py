@@ -0,0 +1,200 @@
+"""
+Forward-only schema migrations. Scripts live in backend/migrations as
+NNNN_name.sql and are applied in version order; applied versions are
+recorded in the schema_version table:
+
+    python -m backend.migrate [--target N] [--dry-run]
+"""
+import os
+import re
+import sys
+import hashlib
+import argparse
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection, SchemaRegistry
+
+
+class Migrations:
+    DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+    FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+    LOCK_NAME = "task_flow_migrate"
+    LOCK_TIMEOUT = 60   # seconds to wait for another runner to finish
+
+    @staticmethod
+    def discover(directory=DIRECTORY):
+        """
+        List the migration scripts in `directory`.
+
+        Returns:
+            list[dict]: {"version", "name", "path", "checksum"} in version order.
+
+        Raises:
+            ValueError: If two scripts share a version number.
+        """
+        migrations = {}
+        for filename in sorted(os.listdir(directory)):
+            match = Migrations.FILENAME.match(filename)
+            if not match:
+                continue
+            version = int(match.group(1))
+            if version in migrations:
+                raise ValueError(f"Duplicate migration version {version:04d}: {filename}")
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as f:
+                checksum = hashlib.sha256(f.read()).hexdigest()
+            migrations[version] = {
+                "version": version,
+                "name": match.group(2),
+                "path": path,
+                "checksum": checksum,
+            }
+        return [migrations[v] for v in sorted(migrations)]
+
+    @staticmethod
+    def split_statements(sql):
+        """
+        Split a script into statements the way the mysql client does,
+        honouring DELIMITER lines (needed for trigger bodies). Comment-only
+        lines between statements are dropped.
+
+        Returns:
+            list[str]: Statements without their trailing delimiter.
+        """
+        statements, buffer = [], []
+        delimiter = ";"
+        for line in sql.splitlines():
+            stripped = line.strip()
+            if stripped.upper().startswith("DELIMITER "):
+                delimiter = stripped.split(None, 1)[1]
+                continue
+            if not buffer and (not stripped or stripped.startswith("--")):
+                continue
+            buffer.append(line)
+            if stripped.endswith(delimiter):
+                statement = "\n".join(buffer).rstrip()[:-len(delimiter)].strip()
+                if statement:
+                    statements.append(statement)
+                buffer = []
+        tail = "\n".join(buffer).strip()
+        if tail:
+            statements.append(tail)
+        return statements
+
+    @staticmethod
+    def ensure_version_table(cursor):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+    @staticmethod
+    def applied(cursor):
+        """
+        Returns:
+            dict: {version: checksum} of the migrations already applied.
+        """
+        cursor.execute("SELECT version, checksum FROM schema_version ORDER BY version")
+        return {int(row["version"]): row["checksum"] for row in cursor.fetchall()}
+
+    @staticmethod
+    def pending(applied, migrations, target=None):
+        """
+        Migrations still to run, up to `target`.
+
+        Raises:
+            RuntimeError: If an applied script was edited afterwards.
+        """
+        for migration in migrations:
+            checksum = applied.get(migration["version"])
+            if checksum is not None and checksum != migration["checksum"]:
+                raise RuntimeError(
+                    f"Migration {migration['version']:04d}_{migration['name']} was changed after "
+                    "it was applied; add a new migration instead"
+                )
+        return [
+            m for m in migrations
+            if m["version"] not in applied and (target is None or m["version"] <= target)
+        ]
+
+    @staticmethod
+    def migrate(target=None, dry_run=False, directory=DIRECTORY, database="task_flow"):
+        """
+        Apply every pending migration in order.
+
+        MySQL commits DDL implicitly, so a migration is not atomic: each one
+        is recorded in schema_version only after all its statements succeed,
+        and a failed migration must be fixed by hand before re-running.
+        A named lock keeps two runners from migrating at once.
+
+        Args:
+            target (int, optional): Stop after this version.
+            dry_run (bool): Only report what would be applied.
+            directory (str): Where the scripts live.
+            database (str): Database to migrate.
+
+        Returns:
+            list[int]: Versions applied (or pending, for a dry run).
+
+        Raises:
+            RuntimeError: If the lock cannot be taken or an applied script changed.
+            Exception: If a migration statement fails.
+        """
+        migrations = Migrations.discover(directory)
+
+        with SqlConnection(database) as connect:
+            with connect.connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, %s) AS locked", (Migrations.LOCK_NAME, Migrations.LOCK_TIMEOUT))
+                if not cursor.fetchone()["locked"]:
+                    raise RuntimeError("Another migration run holds the lock")
+                try:
+                    Migrations.ensure_version_table(cursor)
+                    todo = Migrations.pending(Migrations.applied(cursor), migrations, target)
+                    if dry_run:
+                        return [m["version"] for m in todo]
+
+                    done = []
+                    for migration in todo:
+                        with open(migration["path"], encoding="utf-8") as f:
+                            statements = Migrations.split_statements(f.read())
+                        try:
+                            for statement in statements:
+                                cursor.execute(statement)
+                            cursor.execute(
+                                "INSERT INTO schema_version (version, name, checksum) VALUES (%s, %s, %s)",
+                                (migration["version"], migration["name"], migration["checksum"])
+                            )
+                            connect.connection.commit()
+                        except Exception as e:
+                            connect.connection.rollback()
+                            print(f"Error applying migration {migration['version']:04d}_{migration['name']}: {e}")
+                            raise e
+                        done.append(migration["version"])
+                    return done
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (Migrations.LOCK_NAME,))
+                    SchemaRegistry.invalidate(database)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations only")
+    args = parser.parse_args()
+
+    versions = Migrations.migrate(target=args.target, dry_run=args.dry_run)
+    if not versions:
+        print("Schema is up to date")
+    for version in versions:
+        print(f"{'pending' if args.dry_run else 'applied'}: {version:04d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- Covering index for the per-user task loads (UserTasks.set_user_tasks,
+-- UserTasks.load_month): tasks are found by plan_id and read in
+-- created_at order, and title/status come straight from the index.
+-- It also serves the per-plan GROUP BY of backend/counters.py.
+--
+-- The other hot lookups already have an index: users by email (UNIQUE),
+-- daily_plan by (user_id, plan_date) (UNIQUE) and deleted_rows by
+-- (user_id, deleted_at).
+CREATE INDEX idx_tasks_plan_created ON tasks (plan_id, created_at, title, status);
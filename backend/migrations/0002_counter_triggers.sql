@@ -0,0 +1,54 @@
+-- Re-create the task counter triggers of backend/triggers.sql on existing
+-- databases: per-row counter updates can be switched off with
+-- @disable_counter_triggers (CounterServices.bulk_writes), and status
+-- changes between any two values keep completed_task right.
+DROP TRIGGER IF EXISTS trg_task_insert;
+DROP TRIGGER IF EXISTS trg_task_update;
+DROP TRIGGER IF EXISTS trg_task_delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_task_insert
+AFTER INSERT ON tasks
+FOR EACH ROW
+BEGIN
+    IF @disable_counter_triggers IS NULL THEN
+        UPDATE daily_plan
+        SET total_task = total_task + 1,
+            completed_task = completed_task + IF(NEW.status = 'Completed', 1, 0)
+        WHERE plan_id = NEW.plan_id;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_task_update
+AFTER UPDATE ON tasks
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.status <=> NEW.status) AND @disable_counter_triggers IS NULL THEN
+        UPDATE daily_plan
+        SET completed_task = completed_task
+            + IF(NEW.status = 'Completed', 1, 0)
+            - IF(OLD.status = 'Completed', 1, 0)
+        WHERE plan_id = NEW.plan_id;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_task_delete
+AFTER DELETE ON tasks
+FOR EACH ROW
+BEGIN
+    IF @disable_counter_triggers IS NULL THEN
+        UPDATE daily_plan
+        SET total_task = total_task - 1,
+            completed_task = completed_task - IF(OLD.status = 'Completed', 1, 0)
+        WHERE plan_id = OLD.plan_id;
+    END IF;
+
+    -- tombstone for UserTasks.sync
+    INSERT INTO deleted_rows (entity, user_id, plan_id, plan_date, title)
+    SELECT 'task', user_id, plan_id, plan_date, OLD.title
+    FROM daily_plan
+    WHERE plan_id = OLD.plan_id;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,90 @@
+-- Per-user, per-month rollup of daily_plan, read by the "Month" and "Year"
+-- charts (backend/monthly_summary.py). Kept current by the daily_plan
+-- triggers below; rebuild it with: python -m backend.monthly_summary
+CREATE TABLE monthly_summary (
+    user_id VARCHAR(20) NOT NULL,
+    `year_month` CHAR(7) NOT NULL,              -- 'YYYY-MM'
+    total_task INT NOT NULL DEFAULT 0,
+    completed_task INT NOT NULL DEFAULT 0,
+    active_days INT NOT NULL DEFAULT 0,         -- plans with total_task > 0
+    plan_days INT NOT NULL DEFAULT 0,           -- plans in the month
+
+    PRIMARY KEY (user_id, `year_month`),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+INSERT INTO monthly_summary (user_id, `year_month`, total_task, completed_task, active_days, plan_days)
+SELECT user_id, DATE_FORMAT(plan_date, '%Y-%m'),
+       SUM(COALESCE(total_task, 0)), SUM(COALESCE(completed_task, 0)),
+       SUM(COALESCE(total_task, 0) > 0), COUNT(*)
+FROM daily_plan
+GROUP BY user_id, DATE_FORMAT(plan_date, '%Y-%m');
+
+DELIMITER $$
+
+-- daily_plan counters change through the task triggers (or a bulk
+-- recompute), so watching daily_plan covers every task write as well
+CREATE TRIGGER trg_plan_insert_summary
+AFTER INSERT ON daily_plan
+FOR EACH ROW
+BEGIN
+    INSERT INTO monthly_summary (user_id, `year_month`, total_task, completed_task, active_days, plan_days)
+    VALUES (NEW.user_id, DATE_FORMAT(NEW.plan_date, '%Y-%m'),
+            COALESCE(NEW.total_task, 0), COALESCE(NEW.completed_task, 0),
+            IF(COALESCE(NEW.total_task, 0) > 0, 1, 0), 1)
+    ON DUPLICATE KEY UPDATE
+        total_task = total_task + VALUES(total_task),
+        completed_task = completed_task + VALUES(completed_task),
+        active_days = active_days + VALUES(active_days),
+        plan_days = plan_days + VALUES(plan_days);
+END$$
+
+CREATE TRIGGER trg_plan_update_summary
+AFTER UPDATE ON daily_plan
+FOR EACH ROW
+BEGIN
+    IF OLD.user_id = NEW.user_id
+       AND DATE_FORMAT(OLD.plan_date, '%Y-%m') = DATE_FORMAT(NEW.plan_date, '%Y-%m') THEN
+        IF NOT (OLD.total_task <=> NEW.total_task AND OLD.completed_task <=> NEW.completed_task) THEN
+            UPDATE monthly_summary
+            SET total_task = total_task + COALESCE(NEW.total_task, 0) - COALESCE(OLD.total_task, 0),
+                completed_task = completed_task + COALESCE(NEW.completed_task, 0) - COALESCE(OLD.completed_task, 0),
+                active_days = active_days
+                    + IF(COALESCE(NEW.total_task, 0) > 0, 1, 0)
+                    - IF(COALESCE(OLD.total_task, 0) > 0, 1, 0)
+            WHERE user_id = NEW.user_id AND `year_month` = DATE_FORMAT(NEW.plan_date, '%Y-%m');
+        END IF;
+    ELSE
+        -- plan moved to another month (or user): take it out of the old row
+        UPDATE monthly_summary
+        SET total_task = total_task - COALESCE(OLD.total_task, 0),
+            completed_task = completed_task - COALESCE(OLD.completed_task, 0),
+            active_days = active_days - IF(COALESCE(OLD.total_task, 0) > 0, 1, 0),
+            plan_days = plan_days - 1
+        WHERE user_id = OLD.user_id AND `year_month` = DATE_FORMAT(OLD.plan_date, '%Y-%m');
+
+        INSERT INTO monthly_summary (user_id, `year_month`, total_task, completed_task, active_days, plan_days)
+        VALUES (NEW.user_id, DATE_FORMAT(NEW.plan_date, '%Y-%m'),
+                COALESCE(NEW.total_task, 0), COALESCE(NEW.completed_task, 0),
+                IF(COALESCE(NEW.total_task, 0) > 0, 1, 0), 1)
+        ON DUPLICATE KEY UPDATE
+            total_task = total_task + VALUES(total_task),
+            completed_task = completed_task + VALUES(completed_task),
+            active_days = active_days + VALUES(active_days),
+            plan_days = plan_days + VALUES(plan_days);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_plan_delete_summary
+AFTER DELETE ON daily_plan
+FOR EACH ROW
+BEGIN
+    UPDATE monthly_summary
+    SET total_task = total_task - COALESCE(OLD.total_task, 0),
+        completed_task = completed_task - COALESCE(OLD.completed_task, 0),
+        active_days = active_days - IF(COALESCE(OLD.total_task, 0) > 0, 1, 0),
+        plan_days = plan_days - 1
+    WHERE user_id = OLD.user_id AND `year_month` = DATE_FORMAT(OLD.plan_date, '%Y-%m');
+END$$
+
+DELIMITER ;
@@ -0,0 +1,59 @@
+-- Objects added to create_database.sql / triggers.sql before migrations
+-- existed, for databases created from an older schema: the id_sequence
+-- table (backend/utils.py IdAllocator), the deleted_rows tombstones and
+-- the tasks.updated_at index read by UserTasks.sync, and the plan delete
+-- trigger writing those tombstones (trg_task_delete of 0002 writes them
+-- too). Safe to run on a database that already has them.
+CREATE TABLE IF NOT EXISTS id_sequence (
+    name VARCHAR(32) PRIMARY KEY,
+    last_value BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO id_sequence (name, last_value)
+SELECT 'plan', COALESCE(MAX(CAST(SUBSTRING(plan_id, 2) AS UNSIGNED)), 0) FROM daily_plan;
+
+INSERT IGNORE INTO id_sequence (name, last_value)
+SELECT 'user', COALESCE(MAX(CAST(SUBSTRING(user_id, 2) AS UNSIGNED)), 0) FROM users;
+
+INSERT IGNORE INTO id_sequence (name, last_value)
+SELECT 'task', COALESCE(MAX(CAST(SUBSTRING(task_id, 2) AS UNSIGNED)), 0) FROM tasks;
+
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity ENUM('plan', 'task') NOT NULL,
+    user_id VARCHAR(20) NOT NULL,
+    plan_id VARCHAR(20) NOT NULL,
+    plan_date DATE NOT NULL,
+    title VARCHAR(255),
+    deleted_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+    INDEX idx_deleted_rows_user (user_id, deleted_at)
+);
+
+-- MySQL has no CREATE INDEX IF NOT EXISTS
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.STATISTICS
+     WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'tasks'
+       AND INDEX_NAME = 'idx_tasks_updated_at') = 0,
+    'CREATE INDEX idx_tasks_updated_at ON tasks (updated_at)',
+    'DO 0'
+);
+PREPARE create_index FROM @ddl;
+EXECUTE create_index;
+DEALLOCATE PREPARE create_index;
+
+DROP TRIGGER IF EXISTS trg_plan_delete;
+
+DELIMITER $$
+
+-- (its tasks go by ON DELETE CASCADE, which fires no task triggers,
+--  so this one tombstone stands for all of them)
+CREATE TRIGGER trg_plan_delete
+AFTER DELETE ON daily_plan
+FOR EACH ROW
+BEGIN
+    INSERT INTO deleted_rows (entity, user_id, plan_id, plan_date)
+    VALUES ('plan', OLD.user_id, OLD.plan_id, OLD.plan_date);
+END$$
+
+DELIMITER ;
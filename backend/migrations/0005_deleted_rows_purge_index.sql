@@ -0,0 +1,3 @@
+-- Lets backend/tombstones.py purge deleted_rows by age with a range scan
+-- (idx_deleted_rows_user leads with user_id, so it cannot serve the purge).
+CREATE INDEX idx_deleted_rows_deleted_at ON deleted_rows (deleted_at);
@@ -0,0 +1,184 @@
+"""
+Per-user monthly rollup of daily_plan (the monthly_summary table, see
+backend/migrations/0003_monthly_summary.sql). Run as a module to rebuild it
+from daily_plan:
+
+    python -m backend.monthly_summary [--user USER_ID] [--batch-size N]
+"""
+import os
+import sys
+import time
+import argparse
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from backend.cache import user_data_cache
+from config import MONTHLY_SUMMARY_BACKFILL_BATCH, USER_CACHE_TTL
+
+
+class MonthlySummaryServices:
+    # rollup of daily_plan for the users in {users}
+    ROLLUP_SQL = """
+        INSERT INTO monthly_summary (user_id, `year_month`, total_task, completed_task, active_days, plan_days)
+        SELECT user_id, DATE_FORMAT(plan_date, '%%Y-%%m'),
+               SUM(COALESCE(total_task, 0)), SUM(COALESCE(completed_task, 0)),
+               SUM(COALESCE(total_task, 0) > 0), COUNT(*)
+        FROM daily_plan
+        WHERE user_id IN ({users})
+        GROUP BY user_id, DATE_FORMAT(plan_date, '%%Y-%%m')
+    """
+
+    @staticmethod
+    def get_months(user_id):
+        """
+        Fetch a user's monthly rollup, oldest month first.
+
+        Args:
+            user_id (str): User ID.
+
+        Returns:
+            list[dict]: {"year_month", "total_task", "completed_task",
+                         "active_days"} for every month that has plans.
+
+        Raises:
+            ValueError: If user_id is invalid.
+            Exception: If database errors occur.
+        """
+        if not user_id or not isinstance(user_id, str):
+            raise ValueError("Invalid user_id")
+
+        # read before the query, so a write committed meanwhile is not cached
+        key = ("monthly_summary", user_data_cache.generation(user_id))
+        cached = user_data_cache.get(user_id, key)
+        if cached is not None:
+            return cached
+
+        with SqlConnection() as connect:
+            with connect.connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT `year_month`, total_task, completed_task, active_days
+                    FROM monthly_summary
+                    WHERE user_id = %s AND plan_days > 0
+                    ORDER BY `year_month` ASC
+                    """,
+                    (user_id,)
+                )
+                months = [
+                    {
+                        "year_month": row["year_month"],
+                        "total_task": int(row["total_task"]),
+                        "completed_task": int(row["completed_task"]),
+                        "active_days": int(row["active_days"]),
+                    }
+                    for row in cursor.fetchall()
+                ]
+
+        user_data_cache.put(user_id, key, months)
+        return months
+
+    @staticmethod
+    def get_years(user_id):
+        """
+        Fold a user's months into years.
+
+        Returns:
+            list[dict]: {"year", "total_task", "completed_task", "active_days"},
+            oldest year first.
+        """
+        years = {}
+        for month in MonthlySummaryServices.get_months(user_id):
+            year = years.setdefault(
+                month["year_month"][:4],
+                {"year": month["year_month"][:4], "total_task": 0, "completed_task": 0, "active_days": 0}
+            )
+            year["total_task"] += month["total_task"]
+            year["completed_task"] += month["completed_task"]
+            year["active_days"] += month["active_days"]
+        return [years[y] for y in sorted(years)]
+
+    @staticmethod
+    def completion_percentage(row):
+        if row["total_task"] > 0:
+            return (row["completed_task"] / row["total_task"]) * 100
+        return 0
+
+    @staticmethod
+    def backfill(user_id=None, batch_size=MONTHLY_SUMMARY_BACKFILL_BATCH):
+        """
+        Rebuild monthly_summary from daily_plan.
+
+        Users are rebuilt `batch_size` at a time in user_id order, each batch
+        in one transaction (its rows are deleted and re-aggregated), so a
+        rebuild never locks more than one batch of users.
+
+        Cached reads are invalidated in this process only: run from the CLI,
+        app processes keep serving their cached months until USER_CACHE_TTL
+        expires.
+
+        Args:
+            user_id (str, optional): Rebuild only this user.
+            batch_size (int): Users per batch.
+
+        Returns:
+            dict: {"users", "months", "seconds"}
+
+        Raises:
+            ValueError: If batch_size is not positive.
+            Exception: If database errors occur.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        report = {"users": 0, "months": 0}
+        started = time.perf_counter()
+        last_user_id = ""
+
+        with SqlConnection() as connect:
+            with connect.connection.cursor() as cursor:
+                while True:
+                    if user_id is not None:
+                        user_ids = [user_id] if last_user_id == "" else []
+                    else:
+                        cursor.execute(
+                            "SELECT user_id FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                            (last_user_id, batch_size)
+                        )
+                        user_ids = [row["user_id"] for row in cursor.fetchall()]
+                    if not user_ids:
+                        break
+
+                    marks = ", ".join(["%s"] * len(user_ids))
+                    try:
+                        cursor.execute(f"DELETE FROM monthly_summary WHERE user_id IN ({marks})", tuple(user_ids))
+                        cursor.execute(MonthlySummaryServices.ROLLUP_SQL.format(users=marks), tuple(user_ids))
+                        report["months"] += cursor.rowcount
+                        connect.connection.commit()
+                    except Exception as e:
+                        connect.connection.rollback()
+                        print(f"Error rebuilding monthly summary: {e}")
+                        raise e
+
+                    for uid in user_ids:
+                        user_data_cache.invalidate(uid)
+                    report["users"] += len(user_ids)
+                    last_user_id = user_ids[-1]
+
+        report["seconds"] = time.perf_counter() - started
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the monthly_summary table from daily_plan")
+    parser.add_argument("--user", help="rebuild only this user_id")
+    parser.add_argument("--batch-size", type=int, default=MONTHLY_SUMMARY_BACKFILL_BATCH)
+    args = parser.parse_args()
+
+    report = MonthlySummaryServices.backfill(user_id=args.user, batch_size=args.batch_size)
+    print(f"{report['users']} users, {report['months']} months rebuilt in {report['seconds']:.2f}s")
+    print(f"Running app processes pick up the rebuild within {USER_CACHE_TTL}s (their cache TTL)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import sys
+import threading
+from datetime import date
+import numpy as np
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from config import (PREDICTOR_ALPHAS, PREDICTOR_BETA, PREDICTOR_GAMMA,
+                    PREDICTOR_PHI, PREDICTOR_HISTORY_DAYS)
+
+
+class ProgressPredictor:
+    """
+    Forecasts each user's daily completion percentage.
+
+    The model is additive Holt-Winters: an exponentially weighted level, a
+    damped trend and a day-of-week seasonal term, run for every level
+    smoothing factor in `alphas` at once; each user is scored with the
+    factor that had the lowest one-step-ahead error on their history.
+
+    All users are filtered together: the history is laid out as a
+    (users x calendar days) matrix and the recursion steps through the days,
+    updating every user with one set of NumPy operations per day. Days
+    without tasks carry no signal and leave a user's state unchanged.
+
+    The filtered state is cached per user, so update() only has to run the
+    days that arrived since the user's last update.
+    """
+
+    def __init__(self, alphas=PREDICTOR_ALPHAS, beta=PREDICTOR_BETA, gamma=PREDICTOR_GAMMA,
+                 phi=PREDICTOR_PHI, history_days=PREDICTOR_HISTORY_DAYS):
+        self.alphas = np.asarray(alphas, dtype=np.float64)
+        self.beta = beta
+        self.gamma = gamma
+        self.phi = phi
+        self.history_days = history_days
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every user's fitted state."""
+        grid = len(self.alphas)
+        self._rows = {}                                     # {user_id: row}
+        self._user_ids = []                                 # row -> user_id
+        self.level = np.zeros((0, grid))
+        self.trend = np.zeros((0, grid))
+        self.season = np.zeros((0, grid, 7))
+        self.sse = np.zeros((0, grid))
+        self.observations = np.zeros(0, dtype=np.int64)
+        self.last_day = np.zeros(0, dtype=np.int64)         # days since 1970-01-01
+
+    def __len__(self):
+        return len(self._user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self._rows
+
+    @staticmethod
+    def day_of_week(days):
+        # 1970-01-01 was a Thursday; Monday = 0
+        return (np.asarray(days) + 3) % 7
+
+    def _rows_for(self, user_ids):
+        rows = np.empty(len(user_ids), dtype=np.int64)
+        new = 0
+        for i, user_id in enumerate(user_ids.tolist()):
+            row = self._rows.get(user_id)
+            if row is None:
+                row = self._rows[user_id] = len(self._user_ids)
+                self._user_ids.append(user_id)
+                new += 1
+            rows[i] = row
+        if new:
+            grid = len(self.alphas)
+            self.level = np.concatenate([self.level, np.zeros((new, grid))])
+            self.trend = np.concatenate([self.trend, np.zeros((new, grid))])
+            self.season = np.concatenate([self.season, np.zeros((new, grid, 7))])
+            self.sse = np.concatenate([self.sse, np.zeros((new, grid))])
+            self.observations = np.concatenate([self.observations, np.zeros(new, dtype=np.int64)])
+            self.last_day = np.concatenate([self.last_day, np.full(new, np.iinfo(np.int64).min)])
+        return rows
+
+    def update(self, user_ids, dates, completed_task, total_task, today=None):
+        """
+        Feed new plan_status rows (a columnar export) into the model.
+
+        Only days before `today` are used: today's and future plans are
+        still open, and feeding one would move the user's last fed day past
+        the days still to come in. Rows at or before a user's last fed day
+        are ignored, so the same export can be fed again after it grows.
+        Only the last `history_days` days before `today` are used.
+
+        Args:
+            user_ids (array-like): User of every row.
+            dates (array-like): Plan date of every row (anything
+                np.datetime64 accepts).
+            completed_task (array-like): Completed tasks of every row.
+            total_task (array-like): Total tasks of every row.
+            today (date, optional): Cutoff day, defaults to date.today().
+
+        Returns:
+            int: Number of users whose state changed.
+        """
+        cutoff = np.datetime64(date.today() if today is None else today, "D").astype(np.int64)
+        user_ids = np.asarray(user_ids)
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        completed_task = np.asarray(completed_task, dtype=np.float64)
+        total_task = np.asarray(total_task, dtype=np.float64)
+        if not len(user_ids):
+            return 0
+
+        with self._lock:
+            unique_users, inverse = np.unique(user_ids, return_inverse=True)
+            rows = self._rows_for(unique_users)[inverse]
+
+            # days with no tasks carry no completion signal
+            keep = (total_task > 0) & (days > self.last_day[rows]) & (days < cutoff)
+            keep &= days >= cutoff - self.history_days
+            if not keep.any():
+                return 0
+            rows, days = rows[keep], days[keep]
+            y = completed_task[keep] / total_task[keep] * 100
+
+            active, local = np.unique(rows, return_inverse=True)
+            first_day = days.min()
+            history = np.full((len(active), days.max() - first_day + 1), np.nan)
+            history[local, days - first_day] = y
+
+            level, trend = self.level[active], self.trend[active]
+            season, sse = self.season[active], self.sse[active]
+            observations = self.observations[active]
+            self._filter(history, first_day, level, trend, season, sse, observations)
+
+            self.level[active], self.trend[active] = level, trend
+            self.season[active], self.sse[active] = season, sse
+            self.observations[active] = observations
+            np.maximum.at(self.last_day, rows, days)
+            return len(active)
+
+    def _filter(self, history, first_day, level, trend, season, sse, observations):
+        # state arrays are (users, alphas[, 7]) and updated in place; every
+        # step runs dense over all users, masking out those without a value
+        alphas, beta, gamma, phi = self.alphas, self.beta, self.gamma, self.phi
+        dow = self.day_of_week(first_day + np.arange(history.shape[1]))
+        columns = np.ascontiguousarray(history.T)             # (days, users)
+        by_dow = np.ascontiguousarray(np.moveaxis(season, 2, 0))   # (7, users, alphas)
+
+        for t in range(columns.shape[0]):
+            y = columns[t][:, None]
+            seen = ~np.isnan(y)
+            if not seen.any():
+                continue
+            first = seen & (observations == 0)[:, None]
+            step = seen & ~first
+            y = np.where(seen, y, 0.0)
+            ssn = by_dow[dow[t]]
+
+            damped = level + phi * trend
+            error = y - damped - ssn
+            new_level = alphas * (y - ssn) + (1 - alphas) * damped
+            new_trend = beta * (new_level - level) + (1 - beta) * phi * trend
+            new_season = gamma * (y - new_level) + (1 - gamma) * ssn
+
+            sse += np.where(step, error * error, 0.0)
+            trend[:] = np.where(step, new_trend, np.where(first, 0.0, trend))
+            ssn[:] = np.where(step, new_season, np.where(first, 0.0, ssn))
+            level[:] = np.where(step, new_level, np.where(first, y, level))
+            observations += seen[:, 0]
+
+        season[:] = np.moveaxis(by_dow, 0, 2)
+
+    def predict(self, user_ids=None, horizons=(7, 30), today=None):
+        """
+        Mean forecast completion percentage over the next days.
+
+        Args:
+            user_ids (list, optional): Users to score; every known user if omitted.
+            horizons (tuple[int]): Forecast windows in days.
+            today (date, optional): Forecasts start the day after `today`;
+                defaults to each user's last fed day.
+
+        Returns:
+            dict: {"user_id": array, h: array of mean forecast % (0-100,
+            NaN for users without history) for every h in horizons}.
+
+        Raises:
+            KeyError: If a user has never been fed.
+        """
+        with self._lock:
+            if user_ids is None:
+                user_ids = list(self._user_ids)
+            rows = np.array([self._rows[user_id] for user_id in user_ids], dtype=np.int64)
+
+            # the alpha with the lowest mean squared one-step error
+            best = np.argmin(self.sse[rows] / np.maximum(self.observations[rows] - 1, 1)[:, None], axis=1)
+            pick = np.arange(len(rows))
+            level = self.level[rows, best]
+            trend = self.trend[rows, best]
+            season = self.season[rows, best]
+            observations = self.observations[rows]
+            # users never fed a day with tasks get NaN; give them a finite day
+            last_day = np.where(observations > 0, self.last_day[rows], 0)
+
+        if today is None:
+            start = last_day
+        else:
+            start = np.maximum(last_day, np.datetime64(today, "D").astype(np.int64))
+        steps = np.arange(1, max(horizons) + 1)
+        # (users, days ahead); days between the last fed day and `start`
+        # still damp the trend
+        ahead = (start - last_day)[:, None] + steps
+        damping = np.cumsum(self.phi ** np.arange(1, ahead.max(initial=steps[-1]) + 1))[ahead - 1]
+        dow = self.day_of_week(start[:, None] + steps)
+        forecast = level[:, None] + damping * trend[:, None] + season[pick[:, None], dow]
+        forecast = np.clip(forecast, 0, 100)
+        forecast[observations == 0] = np.nan
+
+        result = {"user_id": np.asarray(user_ids)}
+        for h in horizons:
+            result[h] = forecast[:, :h].mean(axis=1)
+        return result
+
+    def predict_user(self, user_id, horizons=(7, 30), today=None):
+        """
+        Returns:
+            dict: {h: forecast %} for one user, or None if the user has no history.
+        """
+        if user_id not in self:
+            return None
+        result = self.predict([user_id], horizons, today)
+        if np.isnan(result[horizons[0]][0]):
+            return None
+        return {h: round(float(result[h][0]), 2) for h in horizons}
+
+    def update_plan_status(self, user_id, plan_status, today=None):
+        """
+        Feed one user's PlanDate.plan_status DataFrame (see update).
+
+        Returns:
+            int: 1 if the user's state changed, else 0.
+        """
+        if plan_status is None or plan_status.empty:
+            return 0
+        return self.update(
+            np.full(len(plan_status), user_id, dtype=object),
+            plan_status["Date"].to_numpy(dtype="datetime64[D]"),
+            plan_status["completed_task"].to_numpy(),
+            plan_status["total_task"].to_numpy(),
+            today,
+        )
+
+    @staticmethod
+    def load_export(since=None):
+        """
+        Export daily_plan as columns, ordered by user and date.
+
+        Args:
+            since (date, optional): Only plans on or after this date.
+
+        Returns:
+            dict: {"user_id", "plan_date", "completed_task", "total_task"} arrays.
+        """
+        sql = "SELECT user_id, plan_date, completed_task, total_task FROM daily_plan"
+        args = ()
+        if since is not None:
+            sql += " WHERE plan_date >= %s"
+            args = (since,)
+        sql += " ORDER BY user_id, plan_date"
+
+        with SqlConnection() as connect:
+            with connect.connection.cursor() as cursor:
+                cursor.execute(sql, args)
+                rows = cursor.fetchall()
+
+        return {
+            "user_id": np.array([row["user_id"] for row in rows], dtype=object),
+            "plan_date": np.array([row["plan_date"] for row in rows], dtype="datetime64[D]"),
+            "completed_task": np.array([row["completed_task"] or 0 for row in rows], dtype=np.int64),
+            "total_task": np.array([row["total_task"] or 0 for row in rows], dtype=np.int64),
+        }
+
+    def update_from_export(self, export, today=None):
+        return self.update(export["user_id"], export["plan_date"],
+                           export["completed_task"], export["total_task"], today)
+
+
+progress_predictor = ProgressPredictor()
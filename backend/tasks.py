@@ -3,13 +3,20 @@ import numpy as np
 import streamlit as st
 import os 
 import sys
+import atexit
+import threading
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 from streamlit_echarts import st_echarts
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 
-from backend.database import SqlConnection
+from backend.database import SqlConnection, SchemaRegistry
+from backend.utils import IdAllocator
+from backend.cache import user_data_cache
+from backend.counters import CounterServices
 from models.task_model import UserTasks
+from config import WRITE_BEHIND_WINDOW
 
 class PlanServies:
     @staticmethod
@@ -24,47 +31,43 @@ class PlanServies:
             return "p"+str(pid)
     
     @staticmethod
-    def generate_plan_id():
+    def generate_plan_id(cursor=None):
         """
-        Generate a new user ID by checking the database for existing users
-        
+        Generate a new plan ID from the "plan" id sequence
+
+        Args:
+            cursor (optional): Cursor of an open transaction. The ID is then
+                reserved inside that transaction and released again if it
+                rolls back. Without a cursor a pooled connection is used and
+                the reservation is committed immediately.
+
         Returns:
-            int: Next available user ID
-            
+            str: Next available plan ID (e.g. "p0001")
+
         Raises:
             Exception: If database connection fails or other database errors occur
         """
+        if cursor is not None:
+            return PlanServies.create_ids(IdAllocator.reserve(cursor, "plan"))
+
         connect = SqlConnection()
-        
+
         try:
             if not connect.connect():
                 raise Exception("Failed to connect to database")
-            
-            # Check if users table exists
-            table_check_sql = "SHOW TABLES LIKE 'daily_plan'"
-            with connect.connection.cursor() as cursor:
-                cursor.execute(table_check_sql)
-                table_exists = cursor.fetchone()
-                
-                if not table_exists:
-                    raise Exception("daily_plan table does not exist in database")
-            
-            # Get the count of existing users
-            count_sql = "SELECT MAX(CAST(SUBSTRING(plan_id, 2) AS UNSIGNED)) AS max_id FROM daily_plan"
+
+            # Check if daily_plan table exists (cached)
+            SchemaRegistry.require_table(connect, "daily_plan")
+
             with connect.connection.cursor() as cursor:
-                cursor.execute(count_sql)
-                result = cursor.fetchone()
-                
-                if result and result['max_id'] is not None:
-                    pid = result['max_id'] + 1
-                else:
-                    pid = 1
-            return PlanServies.create_ids(pid)
-            
+                new_plan_id = PlanServies.create_ids(IdAllocator.reserve(cursor, "plan"))
+            connect.connection.commit()
+            return new_plan_id
+
         except Exception as e:
             print(f"Error generating plan ID: {e}")
             raise e
-            
+
         finally:
             connect.disconnect()
 
@@ -114,8 +117,8 @@ class PlanServies:
                 if existing:
                     raise Exception(f"Plan already exists for user {user_id} on {new_date}")
 
-                # 🔑 Generate new plan_id
-                new_plan_id = PlanServies.generate_plan_id()
+                # 🔑 Reserve new plan_id inside this transaction
+                new_plan_id = PlanServies.generate_plan_id(cursor)
 
                 # 📝 Insert into daily_plan
                 insert_sql = """
@@ -126,6 +129,7 @@ class PlanServies:
 
                 # 💾 Commit the transaction
                 connect.connection.commit()
+                user_data_cache.invalidate(user_id)
 
                 return new_plan_id
 
@@ -140,13 +144,15 @@ class PlanServies:
             connect.disconnect()
 
     @staticmethod
-    def delete_plan(plan_id):
+    def delete_plan(plan_id, user_id=None):
         """
         Delete a daily plan and its associated tasks.
         (tasks will be auto-deleted because of ON DELETE CASCADE)
 
         Args:
             plan_id (str): Unique plan ID to delete.
+            user_id (str, optional): Owner of the plan, whose cached reads
+                are invalidated. Without it the whole cache is dropped.
 
         Returns:
             bool: True if deletion successful, False otherwise.
@@ -163,6 +169,7 @@ class PlanServies:
                 delete_plan_sql = "DELETE FROM daily_plan WHERE plan_id = %s"
                 cursor.execute(delete_plan_sql, (plan_id,))
                 connect.connection.commit()
+                user_data_cache.invalidate(user_id)
                 return True
 
         except Exception as e:
@@ -174,6 +181,206 @@ class PlanServies:
         finally:
             connect.disconnect()
 
+class TaskWriteQueue:
+    """
+    Write-behind queue for task status toggles and deletions.
+
+    Changes are applied to the caller's UserTasks immediately and queued
+    per task (plan_id, title). Repeated changes to one task coalesce, and a
+    toggle that returns a task to its stored status cancels out. The queue
+    is flushed `window` seconds after the first queued change, as batched
+    UPDATE/DELETE statements in one transaction. flush() is also called on
+    logout and at process exit.
+
+    Deletes match rows by (plan_id, title), so a title re-added while its
+    delete is still queued must take that delete over (claim_deletes);
+    otherwise the flush would delete the new row as well.
+    """
+
+    def __init__(self, window=WRITE_BEHIND_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}   # {(plan_id, title): {"op", "status", "stored", "user_id"}}
+        self._timer = None
+
+    def toggle(self, user_id, user_tasks_obj, date, title):
+        """
+        Flip a task between Completed and Incomplete.
+
+        Returns:
+            str: The task's new status.
+        """
+        plan_id, tasks = self._locate(user_id, user_tasks_obj, date, title)
+        old_status = tasks[title]
+        new_status = "Incomplete" if old_status == "Completed" else "Completed"
+
+        # ✅ Apply optimistically
+        tasks[title] = new_status
+        if date in user_tasks_obj.plan_status_store:
+            completed_task = user_tasks_obj.plan_status_store.get(date)[0]
+            completed_task += 1 if new_status == "Completed" else -1
+            user_tasks_obj.plan_status_store.update(date, completed_task=completed_task)
+
+        with self._lock:
+            entry = self._pending.get((plan_id, title))
+            stored = entry["stored"] if entry else old_status
+            if new_status == stored:
+                self._pending.pop((plan_id, title), None)   # back to what the database has
+            else:
+                self._pending[(plan_id, title)] = {
+                    "op": "status", "status": new_status, "stored": stored, "user_id": user_id
+                }
+            self._schedule()
+        return new_status
+
+    def remove(self, user_id, user_tasks_obj, date, title):
+        """
+        Delete a task.
+        """
+        plan_id, tasks = self._locate(user_id, user_tasks_obj, date, title)
+        status = tasks.pop(title)
+
+        # ✅ Apply optimistically
+        if date in user_tasks_obj.plan_status_store:
+            completed_task, total_task, _ = user_tasks_obj.plan_status_store.get(date)
+            user_tasks_obj.plan_status_store.update(
+                date,
+                completed_task=completed_task - (1 if status == "Completed" else 0),
+                total_task=total_task - 1
+            )
+
+        with self._lock:
+            entry = self._pending.get((plan_id, title))
+            stored = entry["stored"] if entry else status
+            self._pending[(plan_id, title)] = {
+                "op": "delete", "status": None, "stored": stored, "user_id": user_id
+            }
+            self._schedule()
+
+    @staticmethod
+    def _locate(user_id, user_tasks_obj, date, title):
+        if not user_id or not isinstance(user_id, str):
+            raise ValueError("Invalid user_id")
+        if not isinstance(user_tasks_obj, UserTasks):
+            raise ValueError("user_tasks_obj must be an instance of UserTasks")
+        plan_id = user_tasks_obj.plan_id_for_date(date)
+        if not plan_id:
+            raise ValueError(f"No plan found for date {date} and user {user_id}")
+        tasks = user_tasks_obj.user_tasks.get(date, {})
+        if title not in tasks:
+            raise ValueError(f"No task '{title}' on {date}")
+        return plan_id, tasks
+
+    def _schedule(self):
+        # caller holds self._lock
+        if self._timer is None and self._pending:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    @contextmanager
+    def claim_deletes(self, plan_id, titles):
+        """
+        Take the queued deletes of `titles` on `plan_id` out of the queue,
+        for a caller about to insert those titles again. The caller deletes
+        the stored rows in its own transaction, before the INSERT. No flush
+        runs during the block, and the deletes are queued again if it fails.
+
+        Yields:
+            list[str]: Titles whose stored row has to be deleted first.
+        """
+        with self._flush_lock:
+            with self._lock:
+                claimed = {}
+                for title in titles:
+                    entry = self._pending.get((plan_id, title))
+                    if entry is not None and entry["op"] == "delete":
+                        claimed[(plan_id, title)] = self._pending.pop((plan_id, title))
+            try:
+                yield [title for _, title in claimed]
+            except BaseException:
+                with self._lock:
+                    for key, entry in claimed.items():
+                        self._pending.setdefault(key, entry)
+                    self._schedule()
+                raise
+
+    def flush(self):
+        """
+        Write every queued change in one transaction.
+
+        Returns:
+            int: Number of task changes written.
+
+        Raises:
+            Exception: If the database write fails; the changes are queued
+                again (unless superseded meanwhile) for the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch, self._pending = self._pending, {}
+
+            if not batch:
+                return 0
+
+            completed = [key for key, e in batch.items() if e["op"] == "status" and e["status"] == "Completed"]
+            incomplete = [key for key, e in batch.items() if e["op"] == "status" and e["status"] == "Incomplete"]
+            deleted = [key for key, e in batch.items() if e["op"] == "delete"]
+
+            connect = SqlConnection()
+            try:
+                if not connect.connect():
+                    raise Exception("Failed to connect to database")
+
+                with connect.connection.cursor() as cursor, \
+                        CounterServices.bulk_writes(cursor, {plan_id for plan_id, _ in batch}):
+                    # incomplete_reason must be NULL for Completed, non-NULL for Incomplete
+                    for keys, status, reason in ((completed, "Completed", None), (incomplete, "Incomplete", "")):
+                        if keys:
+                            cursor.execute(
+                                "UPDATE tasks SET status = %s, incomplete_reason = %s "
+                                "WHERE (plan_id, title) IN (" + ", ".join(["(%s, %s)"] * len(keys)) + ")",
+                                (status, reason, *[v for key in keys for v in key])
+                            )
+                    if deleted:
+                        cursor.execute(
+                            "DELETE FROM tasks WHERE (plan_id, title) IN ("
+                            + ", ".join(["(%s, %s)"] * len(deleted)) + ")",
+                            tuple(v for key in deleted for v in key)
+                        )
+
+                connect.connection.commit()
+
+            except Exception as e:
+                if connect.connection:
+                    connect.connection.rollback()
+                print(f"Error flushing task changes: {e}")
+                with self._lock:
+                    for key, entry in batch.items():
+                        self._pending.setdefault(key, entry)
+                    self._schedule()
+                raise e
+
+            finally:
+                connect.disconnect()
+
+            for user_id in {e["user_id"] for e in batch.values()}:
+                user_data_cache.invalidate(user_id)
+            return len(batch)
+
+
+task_write_queue = TaskWriteQueue()
+atexit.register(task_write_queue.flush)
+
+
 class TaskSerives:
 
     @staticmethod
@@ -201,6 +408,9 @@ class TaskSerives:
         # Check if any tasks exist for that date
         if user_tasks.user_tasks and new_date in user_tasks.user_tasks:
             return True
+        # Plans of months whose tasks are not loaded yet
+        if user_tasks.plan_id_for_date(new_date) is not None:
+            return True
         return False
 
     @staticmethod
@@ -246,7 +456,7 @@ class TaskSerives:
             - plan_status DataFrame
             - plan_ids dictionary
             - user_tasks.user_tasks dictionary
-            - user_tasks.show_user_task dictionary (sorted order)
+            - user_tasks.show_user_task view (sorted order)
 
         Args:
             user_id (str): User ID (e.g., "u0001").
@@ -274,40 +484,17 @@ class TaskSerives:
 
         # ✅ Step 4: Update in-memory objects
 
-        # --- 4.1 Update plan_ids ---
-        user_tasks_obj.plan_ids[new_plan_id] = new_date
-
-        # --- 4.2 Update plan_status DataFrame ---
-        new_row = {
-            "Date": new_date,
-            "completed_task": 0,
-            "total_task": 0,
-            "completion_percentage": 0.0,
-        }
-        user_tasks_obj.plan_status = pd.concat(
-            [user_tasks_obj.plan_status, pd.DataFrame([new_row])],
-            ignore_index=True
-        )
+        # --- 4.1 Update plan_ids (and date → plan_id index) ---
+        user_tasks_obj.index_plan(new_plan_id, new_date)
+
+        # --- 4.2 Update plan_status (appended to its row buffer, no copy) ---
+        user_tasks_obj.plan_status_store.append(new_date, completed_task=0, total_task=0)
 
         # --- 4.3 Update user_tasks dict ---
         user_tasks_obj.user_tasks[new_date] = {}   # empty task list for that date
 
-        # --- 4.4 Update show_user_task dict (maintain sorting) ---
-        user_tasks_obj.show_user_task[new_date] = {}
-
-        today = date.today()
-
-        def custom_sort(d):
-            d = datetime.strptime(d, "%Y-%m-%d").date()
-            if d == today:
-                return (0, 0)  # today first
-            elif d > today:
-                return (1, (d - today).days)  # future ascending
-            else:
-                return (2, -(d - today).days)  # past descending
-
-        sorted_items = sorted(user_tasks_obj.show_user_task.items(), key=lambda x: custom_sort(x[0]))
-        user_tasks_obj.show_user_task = dict(sorted_items)
+        # --- 4.4 Update show_user_task (ShowTaskView keeps the sort order) ---
+        user_tasks_obj.show_user_task[new_date] = user_tasks_obj.user_tasks[new_date]
 
         return new_plan_id
 
@@ -329,32 +516,24 @@ class TaskSerives:
             raise ValueError("Invalid date format, expected 'YYYY-MM-DD'")
 
         # 1. Find plan_id for the given date
-        plan_id_to_delete = None
-        for pid, d in user_tasks_obj.plan_ids.items():
-            if str(d) == date:
-                plan_id_to_delete = pid
-                break
+        plan_id_to_delete = user_tasks_obj.plan_id_for_date(date)
 
         if not plan_id_to_delete:
             raise ValueError(f"No plan found for date {date} and user {user_id}")
 
         # 2. Delete from database
         try:
-            PlanServies.delete_plan(plan_id_to_delete)
+            PlanServies.delete_plan(plan_id_to_delete, user_id)
         except Exception as e:
             print(f"Database deletion failed: {e}")
             raise e
 
         # 3. Remove from in-memory structures
-        # (a) plan_ids
-        if plan_id_to_delete in user_tasks_obj.plan_ids:
-            del user_tasks_obj.plan_ids[plan_id_to_delete]
+        # (a) plan_ids (and date → plan_id index)
+        user_tasks_obj.unindex_plan(plan_id_to_delete)
 
         # (b) plan_status (filter out the row with this date)
-        if not user_tasks_obj.plan_status.empty:
-            user_tasks_obj.plan_status = user_tasks_obj.plan_status[
-                user_tasks_obj.plan_status["Date"] != date
-            ].reset_index(drop=True)
+        user_tasks_obj.drop_plan_status(date)
 
         # (c) user_tasks
         if date in user_tasks_obj.user_tasks:
@@ -367,12 +546,179 @@ class TaskSerives:
         return True
 
     @staticmethod
-    def add_task(user_id,user_tasks_obj,date,task):
-        pass
+    def create_ids(tid):
+        if(isinstance(tid,str)):
+            raise ValueError
+        id_len = 4
+        if(len(str(tid)) <= 4):
+            prefix_len = id_len - len(str(tid))
+            return "t"+"0"*prefix_len+str(tid)
+        else:
+            return "t"+str(tid)
+
+    @staticmethod
+    def add_task(user_id, user_tasks_obj, date, task):
+        """
+        Add one task to the plan of `date` (see add_tasks).
+
+        Returns:
+            str: The new task_id, or None if the task was rejected.
+        """
+        task_ids = TaskSerives.add_tasks(user_id, user_tasks_obj, date, [task])
+        return task_ids[0] if task_ids else None
 
     @staticmethod
-    def add_task_databases(user_id,user_tasks_obj,date,task):
-        pass
+    def add_tasks(user_id, user_tasks_obj, date, tasks):
+        """
+        Add many tasks to the plan of `date` with one batched INSERT and
+        update the in-memory UserTasks incrementally.
+
+        Steps:
+        1. Validate titles; drop blanks and titles already on that date.
+        2. Insert all tasks in one transaction (add_task_databases).
+        3. Update:
+            - user_tasks[date] (shared with show_user_task)
+            - plan_status total_task for the date
+
+        Args:
+            user_id (str): User ID (e.g., "u0001").
+            user_tasks_obj (UserTasks): Instance of UserTasks class.
+            date (str): Plan date in "YYYY-MM-DD" format.
+            tasks (list[str]): Task titles.
+
+        Returns:
+            list[str]: task_ids of the inserted tasks, in input order.
+
+        Raises:
+            ValueError: If inputs are invalid or no plan exists for the date.
+            Exception: If database errors occur.
+        """
+        if not user_id or not isinstance(user_id, str):
+            raise ValueError("Invalid user_id")
+        if not isinstance(user_tasks_obj, UserTasks):
+            raise ValueError("user_tasks_obj must be an instance of UserTasks")
+        if not date or not isinstance(date, str):
+            raise ValueError("Invalid date format, expected 'YYYY-MM-DD'")
+
+        # ✅ Step 1: Validate titles
+        existing = user_tasks_obj.user_tasks.get(date, {})
+        titles = []
+        for task in tasks:
+            title = str(task).strip() if task is not None else ""
+            if not title:
+                continue
+            if len(title) > 255:
+                raise ValueError("Task title cannot exceed 255 characters")
+            if title in existing or title in titles:
+                st.warning(f"Task '{title}' already exists on this date")
+                continue
+            titles.append(title)
+
+        if not titles:
+            return []
+
+        # ✅ Step 2: Add tasks into DB
+        task_ids = TaskSerives.add_task_databases(user_id, user_tasks_obj, date, titles)
+
+        # ✅ Step 3: Update in-memory objects
+        if date in user_tasks_obj.user_tasks:
+            task_dict = user_tasks_obj.user_tasks[date]
+            for title in titles:
+                task_dict[title] = "Incomplete"
+
+        if date in user_tasks_obj.plan_status_store:
+            total_task = user_tasks_obj.plan_status_store.get(date)[1]
+            user_tasks_obj.plan_status_store.update(date, total_task=total_task + len(titles))
+
+        return task_ids
+
+    @staticmethod
+    def add_task_databases(user_id, user_tasks_obj, date, task):
+        """
+        Insert one or many tasks for the plan of `date` in a single
+        transaction: task_ids are reserved as one block and the rows go in
+        with one executemany (a multi-row INSERT). Rows of titles whose
+        removal is still queued in task_write_queue are deleted first.
+
+        Args:
+            user_id (str): User ID owning the plan.
+            user_tasks_obj (UserTasks): Used to resolve date → plan_id.
+            date (str): Plan date in "YYYY-MM-DD" format.
+            task (str | list[str]): Validated task title(s).
+
+        Returns:
+            list[str]: task_ids of the inserted tasks.
+
+        Raises:
+            ValueError: If there is no plan for the date.
+            Exception: If database errors occur.
+        """
+        titles = [task] if isinstance(task, str) else list(task)
+        if not titles:
+            return []
+
+        plan_id = user_tasks_obj.plan_id_for_date(date)
+        if not plan_id:
+            raise ValueError(f"No plan found for date {date} and user {user_id}")
+
+        connect = SqlConnection()
+        try:
+            if not connect.connect():
+                raise Exception("Failed to connect to database")
+
+            # 🗑️ Titles removed and re-added before the delete was flushed
+            with task_write_queue.claim_deletes(plan_id, titles) as replaced:
+                with connect.connection.cursor() as cursor:
+                    # 🔑 Reserve a block of task_ids inside this transaction
+                    first_id = IdAllocator.reserve(cursor, "task", len(titles))
+                    task_ids = [TaskSerives.create_ids(first_id + i) for i in range(len(titles))]
+
+                    # 📝 Insert all tasks in one statement, counters updated once
+                    # (incomplete_reason must be non-NULL for Incomplete tasks)
+                    insert_sql = """
+                        INSERT INTO tasks (task_id, plan_id, title, status, incomplete_reason)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """
+                    with CounterServices.bulk_writes(cursor, [plan_id]):
+                        if replaced:
+                            cursor.execute(
+                                "DELETE FROM tasks WHERE plan_id = %s AND title IN ("
+                                + ", ".join(["%s"] * len(replaced)) + ")",
+                                (plan_id, *replaced)
+                            )
+                        cursor.executemany(insert_sql, [
+                            (task_id, plan_id, title, "Incomplete", "")
+                            for task_id, title in zip(task_ids, titles)
+                        ])
+
+                # 💾 Commit the transaction
+                connect.connection.commit()
+            user_data_cache.invalidate(user_id)
+            return task_ids
+
+        except Exception as e:
+            # ❌ Rollback on error
+            if connect.connection:
+                connect.connection.rollback()
+            print(f"Error adding tasks: {e}")
+            raise e
+
+        finally:
+            connect.disconnect()
+
+    @staticmethod
+    def toggle_task(user_id, user_tasks_obj, date, task):
+        """
+        Toggle a task's status; written to the database by task_write_queue.
+        """
+        return task_write_queue.toggle(user_id, user_tasks_obj, date, task)
+
+    @staticmethod
+    def remove_task(user_id, user_tasks_obj, date, task):
+        """
+        Remove a task; deleted from the database by task_write_queue.
+        """
+        task_write_queue.remove(user_id, user_tasks_obj, date, task)
 
     @staticmethod
     def get_date_detail(date_str: str) -> str:
@@ -0,0 +1,119 @@
+"""
+Retention of the deleted_rows tombstones read by UserTasks.sync. Run as a
+module to purge the expired ones:
+
+    python -m backend.tombstones [--retention SECONDS] [--batch-size N]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from config import TOMBSTONE_RETENTION_SECONDS, TOMBSTONE_PURGE_BATCH, TOMBSTONE_PURGE_INTERVAL
+
+
+class TombstoneServices:
+    """
+    Deletes tombstones older than the retention period.
+
+    A session whose last sync is older than the retained tombstones could
+    miss deletions, so UserTasks.sync reloads such sessions from scratch.
+    The app also starts a purge in the background at most once per
+    TOMBSTONE_PURGE_INTERVAL per process (purge_if_due).
+    """
+
+    _lock = threading.Lock()
+    _last_purge = None   # time.monotonic() of the last purge started here
+
+    @staticmethod
+    def purge(retention=TOMBSTONE_RETENTION_SECONDS, batch_size=TOMBSTONE_PURGE_BATCH):
+        """
+        Delete tombstones older than `retention` seconds, oldest first,
+        `batch_size` rows per transaction.
+
+        Returns:
+            dict: {"deleted", "batches", "seconds"}
+
+        Raises:
+            ValueError: If retention is negative or batch_size is not positive.
+            Exception: If database errors occur.
+        """
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if retention < 0:
+            raise ValueError("retention must not be negative")
+
+        report = {"deleted": 0, "batches": 0}
+        started = time.perf_counter()
+
+        with SqlConnection() as connect:
+            with connect.connection.cursor() as cursor:
+                # one cutoff for the whole run
+                cursor.execute(
+                    "SELECT CURRENT_TIMESTAMP - INTERVAL %s SECOND AS cutoff", (int(retention),)
+                )
+                cutoff = cursor.fetchone()["cutoff"]
+                while True:
+                    try:
+                        cursor.execute(
+                            "DELETE FROM deleted_rows WHERE deleted_at < %s ORDER BY deleted_at LIMIT %s",
+                            (cutoff, batch_size)
+                        )
+                        deleted = cursor.rowcount
+                        connect.connection.commit()
+                    except Exception as e:
+                        connect.connection.rollback()
+                        print(f"Error purging tombstones: {e}")
+                        raise e
+
+                    report["deleted"] += deleted
+                    report["batches"] += 1
+                    if deleted < batch_size:
+                        break
+
+        report["seconds"] = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def purge_if_due(interval=TOMBSTONE_PURGE_INTERVAL):
+        """
+        Start purge() on a background thread unless this process started
+        one less than `interval` seconds ago.
+
+        Returns:
+            bool: True if a purge was started.
+        """
+        now = time.monotonic()
+        with TombstoneServices._lock:
+            last = TombstoneServices._last_purge
+            if last is not None and now - last < interval:
+                return False
+            TombstoneServices._last_purge = now
+
+        def run():
+            try:
+                TombstoneServices.purge()
+            except Exception as e:
+                print(f"Background tombstone purge failed: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge expired deleted_rows tombstones")
+    parser.add_argument("--retention", type=int, default=TOMBSTONE_RETENTION_SECONDS,
+                        help="keep tombstones younger than this many seconds")
+    parser.add_argument("--batch-size", type=int, default=TOMBSTONE_PURGE_BATCH)
+    args = parser.parse_args()
+
+    report = TombstoneServices.purge(retention=args.retention, batch_size=args.batch_size)
+    print(f"{report['deleted']} tombstones purged in {report['batches']} batches, {report['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 -- 🔹 TRIGGERS FOR TASKS TABLE
+-- Counter updates are skipped while @disable_counter_triggers is set;
+-- backend.counters.CounterServices.bulk_writes then recomputes the
+-- affected plans once with a grouped aggregate.
 
 DELIMITER $$
 
@@ -7,10 +10,12 @@ CREATE TRIGGER trg_task_insert
 AFTER INSERT ON tasks
 FOR EACH ROW
 BEGIN
-    UPDATE daily_plan
-    SET total_task = total_task + 1,
-        completed_task = completed_task + IF(NEW.status = 'Completed', 1, 0)
-    WHERE plan_id = NEW.plan_id;
+    IF @disable_counter_triggers IS NULL THEN
+        UPDATE daily_plan
+        SET total_task = total_task + 1,
+            completed_task = completed_task + IF(NEW.status = 'Completed', 1, 0)
+        WHERE plan_id = NEW.plan_id;
+    END IF;
 END$$
 
 
@@ -20,14 +25,12 @@ AFTER UPDATE ON tasks
 FOR EACH ROW
 BEGIN
     -- Adjust completed_task count if status changed
-    IF OLD.status <> NEW.status THEN
+    -- (any status other than Completed counts as not completed)
+    IF NOT (OLD.status <=> NEW.status) AND @disable_counter_triggers IS NULL THEN
         UPDATE daily_plan
-        SET completed_task = completed_task 
-            + (CASE 
-                   WHEN NEW.status = 'Completed' AND OLD.status = 'Incomplete' THEN 1
-                   WHEN NEW.status = 'Incomplete' AND OLD.status = 'Completed' THEN -1
-                   ELSE 0
-               END)
+        SET completed_task = completed_task
+            + IF(NEW.status = 'Completed', 1, 0)
+            - IF(OLD.status = 'Completed', 1, 0)
         WHERE plan_id = NEW.plan_id;
     END IF;
 END$$
@@ -38,10 +41,30 @@ CREATE TRIGGER trg_task_delete
 AFTER DELETE ON tasks
 FOR EACH ROW
 BEGIN
-    UPDATE daily_plan
-    SET total_task = total_task - 1,
-        completed_task = completed_task - IF(OLD.status = 'Completed', 1, 0)
+    IF @disable_counter_triggers IS NULL THEN
+        UPDATE daily_plan
+        SET total_task = total_task - 1,
+            completed_task = completed_task - IF(OLD.status = 'Completed', 1, 0)
+        WHERE plan_id = OLD.plan_id;
+    END IF;
+
+    -- tombstone for UserTasks.sync
+    INSERT INTO deleted_rows (entity, user_id, plan_id, plan_date, title)
+    SELECT 'task', user_id, plan_id, plan_date, OLD.title
+    FROM daily_plan
     WHERE plan_id = OLD.plan_id;
 END$$
 
+
+-- 4️⃣ After DELETE on daily_plan
+-- (its tasks go by ON DELETE CASCADE, which fires no task triggers,
+--  so this one tombstone stands for all of them)
+CREATE TRIGGER trg_plan_delete
+AFTER DELETE ON daily_plan
+FOR EACH ROW
+BEGIN
+    INSERT INTO deleted_rows (entity, user_id, plan_id, plan_date)
+    VALUES ('plan', OLD.user_id, OLD.plan_id, OLD.plan_date);
+END$$
+
 DELIMITER ;
@@ -0,0 +1,75 @@
+class IdAllocator:
+    """
+    Hands out sequential ids from the id_sequence table.
+
+    Each sequence is a single row holding the last value handed out. A
+    reservation bumps that row and reads it back on the caller's cursor, so
+    it is constant-time, joins the caller's transaction (the row lock is held
+    until commit and a rollback returns the ids), and is safe across
+    processes.
+    """
+
+    # Seeds a missing sequence row from the ids already in use
+    SEEDS = {
+        "user": "SELECT COALESCE(MAX(CAST(SUBSTRING(user_id, 2) AS UNSIGNED)), 0) AS last_value FROM users",
+        "plan": "SELECT COALESCE(MAX(CAST(SUBSTRING(plan_id, 2) AS UNSIGNED)), 0) AS last_value FROM daily_plan",
+        "task": "SELECT COALESCE(MAX(CAST(SUBSTRING(task_id, 2) AS UNSIGNED)), 0) AS last_value FROM tasks",
+    }
+
+    @staticmethod
+    def reserve(cursor, name, count=1):
+        """
+        Reserve `count` consecutive ids from sequence `name`.
+
+        Args:
+            cursor: Cursor of the caller's open transaction.
+            name (str): Sequence name, e.g. "plan".
+            count (int): How many ids to reserve.
+
+        Returns:
+            int: First id of the reserved range (range is first .. first+count-1).
+
+        Raises:
+            ValueError: If count is not positive or the sequence is unknown.
+            RuntimeError: If the sequence row cannot be created.
+        """
+        if not isinstance(count, int) or count < 1:
+            raise ValueError("count must be a positive integer")
+
+        bump_sql = "UPDATE id_sequence SET last_value = last_value + %s WHERE name = %s"
+        cursor.execute(bump_sql, (count, name))
+        if cursor.rowcount == 0:
+            IdAllocator._seed(cursor, name)
+            cursor.execute(bump_sql, (count, name))
+            if cursor.rowcount == 0:
+                raise RuntimeError(f"id_sequence row '{name}' could not be created")
+
+        cursor.execute("SELECT last_value FROM id_sequence WHERE name = %s", (name,))
+        last_value = int(cursor.fetchone()["last_value"])
+        return last_value - count + 1
+
+    @staticmethod
+    def _seed(cursor, name):
+        if name not in IdAllocator.SEEDS:
+            raise ValueError(f"Unknown id sequence: {name}")
+        cursor.execute(IdAllocator.SEEDS[name])
+        last_value = int(cursor.fetchone()["last_value"])
+        try:
+            cursor.execute(
+                "INSERT INTO id_sequence (name, last_value) VALUES (%s, %s)",
+                (name, last_value)
+            )
+        except Exception as e:
+            if not IdAllocator._is_duplicate_key(e):
+                print(f"Error seeding id sequence '{name}': {e}")
+                raise e
+            # another process seeded it first; the caller retries the bump
+
+    @staticmethod
+    def _is_duplicate_key(error):
+        # pymysql reports ER_DUP_ENTRY (1062); drivers without error codes
+        # (sqlite3 in the tests) raise a bare IntegrityError
+        if type(error).__name__ != "IntegrityError":
+            return False
+        code = error.args[0] if error.args else None
+        return not isinstance(code, int) or code == 1062
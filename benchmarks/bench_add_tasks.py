@@ -0,0 +1,90 @@
+"""
+Task creation benchmark: one add_task call per task vs one batched
+add_tasks call, inserting 1, 100 and 10k tasks into a single plan.
+
+Needs the task_flow MySQL database. Creates a throwaway user and plan per
+run and deletes them afterwards:
+
+    python benchmarks/bench_add_tasks.py --sizes 1 100 10000
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from backend.tasks import TaskSerives
+from models.task_model import UserTasks
+
+BENCH_USER = "bench_tasks"
+BENCH_PLAN = "bench_tasks_p"
+BENCH_DATE = str(date.today())
+
+
+def fresh_plan():
+    with SqlConnection() as db:
+        with db.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER,))
+            cursor.execute(
+                "INSERT INTO users (user_id, username, email, password) VALUES (%s, %s, %s, %s)",
+                (BENCH_USER, "Bench", f"{BENCH_USER}@bench.local", "x")
+            )
+            cursor.execute(
+                "INSERT INTO daily_plan (plan_id, user_id, plan_date) VALUES (%s, %s, %s)",
+                (BENCH_PLAN, BENCH_USER, BENCH_DATE)
+            )
+        db.connection.commit()
+
+    user_tasks = UserTasks()
+    user_tasks.index_plan(BENCH_PLAN, BENCH_DATE)
+    user_tasks.plan_status_store.append(BENCH_DATE)
+    user_tasks.user_tasks[BENCH_DATE] = {}
+    return user_tasks
+
+
+def cleanup():
+    with SqlConnection() as db:
+        with db.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER,))
+        db.connection.commit()
+
+
+def one_by_one(user_tasks, titles):
+    for title in titles:
+        TaskSerives.add_task(BENCH_USER, user_tasks, BENCH_DATE, title)
+
+
+def batched(user_tasks, titles):
+    TaskSerives.add_tasks(BENCH_USER, user_tasks, BENCH_DATE, titles)
+
+
+def timed(add, size):
+    user_tasks = fresh_plan()
+    titles = [f"Task {i}" for i in range(size)]
+    started = time.perf_counter()
+    add(user_tasks, titles)
+    elapsed = time.perf_counter() - started
+    assert len(user_tasks.user_tasks[BENCH_DATE]) == size
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    args = parser.parse_args()
+
+    try:
+        for size in args.sizes:
+            single_ms = timed(one_by_one, size)
+            batch_ms = timed(batched, size)
+            print(f"{size:>6} tasks  one-by-one={single_ms:10.2f}ms  batched={batch_ms:9.2f}ms  "
+                  f"rows/s batched={size / (batch_ms / 1000):10.0f}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
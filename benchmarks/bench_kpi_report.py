@@ -0,0 +1,76 @@
+"""
+All-users KPI report benchmark: streams synthetic daily_plan rows (sorted
+by user, as the report query returns them) through KpiReport in chunks and
+reports throughput and peak memory. Runs in memory, no database needed:
+
+    python benchmarks/bench_kpi_report.py --rows 5000000 --users 100000
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import resource
+import numpy as np
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.kpi_report import KpiReport
+
+
+class SyntheticCursor:
+    """Generates rows on fetchmany, like a server-side cursor."""
+
+    def __init__(self, rows, users, seed=0):
+        self.rows = rows
+        self.users = users
+        self.sent = 0
+        self.rng = np.random.default_rng(seed)
+
+    def execute(self, sql, args=None):
+        self.sent = 0
+
+    def fetchmany(self, size):
+        count = min(size, self.rows - self.sent)
+        if count <= 0:
+            return []
+        # rows evenly spread over users, in user order
+        user = (np.arange(self.sent, self.sent + count) * self.users) // self.rows
+        total = self.rng.integers(0, 10, count)
+        completed = (total * self.rng.random(count)).astype(np.int64)
+        self.sent += count
+        return list(zip((f"u{u:07d}" for u in user), completed.tolist(), total.tolist()))
+
+
+class CountingWriter(io.TextIOBase):
+    """Discards output, counting characters."""
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+        return len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    for chunk_size in args.chunk_sizes:
+        out = CountingWriter()
+        started = time.perf_counter()
+        summary = KpiReport.stream(SyntheticCursor(args.rows, args.users), out, chunk_size)
+        seconds = time.perf_counter() - started
+        assert summary["users"] == args.users and summary["rows"] == args.rows
+
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"chunk={chunk_size:>7}  {seconds:6.2f}s  {args.rows / seconds:12,.0f} rows/s  "
+              f"report={out.chars / 1e6:.1f}MB  peak RSS so far={peak_mb:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
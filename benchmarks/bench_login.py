@@ -0,0 +1,73 @@
+"""
+Sign-in path benchmark: legacy three-call login vs VerifyUser.authenticate.
+
+Needs the task_flow MySQL database and an existing account:
+
+    python benchmarks/bench_login.py user@example.com 'Password@1' --runs 200
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import pymysql.cursors
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.auth import VerifyUser, UserServies
+
+QUERY_COUNT = 0
+_execute = pymysql.cursors.Cursor.execute
+
+
+def counting_execute(self, query, args=None):
+    global QUERY_COUNT
+    QUERY_COUNT += 1
+    return _execute(self, query, args)
+
+
+pymysql.cursors.Cursor.execute = counting_execute
+
+
+def legacy_login(email, password):
+    if VerifyUser.if_user_exists(email) and VerifyUser.verify_user(email, password):
+        return UserServies.user_deserialization(email)
+    return None
+
+
+def single_query_login(email, password):
+    return VerifyUser.authenticate(email, password)
+
+
+def measure(login, email, password, runs):
+    global QUERY_COUNT
+    login(email, password)  # warm the pool
+    QUERY_COUNT = 0
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        login(email, password)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "queries_per_login": QUERY_COUNT / runs,
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("email")
+    parser.add_argument("password")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    for name, login in (("legacy (3 calls)", legacy_login), ("authenticate", single_query_login)):
+        result = measure(login, args.email, args.password, args.runs)
+        print(f"{name:<18} queries/login={result['queries_per_login']:.1f} "
+              f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
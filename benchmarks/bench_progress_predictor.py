@@ -0,0 +1,73 @@
+"""
+Progress forecasting benchmark: fit every user from a columnar export,
+feed one new day incrementally, and score next-week/next-month forecasts
+for 100k users. Runs in memory on synthetic data, no database needed:
+
+    python benchmarks/bench_progress_predictor.py --users 100000 --days 180
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.progress_predictor import ProgressPredictor
+
+
+def make_export(users, days, density, seed=0):
+    """Synthetic daily_plan export: a base rate per user, weaker weekends."""
+    rng = np.random.default_rng(seed)
+    user_id = np.repeat(np.arange(users), days)
+    day = np.tile(np.arange(days), users) + np.datetime64("2025-01-01", "D").astype(np.int64)
+    keep = rng.random(len(user_id)) < density
+    user_id, day = user_id[keep], day[keep]
+
+    base = rng.uniform(20, 90, users)[user_id]
+    weekend = ProgressPredictor.day_of_week(day) >= 5
+    pct = np.clip(base - 15 * weekend + rng.normal(0, 10, len(user_id)), 0, 100)
+    total_task = rng.integers(1, 12, len(user_id))
+    completed_task = np.round(pct / 100 * total_task).astype(np.int64)
+    return {
+        "user_id": user_id,
+        "plan_date": day.astype("datetime64[D]"),
+        "completed_task": completed_task,
+        "total_task": total_task,
+    }
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--density", type=float, default=0.7, help="share of days with a plan")
+    args = parser.parse_args()
+
+    export = make_export(args.users, args.days + 1, args.density)
+    last_day = export["plan_date"].max()
+    history = export["plan_date"] < last_day
+    history_export = {k: v[history] for k, v in export.items()}
+    new_day_export = {k: v[~history] for k, v in export.items()}
+    print(f"{args.users} users, {len(export['user_id'])} plan rows")
+
+    predictor = ProgressPredictor(history_days=args.days)
+    # the export's days are in the past: set "today" to the day after each feed
+    fit_ms, _ = timed(lambda: predictor.update_from_export(history_export, today=last_day))
+    update_ms, updated = timed(lambda: predictor.update_from_export(new_day_export, today=last_day + 1))
+    score_ms, scores = timed(lambda: predictor.predict(horizons=(7, 30), today=last_day))
+
+    print(f"full fit       {fit_ms:10.1f}ms  ({len(history_export['user_id']) / fit_ms * 1000:,.0f} rows/s)")
+    print(f"one new day    {update_ms:10.1f}ms  ({updated} users updated)")
+    print(f"score 7d/30d   {score_ms:10.1f}ms  ({args.users / score_ms * 1000:,.0f} users/s)")
+    print(f"mean forecast  7d={np.nanmean(scores[7]):.1f}%  30d={np.nanmean(scores[30]):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
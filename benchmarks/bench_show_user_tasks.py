@@ -0,0 +1,86 @@
+"""
+set_show_user_tasks filtering/ordering benchmark: the previous per-row
+strptime/apply implementation vs the datetime64 version, at 100, 10k and
+1M dates. Runs in memory, no database needed:
+
+    python benchmarks/bench_show_user_tasks.py --sizes 100 10000 1000000
+"""
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from datetime import date, datetime, timedelta
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from models.task_model import UserTasks
+
+
+def legacy_show_user_tasks(user_tasks):
+    df = pd.DataFrame([
+        {"Date": datetime.strptime(d, "%Y-%m-%d").date(), "Tasks": tasks}
+        for d, tasks in user_tasks.items()
+    ])
+    now = datetime.now()
+    current_month_df = df[
+        (df["Date"].apply(lambda d: d.year) == now.year) &
+        (df["Date"].apply(lambda d: d.month) == now.month)
+    ]
+    if current_month_df.empty:
+        df["YearMonth"] = df["Date"].apply(lambda d: d.replace(day=1))
+        df = df[df["YearMonth"] == df["YearMonth"].max()]
+    else:
+        df = current_month_df
+
+    today = date.today()
+    def custom_sort(d):
+        if d == today:
+            return (0, 0)
+        elif d > today:
+            return (1, (d - today).days)
+        else:
+            return (2, -(d - today).days)
+
+    df["sort_key"] = df["Date"].apply(custom_sort)
+    df = df.sort_values("sort_key").drop(columns="sort_key").reset_index(drop=True)
+    return {d.isoformat(): t for d, t in zip(df["Date"], df["Tasks"])}
+
+
+def make_user_tasks(size):
+    start = date.today() - timedelta(days=size // 2)
+    return {
+        (start + timedelta(days=i)).isoformat(): {"Task": "Incomplete"}
+        for i in range(size)
+    }
+
+
+def best_of(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 1000000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        user_tasks = UserTasks()
+        user_tasks.user_tasks = make_user_tasks(size)
+
+        legacy_ms, expected = best_of(lambda: legacy_show_user_tasks(user_tasks.user_tasks), args.runs)
+        vector_ms, _ = best_of(user_tasks.refresh_show_user_tasks, args.runs)
+        assert list(user_tasks.show_user_task) == list(expected)
+
+        print(f"{size:>8} dates  legacy={legacy_ms:10.2f}ms  vectorized={vector_ms:9.2f}ms  "
+              f"speedup={legacy_ms / vector_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Full-history load benchmark: legacy plans-then-IN(...) path vs the single
+user-scoped join in UserTasks.set_user_tasks, at 10, 1k and 50k plans.
+
+Needs the task_flow MySQL database. Creates a throwaway user (and its plans
+and tasks) per size and deletes it afterwards:
+
+    python benchmarks/bench_user_tasks_load.py --sizes 10 1000 50000 --tasks-per-plan 3
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import SqlConnection
+from models.task_model import UserTasks
+
+BENCH_USER = "bench_load"
+
+
+def seed(plans, tasks_per_plan):
+    with SqlConnection() as db:
+        with db.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER,))
+            cursor.execute(
+                "INSERT INTO users (user_id, username, email, password) VALUES (%s, %s, %s, %s)",
+                (BENCH_USER, "Bench", f"{BENCH_USER}@bench.local", "x")
+            )
+            start = date(2000, 1, 1)
+            cursor.executemany(
+                "INSERT INTO daily_plan (plan_id, user_id, plan_date) VALUES (%s, %s, %s)",
+                [(f"bl{i}", BENCH_USER, start + timedelta(days=i)) for i in range(plans)]
+            )
+            cursor.executemany(
+                "INSERT INTO tasks (task_id, plan_id, title, status, incomplete_reason) VALUES (%s, %s, %s, %s, %s)",
+                [(f"bl{i}_{j}", f"bl{i}", f"Task {j}", "Incomplete", "")
+                 for i in range(plans) for j in range(tasks_per_plan)]
+            )
+        db.connection.commit()
+
+
+def cleanup():
+    with SqlConnection() as db:
+        with db.connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE user_id = %s", (BENCH_USER,))
+        db.connection.commit()
+
+
+def legacy_load(user_tasks):
+    """The pre-join implementation: all plans, then tasks WHERE plan_id IN (...)."""
+    user_tasks.set_user_plan(BENCH_USER)
+    with SqlConnection() as db:
+        with db.connection.cursor() as cursor:
+            plan_ids = list(user_tasks.plan_ids.keys())
+            placeholders = ", ".join(["%s"] * len(plan_ids))
+            cursor.execute(f"""
+                SELECT t.plan_id, dp.plan_date, t.title, t.status
+                FROM tasks t
+                JOIN daily_plan dp ON t.plan_id = dp.plan_id
+                WHERE t.plan_id IN ({placeholders})
+                ORDER BY dp.plan_date ASC, t.created_at ASC
+            """, tuple(plan_ids))
+            tasks_dict = {}
+            for row in cursor.fetchall():
+                tasks_dict.setdefault(str(row["plan_date"]), {})[row["title"]] = row["status"]
+            user_tasks.user_tasks = tasks_dict
+
+
+def joined_load(user_tasks):
+    user_tasks.set_user_tasks(BENCH_USER)
+
+
+def best_of(load, runs):
+    timings = []
+    for _ in range(runs):
+        user_tasks = UserTasks(full_history=True)
+        started = time.perf_counter()
+        load(user_tasks)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 50000])
+    parser.add_argument("--tasks-per-plan", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        for plans in args.sizes:
+            seed(plans, args.tasks_per_plan)
+            legacy_ms = best_of(legacy_load, args.runs)
+            joined_ms = best_of(joined_load, args.runs)
+            print(f"{plans:>6} plans  legacy={legacy_ms:9.2f}ms  join={joined_ms:9.2f}ms  "
+                  f"speedup={legacy_ms / joined_ms:5.2f}x")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
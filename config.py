@@ -0,0 +1,51 @@
+# Database connection pool settings (used by backend.database)
+POOL_MAX_SIZE = 10          # max connections per database (in use + idle)
+POOL_ACQUIRE_TIMEOUT = 10   # seconds to wait for a free connection
+POOL_IDLE_TIMEOUT = 300     # close connections idle longer than this (seconds)
+POOL_MAX_LIFETIME = 3600    # recycle connections older than this (seconds)
+POOL_PING_AFTER = 30        # ping connections idle longer than this on checkout (seconds)
+
+# UserTasks.sync re-reads changes this many seconds before the last
+# high-water mark, to catch transactions that committed late
+SYNC_OVERLAP_SECONDS = 5
+
+# Process-wide cache of per-user task/plan reads (used by backend.cache)
+USER_CACHE_MAX_ENTRIES = 256   # (user, query) entries kept
+USER_CACHE_TTL = 60            # seconds before a cached read is refetched
+CHART_CACHE_MAX_ENTRIES = 512  # chart options kept (backend.cache.chart_option_cache)
+
+# Points sent to the browser for the "All Time" chart (LTTB downsampled)
+CHART_MAX_POINTS = 500
+
+# Task status toggles/deletions are batched for this many seconds before
+# being written (backend.tasks.TaskWriteQueue)
+WRITE_BEHIND_WINDOW = 2.0
+
+# Plans per batch for the counter reconciliation job (python -m backend.counters)
+RECONCILE_BATCH_SIZE = 1000
+
+# Users rebuilt per transaction by the monthly_summary backfill
+# (python -m backend.monthly_summary)
+MONTHLY_SUMMARY_BACKFILL_BATCH = 500
+
+# Completion forecasting (backend.progress_predictor)
+PREDICTOR_ALPHAS = (0.1, 0.3, 0.5)   # level smoothing factors tried per user
+PREDICTOR_BETA = 0.1                 # trend smoothing
+PREDICTOR_GAMMA = 0.1                # day-of-week smoothing
+PREDICTOR_PHI = 0.95                 # trend damping per day ahead
+PREDICTOR_HISTORY_DAYS = 180         # days of history fed on a full fit
+
+# Cross-check the running KPI aggregates against a full plan_status scan
+# on every dashboard render (KpiServices.analysis_user_stats)
+KPI_VERIFY = False
+
+# daily_plan rows fetched per chunk by the all-users KPI report
+# (python -m backend.kpi_report)
+KPI_REPORT_CHUNK_SIZE = 50000
+
+# deleted_rows tombstones (read by UserTasks.sync) older than this are
+# purged (python -m backend.tombstones); sessions that have not synced for
+# half this long reload their data instead of syncing
+TOMBSTONE_RETENTION_SECONDS = 7 * 24 * 3600
+TOMBSTONE_PURGE_BATCH = 5000      # rows deleted per transaction
+TOMBSTONE_PURGE_INTERVAL = 3600   # seconds between purges started by the app
@@ -9,7 +9,7 @@ sys.path.append(parent_dir)
 from models.task_model import UserTasks
 from models.user_model import User
 from backend.analytics import KpiServices,GraphServices
-from backend.tasks import TaskSerives
+from backend.tasks import TaskSerives, task_write_queue
 
 
 def make_graph(total_task_all_day=12, completed_task=None, days=31,
@@ -107,6 +107,33 @@ def add_user_date(user_id,tasks,new_date):
     TaskSerives.add_date(user_id,tasks,new_date)
     modal_toggle()
 
+def add_user_task(user_id,tasks,task_date,input_key):
+    TaskSerives.add_task(user_id,tasks,task_date,st.session_state[input_key])
+    st.session_state[input_key] = ""
+
+def toggle_user_task(user_id,tasks,task_date,task):
+    TaskSerives.toggle_task(user_id,tasks,task_date,task)
+
+def remove_user_task(user_id,tasks,task_date,task):
+    TaskSerives.remove_task(user_id,tasks,task_date,task)
+
+def logout_user():
+    try:
+        task_write_queue.flush()# write pending toggles/deletions before leaving
+    except Exception:
+        pass# flush() logged it and re-queued the changes
+    st.session_state["user"] = User()
+    st.session_state["user_task"] = UserTasks()
+    st.session_state["navigation"].to_login_page()
+
+# returns the dataZoom window [start %, end %] to Streamlit
+chart_zoom_event = """
+function(params) {
+    var zoom = params.batch ? params.batch[0] : params;
+    return [zoom.start, zoom.end];
+}
+"""
+
 root_variables = [# 0 for light theme and 1 for dark theme
     """:root{
             --bg-color: #f8f9fa;
@@ -2820,7 +2847,7 @@ def dashboard_page():
     
     st.markdown(styles,unsafe_allow_html=True)
 
-    user_score = KpiServices.analysis_user_stats(st.session_state["user_task"].plan_status)
+    user_score = KpiServices.analysis_user_stats(st.session_state["user_task"].plan_status_store)
 
     with st.container(key = "header"):
         with st.container(key = "header-main"):
@@ -2882,7 +2909,8 @@ def dashboard_page():
                         label="",
                         type="tertiary",
                         icon = ":material/logout:",
-                        key = "logout-btn"
+                        key = "logout-btn",
+                        on_click=logout_user
                     )
 
     with st.container(key = "kpi-section"):
@@ -3026,9 +3054,12 @@ def dashboard_page():
             with st.container(key = "chart-content"):
                 with st.container(key = "chart-container"):
 
-                    option = GraphServices.graph_analysis(st.session_state["user_task"].plan_status,filters,chart_theme[0],chart_theme[1],chart_theme[2])    
+                    # last dataZoom window reported by the chart (All Time only)
+                    zoom = st.session_state.get("taskChart") if filters == "All Time" else None
+                    option = GraphServices.graph_options(st.session_state["user"].user_id,st.session_state["user_task"],filters,chart_theme[0],chart_theme[1],chart_theme[2],zoom=zoom)    
                     st_echarts(
                         options = option,
+                        events = {"datazoom": chart_zoom_event},
                         key = "taskChart"
                     )
 
@@ -3140,7 +3171,14 @@ def dashboard_page():
                                     label = "",
                                     icon=":material/add:",
                                     type = "tertiary",
-                                    key = f"add-task-btn-{date_count+1}"
+                                    key = f"add-task-btn-{date_count+1}",
+                                    on_click=add_user_task,
+                                    args=(
+                                        st.session_state["user"].user_id,
+                                        st.session_state["user_task"],
+                                        user_all_dates[date_count],
+                                        f"task-input-{date_count+1}",
+                                    )
                                 )
                             
                             with st.container(key = f"task-list-{date_count+1}"):
@@ -3169,26 +3207,54 @@ def dashboard_page():
                                             with st.container(key = f"task-item-{task_count+1}"):
                                                 check = st.checkbox(
                                                     label=current_task,
-                                                    key = f"task-checkbox-{task_count+1}"
+                                                    key = f"task-checkbox-{task_count+1}",
+                                                    on_change=toggle_user_task,
+                                                    args=(
+                                                        st.session_state["user"].user_id,
+                                                        st.session_state["user_task"],
+                                                        user_all_dates[date_count],
+                                                        current_task,
+                                                    )
                                                 )
                                                 st.button(
                                                     label = "",
                                                     icon=":material/delete:",
                                                     type = "tertiary",
-                                                    key = f"remove-task-btn-{task_count+1}"
+                                                    key = f"remove-task-btn-{task_count+1}",
+                                                    on_click=remove_user_task,
+                                                    args=(
+                                                        st.session_state["user"].user_id,
+                                                        st.session_state["user_task"],
+                                                        user_all_dates[date_count],
+                                                        current_task,
+                                                    )
                                                 )
                                         elif(current_task_status == "Completed"):
                                             with st.container(key = f"task-completed-item-{task_count+1}"):
                                                 check = st.checkbox(
                                                     label=current_task,
                                                     key = f"task-checkbox-{task_count+1}",
-                                                    value=True
+                                                    value=True,
+                                                    on_change=toggle_user_task,
+                                                    args=(
+                                                        st.session_state["user"].user_id,
+                                                        st.session_state["user_task"],
+                                                        user_all_dates[date_count],
+                                                        current_task,
+                                                    )
                                                 )
                                                 st.button(
                                                     label = "",
                                                     icon=":material/delete:",
                                                     type = "tertiary",
-                                                    key = f"remove-task-btn-{task_count+1}"
+                                                    key = f"remove-task-btn-{task_count+1}",
+                                                    on_click=remove_user_task,
+                                                    args=(
+                                                        st.session_state["user"].user_id,
+                                                        st.session_state["user_task"],
+                                                        user_all_dates[date_count],
+                                                        current_task,
+                                                    )
                                                 )
                                         task_count += 1                
 
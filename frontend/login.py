@@ -521,22 +521,30 @@ def signin_page():
                 )
 
                 if(signin_button):
-                    if(email and email_flag and VerifyUser.if_user_exists(email)):
+                    if(email and email_flag):
                         if(password):
-                            if(VerifyUser.verify_user(email,password)):
-                                user_data = UserServies.user_deserialization(email)
+                            try:
+                                user_data = VerifyUser.authenticate(email,password)
+                            except LookupError:
+                                user_data = None
+                                st.error("User doesn't Exist")
+                            except (PermissionError, ValueError):
+                                user_data = None
+                                st.error("Invalid Email or Password")
+                            except ConnectionError:
+                                user_data = None
+                                st.error("Unable to reach the server, please try again")
+                            if(user_data):
                                 st.session_state["user"].set_user_data(#saves users state
                                     user_id=user_data["user_id"],
                                     name=user_data["name"],
-                                    email=user_data["email"], 
+                                    email=user_data["email"],
                                     password=user_data["password"]
                                 )
                                 st.session_state["user"].set_user_exist()
                                 st.session_state["user_task"].set_show_user_tasks(st.session_state["user"].user_id)
                                 st.session_state["navigation"].to_dashboard_page()
                                 st.rerun()
-                            else:
-                                st.error("Invalid Email or Password")
                         else:
                             st.error("Invalid Entries")
                     else:
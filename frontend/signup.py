@@ -529,8 +529,7 @@ def signup_page():
                 if(signup_btn):
                     if((name_flag and email_flag and password_flag) and (name and email and password)):
                         if(not(VerifyUser.if_user_exists(email))):
-                            st.session_state["user"].set_user_data(#saving user state
-                                user_id=UserServies.generate_user_id(),
+                            st.session_state["user"].set_user_data(#saving user state, user_id is allocated on insert
                                 name=name,
                                 email=email,
                                 password=UserServies.encrypt_password(email,password)
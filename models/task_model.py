@@ -1,37 +1,306 @@
 import os
 import sys
+import bisect
+import itertools
+from collections.abc import MutableMapping
+import numpy as np
 import pandas as pd
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import streamlit as st
 
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(parent_dir)
 
 from backend.database import SqlConnection
+from backend.cache import user_data_cache
+from backend.tombstones import TombstoneServices
+from config import SYNC_OVERLAP_SECONDS, TOMBSTONE_RETENTION_SECONDS
+
+
+class KpiAggregates:
+    """
+    Running totals behind KpiServices.analysis_user_stats, kept by
+    PlanStatusStore and updated in O(1) as rows are added or removed.
+
+    Completion percentages are rounded to 2 decimals, so their sum is kept
+    in exact integer hundredths and never drifts.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.total_dates = 0
+        self.sum_completed_tasks = 0
+        self.sum_total_tasks = 0
+        self.active_days = 0
+        self.percentage_hundredths = 0
+
+    def add(self, completed_task, total_task, completion_percentage, sign=1):
+        self.total_dates += sign
+        self.sum_completed_tasks += sign * completed_task
+        self.sum_total_tasks += sign * total_task
+        self.active_days += sign * (total_task > 0)
+        self.percentage_hundredths += sign * round(completion_percentage * 100)
+
+    def remove(self, completed_task, total_task, completion_percentage):
+        self.add(completed_task, total_task, completion_percentage, sign=-1)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Same keys as KpiServices.analysis_user_stats.
+        """
+        average = self.percentage_hundredths / self.total_dates / 100 if self.total_dates else 0
+        return {
+            "total_dates": self.total_dates,
+            "sum_completed_tasks": self.sum_completed_tasks,
+            "sum_total_tasks": self.sum_total_tasks,
+            "avg_completion_percentage": round(average, 2),
+            "active_days": self.active_days,
+            "incomplete_tasks_list": self.sum_total_tasks - self.sum_completed_tasks
+        }
+
+
+class PlanStatusStore:
+    """
+    Row buffer behind PlanDate.plan_status.
+
+    Rows live in a dict keyed by "YYYY-MM-DD" (insertion ordered), so append,
+    update and delete by date are O(1) and never copy the table. The
+    DataFrame view (Date as datetime64) is built lazily on read and reused
+    until the next change, so readers must not modify it. `kpis` holds the
+    running KPI totals of the rows. `version` increases with every change;
+    `data_version` also tells stores apart, for caches shared between
+    sessions.
+    """
+    COLUMNS = ["Date", "completed_task", "total_task", "completion_percentage"]
+    _store_ids = itertools.count(1)
+
+    def __init__(self):
+        self._rows = {}     # {"YYYY-MM-DD": (completed_task, total_task, completion_percentage)}
+        self._frame = None
+        self.kpis = KpiAggregates()
+        self.version = 0
+        self.store_id = next(PlanStatusStore._store_ids)
+
+    @property
+    def data_version(self):
+        return (self.store_id, self.version)
+
+    @staticmethod
+    def completion_percentage(completed_task, total_task):
+        return round(completed_task / total_task * 100, 2) if total_task else 0.0
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, plan_date):
+        return str(plan_date) in self._rows
+
+    def get(self, plan_date):
+        """
+        Returns:
+            tuple: (completed_task, total_task, completion_percentage), or None
+        """
+        return self._rows.get(str(plan_date))
+
+    def clear(self):
+        self._rows = {}
+        self.kpis.reset()
+        self._changed()
+
+    def load_rows(self, rows):
+        """
+        Replace the contents with (plan_date, completed_task, total_task) rows.
+        """
+        self._rows = {
+            str(d): (int(c), int(t), self.completion_percentage(int(c), int(t)))
+            for d, c, t in rows
+        }
+        self.rebuild_kpis()
+        self._changed()
+
+    def rebuild_kpis(self):
+        """Recompute `kpis` from the rows."""
+        self.kpis.reset()
+        for row in self._rows.values():
+            self.kpis.add(*row)
+
+    def load_frame(self, df):
+        """
+        Replace the contents with the rows of a plan_status-shaped DataFrame.
+        """
+        dates = df["Date"]
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            dates = dates.dt.strftime("%Y-%m-%d")
+        self.load_rows(zip(dates, df["completed_task"], df["total_task"]))
+
+    def upsert(self, plan_date, completed_task, total_task):
+        """
+        Append a date, or overwrite its counters if already present.
+        """
+        row = (completed_task, total_task, self.completion_percentage(completed_task, total_task))
+        previous = self._rows.get(str(plan_date))
+        if previous is not None:
+            self.kpis.remove(*previous)
+        self._rows[str(plan_date)] = row
+        self.kpis.add(*row)
+        self._changed()
+
+    def append(self, plan_date, completed_task=0, total_task=0):
+        if str(plan_date) in self._rows:
+            raise ValueError(f"plan_status already has a row for {plan_date}")
+        self.upsert(plan_date, completed_task, total_task)
+
+    def update(self, plan_date, completed_task=None, total_task=None):
+        """
+        Change the counters of an existing date; None keeps the current value.
+        """
+        current = self._rows.get(str(plan_date))
+        if current is None:
+            raise KeyError(f"plan_status has no row for {plan_date}")
+        completed_task = current[0] if completed_task is None else completed_task
+        total_task = current[1] if total_task is None else total_task
+        self.upsert(plan_date, completed_task, total_task)
+
+    def delete(self, plan_date):
+        """
+        Returns:
+            bool: True if the date had a row
+        """
+        row = self._rows.pop(str(plan_date), None)
+        if row is None:
+            return False
+        self.kpis.remove(*row)
+        self._changed()
+        return True
+
+    def to_frame(self):
+        if self._frame is None:
+            if self._rows:
+                completed, total, percentage = zip(*self._rows.values())
+            else:
+                completed, total, percentage = (), (), ()
+            # Date is converted to datetime64 once here, so readers never
+            # have to parse it again
+            self._frame = pd.DataFrame({
+                "Date": np.array(list(self._rows.keys()), dtype="datetime64[D]"),
+                "completed_task": np.array(completed, dtype=np.int64),
+                "total_task": np.array(total, dtype=np.int64),
+                "completion_percentage": np.array(percentage, dtype=np.float64),
+            }, columns=self.COLUMNS)
+        return self._frame
+
+
+class ShowTaskView(MutableMapping):
+    """
+    Mapping {"YYYY-MM-DD": {task: status}} iterated in dashboard order:
+    today → future dates (ascending) → past dates (descending).
+
+    Dates are kept in one ascending list, so an insert or delete is a
+    binary search plus a list shift, and iteration only has to find where
+    today falls. The order therefore follows the calendar without re-sorting.
+    """
+
+    def __init__(self, items=()):
+        self._tasks = dict(items)
+        self._dates = sorted(self._tasks)
+
+    @classmethod
+    def from_sorted(cls, dates, tasks):
+        """
+        Build from dates already in ascending order and their task dicts.
+        """
+        view = cls()
+        view._dates = list(dates)
+        view._tasks = dict(zip(view._dates, tasks))
+        return view
+
+    def __getitem__(self, plan_date):
+        return self._tasks[plan_date]
+
+    def __setitem__(self, plan_date, tasks):
+        if plan_date not in self._tasks:
+            bisect.insort(self._dates, plan_date)
+        self._tasks[plan_date] = tasks
+
+    def __delitem__(self, plan_date):
+        del self._tasks[plan_date]
+        del self._dates[bisect.bisect_left(self._dates, plan_date)]
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __contains__(self, plan_date):
+        return plan_date in self._tasks
+
+    def __iter__(self):
+        today = date.today().isoformat()
+        split = bisect.bisect_left(self._dates, today)
+        if split < len(self._dates) and self._dates[split] == today:
+            yield today
+            future_start = split + 1
+        else:
+            future_start = split
+        yield from self._dates[future_start:]
+        yield from reversed(self._dates[:split])
+
+    def __repr__(self):
+        return f"ShowTaskView({dict(self.items())!r})"
 
 
 class PlanDate:
     def __init__(self):
         # always start with empty structures (avoid NoneType issues)
         self.plan_ids = {}   # {plan_id: "YYYY-MM-DD"}
-        self.plan_status = pd.DataFrame(
-            columns=["Date", "completed_task", "total_task", "completion_percentage"]
-        )
+        self.plan_dates = {} # reverse index {"YYYY-MM-DD": plan_id}, kept in step with plan_ids
+        self.plan_status_store = PlanStatusStore()
+        self.synced_at = None   # database time the loaded data is current as of
+
+    @property
+    def plan_status(self):
+        """
+        DataFrame ["Date", "completed_task", "total_task", "completion_percentage"],
+        materialized from plan_status_store on read.
+        """
+        return self.plan_status_store.to_frame()
+
+    @plan_status.setter
+    def plan_status(self, df):
+        self.plan_status_store.load_frame(df)
 
     def set_user_plan(self, user_id):
         """
         Fetches all plan_ids and plan status for a given user_id
         from the daily_plan table and stores it in a pandas DataFrame.
+        Rows are shared across sessions through user_data_cache.
         """
         if not user_id or not isinstance(user_id, str):
             raise ValueError("Invalid user_id provided")
 
+        # read before the query, so a write committed meanwhile is not cached
+        key = ("plans", user_data_cache.generation(user_id))
+        cached = user_data_cache.get(user_id, key)
+        if cached is not None:
+            self.synced_at, results = cached
+            self.set_plan_rows(results)
+            return
+
         db = SqlConnection()
         try:
             if not db.connect():
                 raise ConnectionError("Failed to connect to the database")
 
             with db.connection.cursor() as cursor:
+                # high-water mark for UserTasks.sync, read before the data
+                cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+                self.synced_at = cursor.fetchone()["now"]
+
                 query = """
                     SELECT plan_id, plan_date, total_task, completed_task
                     FROM daily_plan
@@ -39,172 +308,408 @@ class PlanDate:
                     ORDER BY plan_date ASC
                 """
                 cursor.execute(query, (user_id,))
-                results = cursor.fetchall()
-
-                if not results:
-                    self.plan_ids = {}
-                    self.plan_status = pd.DataFrame(
-                        columns=["Date", "completed_task", "total_task", "completion_percentage"]
-                    )
-                    return
-
-                # Map plan_ids
-                self.plan_ids = {row["plan_id"]: str(row["plan_date"]) for row in results}
-
-                # Create DataFrame
-                df = pd.DataFrame(results)
-                df = df.rename(columns={"plan_date": "Date"})
-
-                # Calculate completion percentage safely
-                df["completion_percentage"] = (
-                    (df["completed_task"] / df["total_task"] * 100)
-                    .fillna(0)
-                    .replace([float("inf"), -float("inf")], 0)
-                    .round(2)
-                )
+                results = tuple(cursor.fetchall())
 
-                self.plan_status = df[["Date", "completed_task", "total_task", "completion_percentage"]]
+            self.set_plan_rows(results)
+            user_data_cache.put(user_id, key, (self.synced_at, results))
 
         except Exception as e:
             print(f"Error fetching user plans: {e}")
             self.plan_ids = {}
-            self.plan_status = pd.DataFrame(
-                columns=["Date", "completed_task", "total_task", "completion_percentage"]
-            )
+            self.plan_dates = {}
+            self.plan_status_store.clear()
         finally:
             db.disconnect()
 
+    def set_plan_rows(self, results):
+        """
+        Build plan_ids and plan_status from daily_plan rows
+        (plan_id, plan_date, total_task, completed_task), ordered by plan_date.
+        """
+        # Map plan_ids (and the reverse date → plan_id index)
+        self.plan_ids = {row["plan_id"]: str(row["plan_date"]) for row in results}
+        self.plan_dates = {d: pid for pid, d in self.plan_ids.items()}
+
+        self.plan_status_store.load_rows(
+            (row["plan_date"], row["completed_task"], row["total_task"]) for row in results
+        )
+
+    def index_plan(self, plan_id, plan_date):
+        """
+        Record plan_id ↔ plan_date in plan_ids and plan_dates.
+        """
+        plan_date = str(plan_date)
+        old_date = self.plan_ids.get(plan_id)
+        if old_date is not None and self.plan_dates.get(old_date) == plan_id:
+            del self.plan_dates[old_date]
+        self.plan_ids[plan_id] = plan_date
+        self.plan_dates[plan_date] = plan_id
+
+    def unindex_plan(self, plan_id):
+        """
+        Forget plan_id in both directions.
+
+        Returns:
+            str: The plan's date, or None if it was not indexed
+        """
+        plan_date = self.plan_ids.pop(plan_id, None)
+        if plan_date is not None and self.plan_dates.get(plan_date) == plan_id:
+            del self.plan_dates[plan_date]
+        return plan_date
+
+    def plan_id_for_date(self, plan_date):
+        """
+        Returns:
+            str: plan_id of the plan on plan_date, or None
+        """
+        return self.plan_dates.get(str(plan_date))
+
+    def upsert_plan_status(self, plan_date, completed_task, total_task):
+        """
+        Insert or update the plan_status row of one date.
+        """
+        self.plan_status_store.upsert(plan_date, completed_task, total_task)
+
+    def drop_plan_status(self, plan_date):
+        """
+        Remove the plan_status row of one date.
+        """
+        self.plan_status_store.delete(plan_date)
+
 
 class UserTasks(PlanDate):
-    def __init__(self):
+    def __init__(self, full_history=False):
         super().__init__()   # initialize plan_ids and plan_status
         self.user_tasks = {}       # { "YYYY-MM-DD": {task: status, ...} }
-        self.show_user_task = {}   # sorted view
+        self.show_user_task = ShowTaskView()   # sorted view
+        # False → only the shown month's tasks are loaded (see load_month),
+        # True  → every task the user ever had is loaded at login
+        self.full_history = full_history
+        self.loaded_months = set()  # {(year, month), ...} whose tasks are in user_tasks
 
     def set_user_tasks(self, user_id):
         """
-        Fetch all tasks for a given user_id across all plans
-        using a single SQL query with IN operation.
+        Fetch all plans and tasks for a given user_id in one round trip
+        (daily_plan LEFT JOIN tasks scoped by user_id) and build plan_ids,
+        plan_status and user_tasks from the same result set.
         Builds dict: { "date": {"Task1": status, "Task2": status, ...}, ... }
         """
         if not user_id or not isinstance(user_id, str):
             raise ValueError("Invalid user_id provided")
 
-        # fetch plans
-        self.set_user_plan(user_id)
+        db = SqlConnection()
+        try:
+            # read before the query, so a write committed meanwhile is not cached
+            key = ("plans_and_tasks", user_data_cache.generation(user_id))
+            cached = user_data_cache.get(user_id, key)
+            if cached is not None:
+                self.synced_at, results = cached
+            else:
+                if not db.connect():
+                    raise ConnectionError("Failed to connect to the database")
+
+                with db.connection.cursor() as cursor:
+                    # high-water mark for sync, read before the data
+                    cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+                    self.synced_at = cursor.fetchone()["now"]
+
+                    query = """
+                        SELECT dp.plan_id, dp.plan_date, dp.total_task, dp.completed_task,
+                               t.title, t.status
+                        FROM daily_plan dp
+                        LEFT JOIN tasks t ON t.plan_id = dp.plan_id
+                        WHERE dp.user_id = %s
+                        ORDER BY dp.plan_date ASC, t.created_at ASC
+                    """
+                    cursor.execute(query, (user_id,))
+                    results = tuple(cursor.fetchall())
+                user_data_cache.put(user_id, key, (self.synced_at, results))
+
+            plan_rows = []
+            tasks_dict = {}
+            last_plan_id = None
+            for row in results:
+                plan_date = str(row["plan_date"])
+                # rows arrive grouped by plan (ordered by plan_date, unique per user)
+                if row["plan_id"] != last_plan_id:
+                    last_plan_id = row["plan_id"]
+                    plan_rows.append(row)
+                    tasks_dict[plan_date] = {}
+                # plans without tasks come back once with NULL task columns
+                if row["title"] is not None:
+                    tasks_dict[plan_date][row["title"]] = row["status"]
+
+            self.set_plan_rows(plan_rows)
+            self.user_tasks = tasks_dict
+
+        except Exception as e:
+            print(f"Error fetching user tasks: {e}")
+            # fallback → empty dicts for all plan dates
+            self.user_tasks = {str(date): {} for date in self.plan_ids.values()}
+        finally:
+            db.disconnect()
+
+    def default_month(self):
+        """
+        Month shown on the dashboard: the current month if the user has a plan
+        in it, otherwise the latest month with a plan.
 
+        Returns:
+            tuple: (year, month), or None if the user has no plans
+        """
         if not self.plan_ids:
-            self.user_tasks = {}
-            return
+            return None
+        now = datetime.now()
+        current_prefix = f"{now.year:04d}-{now.month:02d}"
+        dates = [str(d) for d in self.plan_ids.values()]
+        if any(d.startswith(current_prefix) for d in dates):
+            return (now.year, now.month)
+        latest = max(dates)
+        return (int(latest[:4]), int(latest[5:7]))
+
+    def load_month(self, user_id, year, month):
+        """
+        Fetch the tasks of one month and merge them into user_tasks.
+
+        Only plans dated inside the month are read, so the cost does not grow
+        with the user's history. plan_ids/plan_status must already be loaded
+        (set_user_plan); older months can be paged in with further calls.
+
+        Returns:
+            dict: { "date": {"Task1": status, ...}, ... } for the month
+        """
+        if not user_id or not isinstance(user_id, str):
+            raise ValueError("Invalid user_id provided")
+
+        first_day = date(year, month, 1)
+        next_first = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        month_prefix = first_day.strftime("%Y-%m")
+
+        month_tasks = {
+            str(d): {} for d in self.plan_ids.values() if str(d).startswith(month_prefix)
+        }
 
         db = SqlConnection()
         try:
-            if not db.connect():
-                raise ConnectionError("Failed to connect to the database")
+            # read before the query, so a write committed meanwhile is not cached
+            key = ("month", year, month, user_data_cache.generation(user_id))
+            cached = user_data_cache.get(user_id, key)
+            if cached is not None:
+                read_at, results = cached
+            else:
+                if not db.connect():
+                    raise ConnectionError("Failed to connect to the database")
 
-            with db.connection.cursor() as cursor:
-                plan_ids = list(self.plan_ids.keys())
-                placeholders = ", ".join(["%s"] * len(plan_ids))
+                with db.connection.cursor() as cursor:
+                    cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+                    read_at = cursor.fetchone()["now"]
 
-                query = f"""
-                    SELECT t.plan_id, dp.plan_date, t.title, t.status
-                    FROM tasks t
-                    JOIN daily_plan dp ON t.plan_id = dp.plan_id
-                    WHERE t.plan_id IN ({placeholders})
-                    ORDER BY dp.plan_date ASC, t.created_at ASC
-                """
-                cursor.execute(query, tuple(plan_ids))
-                results = cursor.fetchall()
+                    query = """
+                        SELECT dp.plan_date, t.title, t.status
+                        FROM tasks t
+                        JOIN daily_plan dp ON t.plan_id = dp.plan_id
+                        WHERE dp.user_id = %s AND dp.plan_date >= %s AND dp.plan_date < %s
+                        ORDER BY dp.plan_date ASC, t.created_at ASC
+                    """
+                    cursor.execute(query, (user_id, first_day, next_first))
+                    results = tuple(cursor.fetchall())
+                user_data_cache.put(user_id, key, (read_at, results))
 
-                tasks_dict = {}
+            for row in results:
+                month_tasks.setdefault(str(row["plan_date"]), {})[row["title"]] = row["status"]
 
-                if not results:
-                    # No tasks found → fallback to empty dicts for all plan dates
-                    tasks_dict = {str(date): {} for date in self.plan_ids.values()}
-                else:
-                    for row in results:
-                        plan_date = str(row["plan_date"])
-                        task_title = row["title"]
-                        task_status = row["status"]
+            # rows older than the high-water mark: let the next sync re-read from them
+            if self.synced_at is None or read_at < self.synced_at:
+                self.synced_at = read_at
 
-                        if plan_date not in tasks_dict:
-                            tasks_dict[plan_date] = {}
+            self.loaded_months.add((year, month))
 
-                        tasks_dict[plan_date][task_title] = task_status
+        except Exception as e:
+            print(f"Error fetching user tasks for {month_prefix}: {e}")
+        finally:
+            db.disconnect()
 
-                    # Ensure all plan dates are represented (even if no tasks on some days)
-                    for plan_date in self.plan_ids.values():
-                        plan_date = str(plan_date)
-                        if plan_date not in tasks_dict:
-                            tasks_dict[plan_date] = {}
+        self.user_tasks.update(month_tasks)
+        return month_tasks
 
-                self.user_tasks = tasks_dict
+    def sync(self, user_id):
+        """
+        Bring the loaded data up to date with edits made elsewhere (another
+        tab, device or process) without reloading the user's history.
+
+        Reads only tasks whose updated_at, plans whose created_at and
+        tombstones (deleted_rows) whose deleted_at is at or after the last
+        sync, minus SYNC_OVERLAP_SECONDS to cover transactions that committed
+        late. Re-applying a change is harmless, so the overlap is safe.
+        Tombstones are applied before upserts so a task deleted and re-added
+        ends up present. Tombstones are only kept for
+        TOMBSTONE_RETENTION_SECONDS, so data last synced more than half that
+        long ago is reloaded instead (reload()).
+
+        Returns:
+            dict: {"plans": int, "tasks": int, "deleted": int} rows applied
+        """
+        if not user_id or not isinstance(user_id, str):
+            raise ValueError("Invalid user_id provided")
+
+        if self.synced_at is None:
+            self.set_show_user_tasks(user_id)
+            return {"plans": len(self.plan_ids), "tasks": 0, "deleted": 0}
+
+        synced_at = self.synced_at
+        if isinstance(synced_at, str):
+            synced_at = datetime.fromisoformat(synced_at)
+        if datetime.now() - synced_at > timedelta(seconds=TOMBSTONE_RETENTION_SECONDS / 2):
+            # the tombstones since then may already be purged
+            return self.reload(user_id)
+        since = synced_at - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+        db = SqlConnection()
+        try:
+            if not db.connect():
+                raise ConnectionError("Failed to connect to the database")
+
+            with db.connection.cursor() as cursor:
+                cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+                new_synced_at = cursor.fetchone()["now"]
+
+                cursor.execute("""
+                    SELECT entity, plan_id, plan_date, title
+                    FROM deleted_rows
+                    WHERE user_id = %s AND deleted_at >= %s
+                    ORDER BY id ASC
+                """, (user_id, since))
+                tombstones = cursor.fetchall()
+
+                cursor.execute("""
+                    SELECT dp.plan_id, dp.plan_date, t.title, t.status
+                    FROM tasks t
+                    JOIN daily_plan dp ON t.plan_id = dp.plan_id
+                    WHERE dp.user_id = %s AND t.updated_at >= %s
+                    ORDER BY t.updated_at ASC
+                """, (user_id, since))
+                changed_tasks = cursor.fetchall()
+
+                # plans that are new, or whose counters moved with their tasks
+                touched = {row["plan_id"] for row in changed_tasks}
+                touched.update(row["plan_id"] for row in tombstones if row["entity"] == "task")
+                params = [user_id, since]
+                query = """
+                    SELECT plan_id, plan_date, total_task, completed_task
+                    FROM daily_plan
+                    WHERE user_id = %s AND (created_at >= %s
+                """
+                if touched:
+                    query += " OR plan_id IN (" + ", ".join(["%s"] * len(touched)) + ")"
+                    params.extend(sorted(touched))
+                query += ")"
+                cursor.execute(query, tuple(params))
+                changed_plans = cursor.fetchall()
 
-        except Exception as e:
-            print(f"Error fetching user tasks: {e}")
-            # fallback → empty dicts for all plan dates
-            self.user_tasks = {str(date): {} for date in self.plan_ids.values()}
         finally:
             db.disconnect()
 
+        dates_changed = False
+
+        for row in tombstones:
+            plan_id = row["plan_id"]
+            if row["entity"] == "plan":
+                plan_date = self.unindex_plan(plan_id)
+                if plan_date is None:
+                    continue
+                self.drop_plan_status(plan_date)
+                self.user_tasks.pop(plan_date, None)
+                self.show_user_task.pop(plan_date, None)
+            elif plan_id in self.plan_ids:
+                self.user_tasks.get(self.plan_ids[plan_id], {}).pop(row["title"], None)
+
+        for row in changed_plans:
+            plan_date = str(row["plan_date"])
+            if row["plan_id"] not in self.plan_ids:
+                dates_changed = True
+            self.index_plan(row["plan_id"], plan_date)
+            self.upsert_plan_status(plan_date, row["completed_task"], row["total_task"])
+            if self.full_history or (int(plan_date[:4]), int(plan_date[5:7])) in self.loaded_months:
+                self.user_tasks.setdefault(plan_date, {})
+
+        for row in changed_tasks:
+            plan_date = str(row["plan_date"])
+            if plan_date in self.user_tasks:
+                self.user_tasks[plan_date][row["title"]] = row["status"]
+
+        if dates_changed:
+            # a first plan in the current month moves the dashboard to it
+            month = self.default_month()
+            if not self.full_history and month and month not in self.loaded_months:
+                self.load_month(user_id, *month)
+            self.refresh_show_user_tasks()
+
+        self.synced_at = new_synced_at
+        TombstoneServices.purge_if_due()
+        return {"plans": len(changed_plans), "tasks": len(changed_tasks), "deleted": len(tombstones)}
+
+    def reload(self, user_id):
+        """
+        Drop everything loaded and load the user's data again.
+
+        Returns:
+            dict: {"plans": int, "tasks": 0, "deleted": 0}, like sync()
+        """
+        self.plan_ids = {}
+        self.plan_dates = {}
+        self.plan_status_store.clear()
+        self.user_tasks = {}
+        self.show_user_task = ShowTaskView()
+        self.loaded_months = set()
+        self.synced_at = None
+        self.set_show_user_tasks(user_id)
+        return {"plans": len(self.plan_ids), "tasks": 0, "deleted": 0}
+
     def set_show_user_tasks(self, user_id):
         """
         Filters user tasks to current month.
         If no tasks in current month, fallback to the latest available month.
         Then applies custom sorting order:
         Today → Future dates (ascending) → Past dates (descending).
+
+        Unless full_history is set, only plan_status (the per-day counters
+        kept in daily_plan) and the shown month's tasks are fetched.
         """
-        if not self.user_tasks:
-            self.set_user_tasks(user_id)
+        if self.full_history:
+            if not self.user_tasks:
+                self.set_user_tasks(user_id)
+        elif not self.loaded_months:
+            self.set_user_plan(user_id)
+            month = self.default_month()
+            if month:
+                self.load_month(user_id, *month)
+
+        self.refresh_show_user_tasks()
+
+    def refresh_show_user_tasks(self):
+        """
+        Rebuild show_user_task from the already loaded user_tasks.
 
+        Dates are parsed and filtered as one datetime64 array; ShowTaskView
+        takes care of the today → future → past order.
+        """
         if not self.user_tasks:
-            self.show_user_task = {}
+            self.show_user_task = ShowTaskView()
             return
 
-        df = pd.DataFrame([
-            {"Date": datetime.strptime(date, "%Y-%m-%d").date(), "Tasks": tasks}
-            for date, tasks in self.user_tasks.items()
-        ])
-
-        if df.empty:
-            self.show_user_task = {}
-            return
-
-        now = datetime.now()
-        current_year, current_month = now.year, now.month
-
-        # Filter for current month
-        current_month_df = df[
-            (df["Date"].apply(lambda d: d.year) == current_year) &
-            (df["Date"].apply(lambda d: d.month) == current_month)
-        ]
-
-        # If no tasks in current month, fallback to latest available month
-        if current_month_df.empty:
-            df["YearMonth"] = df["Date"].apply(lambda d: d.replace(day=1))
-            latest_month = df["YearMonth"].max()
-            df = df[df["YearMonth"] == latest_month]
-        else:
-            df = current_month_df
-
-        if df.empty:
-            self.show_user_task = {}
-            return
-
-        # Custom sorting
-        today = date.today()
-        def custom_sort(d):
-            if d == today:
-                return (0, 0)
-            elif d > today:
-                return (1, (d - today).days)
-            else:
-                return (2, -(d - today).days)
-
-        df["sort_key"] = df["Date"].apply(custom_sort)
-        df = df.sort_values("sort_key").drop(columns="sort_key").reset_index(drop=True)
-
-        # Back to dict
-        self.show_user_task = {
-            d.strftime("%Y-%m-%d"): t for d, t in zip(df["Date"], df["Tasks"])
-        }
+        keys = list(self.user_tasks.keys())
+        dates = np.array(keys, dtype="datetime64[D]")
+        months = dates.astype("datetime64[M]")
+
+        # Filter for current month,
+        # if no tasks in current month, fallback to latest available month
+        mask = months == np.datetime64(datetime.now().strftime("%Y-%m"), "M")
+        if not mask.any():
+            mask = months == months.max()
+        selected = np.flatnonzero(mask)
+        selected = selected[np.argsort(dates[selected], kind="stable")]
+
+        self.show_user_task = ShowTaskView.from_sorted(
+            (keys[i] for i in selected),
+            (self.user_tasks[keys[i]] for i in selected)
+        )
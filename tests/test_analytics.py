@@ -0,0 +1,200 @@
+import io
+import os
+import sys
+import random
+from datetime import date
+import numpy as np
+import pandas as pd
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.analytics import KpiServices, GraphServices
+from backend.cache import user_data_cache
+from backend.kpi_report import KpiReport
+from backend.progress_predictor import ProgressPredictor
+from models.task_model import PlanStatusStore, UserTasks
+
+
+def assert_matches_full_scan(store):
+    stats = store.kpis.stats()
+    scanned = KpiServices.verify_user_stats(store, stats)
+    # the mean may differ in the last rounded digit: the aggregate sums exact
+    # hundredths, the scan sums floats
+    assert abs(stats.pop("avg_completion_percentage") - scanned.pop("avg_completion_percentage")) <= 0.01
+    assert stats == scanned
+
+
+def test_running_kpis_match_full_scan_through_mutations(capsys):
+    rng = random.Random(7)
+    store = PlanStatusStore()
+    store.load_rows((f"2024-01-{d:02d}", d % 3, d % 5) for d in range(1, 21))
+    dates = [f"2024-02-{d:02d}" for d in range(1, 29)]
+
+    for _ in range(500):
+        plan_date = rng.choice(dates)
+        action = rng.random()
+        if action < 0.4:
+            total_task = rng.randint(0, 9)
+            store.upsert(plan_date, rng.randint(0, total_task), total_task)
+        elif action < 0.7 and plan_date in store:
+            completed_task, total_task, _ = store.get(plan_date)
+            store.update(plan_date, completed_task=rng.randint(0, total_task))
+        else:
+            store.delete(plan_date)
+
+        assert_matches_full_scan(store)
+
+    assert "out of sync" not in capsys.readouterr().out
+
+
+def test_empty_store_reports_zeros():
+    store = PlanStatusStore()
+    assert KpiServices.analysis_user_stats(store) == KpiServices.analysis_user_stats(None)
+    store.append("2024-01-01", completed_task=1, total_task=2)
+    store.delete("2024-01-01")
+    assert KpiServices.analysis_user_stats(store, verify=True) == KpiServices.analysis_user_stats(None)
+
+
+def test_verify_repairs_drifted_aggregates(capsys):
+    store = PlanStatusStore()
+    store.load_rows([("2024-01-01", 2, 4), ("2024-01-02", 0, 0)])
+    expected = store.kpis.stats()
+    store.kpis.sum_completed_tasks += 5   # simulate drift
+
+    assert KpiServices.analysis_user_stats(store, verify=True) == expected
+    assert "out of sync" in capsys.readouterr().out
+    assert store.kpis.stats() == expected
+
+
+class ListCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.position = 0
+
+    def execute(self, sql, args=None):
+        self.position = 0
+
+    def fetchmany(self, size):
+        rows = self.rows[self.position:self.position + size]
+        self.position += size
+        return rows
+
+
+def test_streamed_report_matches_per_user_stats_across_chunk_boundaries():
+    rng = random.Random(3)
+    rows = []
+    for user in range(40):
+        for _ in range(rng.randint(1, 30)):
+            total_task = rng.randint(0, 8)
+            rows.append((f"u{user:04d}", rng.randint(0, total_task), total_task))
+
+    out = io.StringIO()
+    summary = KpiReport.stream(ListCursor(rows), out, chunk_size=7)
+    report = pd.read_csv(io.StringIO(out.getvalue())).set_index("user_id")
+
+    assert summary["rows"] == len(rows)
+    assert summary["users"] == len(report) == 40
+    for user_id, user_report in report.iterrows():
+        store = PlanStatusStore()
+        store.load_rows(
+            (f"2024-01-01+{i}", completed_task, total_task)
+            for i, (uid, completed_task, total_task) in enumerate(rows) if uid == user_id
+        )
+        assert user_report.to_dict() == KpiServices.analysis_user_stats(store)
+
+
+def test_predictor_ignores_open_and_future_plans():
+    predictor = ProgressPredictor()
+    today = date(2024, 1, 20)
+
+    # plans are created for today or later; none of them is final yet
+    assert predictor.update(["u1", "u1"], ["2024-01-20", "2024-01-25"], [1, 0], [2, 3], today=today) == 0
+    past = [f"2024-01-{d:02d}" for d in range(11, 20)]
+    assert predictor.update(["u1"] * len(past), past, [1] * len(past), [2] * len(past), today=today) == 1
+    assert predictor.observations[0] == len(past)
+    assert predictor.last_day[0] == (date(2024, 1, 19) - date(1970, 1, 1)).days
+
+    # the next day, yesterday's plan is final and comes in
+    tomorrow = date(2024, 1, 21)
+    assert predictor.update(["u1"], ["2024-01-20"], [1], [2], today=tomorrow) == 1
+    assert predictor.predict_user("u1", today=tomorrow) == {7: 50.0, 30: 50.0}
+
+
+def test_chart_options_rebuilt_after_user_data_is_written(monkeypatch):
+    builds = []
+
+    def fake_analysis(plan_status, filter_status, *args, **kwargs):
+        builds.append(filter_status)
+        return {"built": len(builds)}
+
+    monkeypatch.setattr(GraphServices, "graph_analysis", fake_analysis)
+    user_tasks = UserTasks()
+    user_tasks.plan_status_store.append("2024-01-01", completed_task=1, total_task=2)
+
+    first = GraphServices.graph_options("chart_u", user_tasks, "Month")
+    assert GraphServices.graph_options("chart_u", user_tasks, "Month") is first
+
+    # e.g. a task_write_queue flush: monthly_summary changed, plan_status did not
+    generation = user_data_cache.generation("chart_u")
+    user_data_cache.invalidate("chart_u")
+    assert user_data_cache.generation("chart_u") != generation
+    assert GraphServices.graph_options("chart_u", user_tasks, "Month") == {"built": 2}
+
+
+def test_lttb_returns_everything_when_nothing_to_drop():
+    x = np.arange(10)
+    y = np.sin(x)
+    assert GraphServices.lttb(x, y, 10).tolist() == list(range(10))
+    assert GraphServices.lttb(x, y, 50).tolist() == list(range(10))
+    for threshold in (2, 1, 0, -1):          # too few points for a triangle
+        assert GraphServices.lttb(x, y, threshold).tolist() == list(range(10))
+    assert GraphServices.lttb(x[:0], y[:0], 3).tolist() == []
+
+
+def test_lttb_keeps_ends_and_spikes():
+    rng = random.Random(7)
+    x = np.arange(1000)
+    y = np.array([50 + rng.uniform(-1, 1) for _ in x])
+    y[137], y[600], y[861] = 100.0, 0.0, 99.0
+
+    kept = GraphServices.lttb(x, y, 40)
+
+    assert len(kept) == 40
+    assert kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+    assert {137, 600, 861} <= set(kept.tolist())
+
+    kept = GraphServices.lttb(x, y, 3)       # one bucket: its biggest outlier
+    assert kept.tolist() == [0, 137, 999]
+
+
+def test_zoom_window_clamps_and_normalizes():
+    assert GraphServices.zoom_window((-20, 40.04)) == (0.0, 40.0)
+    assert GraphServices.zoom_window(("10", 250)) == (10.0, 100.0)
+    assert GraphServices.zoom_window((-50, 150)) is None       # the whole range
+    assert GraphServices.zoom_window((120, 300)) is None       # clamps to (100, 100)
+    assert GraphServices.zoom_window((60, 40)) is None
+    assert GraphServices.zoom_window(None) is None
+    assert GraphServices.zoom_window(("a", 10)) is None
+    assert GraphServices.zoom_window((1, 2, 3)) is None
+
+
+def test_all_time_adds_the_zoom_window_at_full_resolution():
+    dates = pd.date_range("2020-01-01", periods=1000, freq="D")
+    values = [float(i % 100) for i in range(1000)]
+    df = pd.DataFrame({"Date": dates[::-1], "completion_percentage": values[::-1]})
+
+    def points(option):
+        return [tuple(point) for point in option["series"][0]["data"]]
+
+    full = GraphServices.all_time(df, "#000", "#fff", "#0f0", max_points=50)
+    assert len(points(full)) == 50
+    assert points(full)[0] == ("2020-01-01", 0.0) and points(full)[-1][0] == "2022-09-26"
+    assert full["dataZoom"][0]["start"] == 0 and full["dataZoom"][0]["end"] == 100
+
+    zoomed = GraphServices.all_time(df, "#000", "#fff", "#0f0", zoom=(50, 52), max_points=50)
+    window = [p for p in points(zoomed) if "2021-05-15" <= p[0] <= "2021-06-04"]
+    assert len(window) == 21                          # every day of the window
+    assert set(points(full)) <= set(points(zoomed))   # plus the overview
+    assert [p[0] for p in points(zoomed)] == sorted(p[0] for p in points(zoomed))
+    assert (zoomed["dataZoom"][1]["start"], zoomed["dataZoom"][1]["end"]) == (50.0, 52.0)
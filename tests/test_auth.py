@@ -0,0 +1,133 @@
+import os
+import sys
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.auth import UserServies
+from backend.database import configure_pool, close_all_pools
+from backend.utils import IdAllocator
+from models.user_model import User
+
+
+class SqliteCursor:
+    """pymysql-style DictCursor over sqlite3 (%s placeholders, dict rows)."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cursor.close()
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, sql, args=()):
+        self.cursor.execute(sql.replace("%s", "?"), args)
+        return self.cursor.rowcount
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        return dict(row) if row is not None else None
+
+    def fetchall(self):
+        return [dict(row) for row in self.cursor.fetchall()]
+
+
+class SqliteConnection:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+
+    def cursor(self):
+        return SqliteCursor(self.connection.cursor())
+
+    @property
+    def in_transaction(self):
+        return self.connection.in_transaction
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    path = str(tmp_path / "task_flow.db")
+    setup = sqlite3.connect(path)
+    setup.executescript("""
+        CREATE TABLE users (
+            user_id VARCHAR(20) PRIMARY KEY,
+            username VARCHAR(50) NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password VARCHAR(512) NOT NULL
+        );
+        CREATE TABLE id_sequence (
+            name VARCHAR(32) PRIMARY KEY,
+            last_value BIGINT NOT NULL DEFAULT 0
+        );
+    """)
+    setup.close()
+    configure_pool("task_flow", lambda: SqliteConnection(path), max_size=16, acquire_timeout=60)
+    yield path
+    close_all_pools()
+
+
+def signup(n):
+    user = User()
+    user.set_user_data(name=f"User{n}", email=f"user{n}@example.com", password="hashed")
+    return UserServies.user_serialization(user)
+
+
+def test_parallel_signups_get_unique_sequential_ids(sqlite_db):
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        user_ids = list(executor.map(signup, range(300)))
+
+    assert len(set(user_ids)) == 300
+    assert sorted(user_ids) == [UserServies.create_ids(i) for i in range(1, 301)]
+
+    check = sqlite3.connect(sqlite_db)
+    assert check.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 300
+    assert check.execute("SELECT last_value FROM id_sequence WHERE name = 'user'").fetchone()[0] == 300
+    check.close()
+
+
+def test_ids_are_not_reused_after_deletion(sqlite_db):
+    first = [signup(n) for n in range(3)]
+    check = sqlite3.connect(sqlite_db)
+    check.execute("DELETE FROM users WHERE user_id = ?", (first[1],))
+    check.commit()
+    check.close()
+
+    assert signup(3) == "u0004"
+
+
+def test_failed_insert_releases_reserved_id(sqlite_db):
+    assert signup(0) == "u0001"
+    with pytest.raises(Exception):
+        signup(0)   # duplicate email rolls back, along with its id
+    assert signup(1) == "u0002"
+
+
+def test_seed_reraises_errors_other_than_a_duplicate_row(tmp_path):
+    connection = SqliteConnection(str(tmp_path / "no_sequence.db"))
+    connection.connection.execute("CREATE TABLE users (user_id VARCHAR(20) PRIMARY KEY)")
+    with connection.cursor() as cursor:
+        with pytest.raises(sqlite3.OperationalError):
+            IdAllocator._seed(cursor, "user")   # no id_sequence table
+
+        cursor.execute("CREATE TABLE id_sequence (name VARCHAR(32) PRIMARY KEY, last_value BIGINT)")
+        cursor.execute("INSERT INTO id_sequence (name, last_value) VALUES ('user', 7)")
+        IdAllocator._seed(cursor, "user")       # seeded elsewhere first: ignored
+    connection.close()
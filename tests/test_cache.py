@@ -0,0 +1,84 @@
+import os
+import sys
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+import backend.cache as cache_module
+from backend.cache import UserDataCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = UserDataCache(max_entries=2, ttl=60)
+    cache.put("u1", "a", 1)
+    cache.put("u1", "b", 2)
+    assert cache.get("u1", "a") == 1          # "b" is now least recently used
+    cache.put("u1", "c", 3)
+
+    assert cache.get("u1", "b") is None
+    assert (cache.get("u1", "a"), cache.get("u1", "c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = UserDataCache(max_entries=10, ttl=60)
+    cache.put("u1", "a", 1)
+
+    now[0] += 60
+    assert cache.get("u1", "a") == 1
+    now[0] += 1
+    assert cache.get("u1", "a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["entries"]) == (1, 0)
+
+
+def test_invalidate_one_user_or_everything():
+    cache = UserDataCache(max_entries=10, ttl=60)
+    for user_id in ("u1", "u2"):
+        cache.put(user_id, "a", 1)
+        cache.put(user_id, "b", 2)
+
+    cache.invalidate("u1")
+    assert cache.get("u1", "a") is None and cache.get("u2", "a") == 1
+
+    cache.invalidate()
+    assert cache.get("u2", "b") is None
+    assert cache.stats()["invalidations"] == 4
+
+
+def test_generation_moves_with_every_invalidation():
+    cache = UserDataCache(max_entries=10, ttl=60)
+    u1, u2 = cache.generation("u1"), cache.generation("u2")
+
+    cache.invalidate("u1")
+    assert cache.generation("u1") != u1 and cache.generation("u2") == u2
+    u1 = cache.generation("u1")
+    cache.invalidate()
+    assert cache.generation("u1") != u1 and cache.generation("u2") != u2
+
+
+def test_dependents_are_invalidated_with_their_source():
+    source = UserDataCache(max_entries=10, ttl=60)
+    derived = UserDataCache(max_entries=10, ttl=60)
+    source.add_dependent(derived)
+    derived.put("u1", "chart", "x")
+    derived.put("u2", "chart", "y")
+
+    source.invalidate("u1")
+    assert derived.get("u1", "chart") is None and derived.get("u2", "chart") == "y"
+    source.invalidate()
+    assert derived.get("u2", "chart") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = UserDataCache(max_entries=10, ttl=60)
+    cache.put("u1", "a", 1)
+    cache.get("u1", "a")
+    cache.get("u1", "a")
+    cache.get("u1", "missing")
+
+    assert cache.stats() == {
+        "hits": 2, "misses": 1, "evictions": 0, "expirations": 0, "invalidations": 0,
+        "entries": 1, "max_entries": 10,
+    }
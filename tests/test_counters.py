@@ -0,0 +1,181 @@
+import os
+import sys
+import pytest
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.counters import CounterServices
+
+
+class FakeConnection:
+    def __init__(self):
+        self._session_state = False
+
+
+class LogCursor:
+    """Records every statement; SELECTs answer with `rows`."""
+
+    def __init__(self, rows=()):
+        self.connection = FakeConnection()
+        self.statements = []
+        self.rows = list(rows)
+        self.rowcount = 0
+
+    def execute(self, sql, args=()):
+        self.statements.append((" ".join(sql.split()), tuple(args or ())))
+        self.rowcount = 1
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+def test_bulk_writes_recomputes_the_touched_plans_once():
+    cursor = LogCursor()
+    with CounterServices.bulk_writes(cursor, ["p0001", "p0001"]) as affected:
+        assert cursor.connection._session_state          # flagged for the pool
+        cursor.execute("INSERT INTO tasks ...")
+        affected.add("p0002")
+
+    sqls = [sql for sql, _ in cursor.statements]
+    assert sqls[0] == "SET @disable_counter_triggers = 1"
+    assert sqls[1] == "INSERT INTO tasks ..."
+    assert sqls[2].startswith("UPDATE daily_plan d LEFT JOIN")
+    assert sqls[3] == "SET @disable_counter_triggers = NULL"
+    assert len(sqls) == 4
+    recompute_args = cursor.statements[2][1]
+    assert sorted(recompute_args[:2]) == ["p0001", "p0002"] and recompute_args[:2] == recompute_args[2:]
+    assert not cursor.connection._session_state
+
+
+def test_bulk_writes_clears_the_variable_when_the_body_fails():
+    cursor = LogCursor()
+    with pytest.raises(RuntimeError):
+        with CounterServices.bulk_writes(cursor, ["p0001"]):
+            cursor.execute("DELETE FROM tasks ...")
+            raise RuntimeError("constraint failed")
+
+    assert [sql for sql, _ in cursor.statements] == [
+        "SET @disable_counter_triggers = 1",
+        "DELETE FROM tasks ...",
+        "SET @disable_counter_triggers = NULL",     # no recompute
+    ]
+    assert not cursor.connection._session_state
+
+
+def test_check_filters_and_reports_drifted_plans():
+    cursor = LogCursor(rows=[{
+        "plan_id": "p0001", "total_task": 3, "completed_task": 1,
+        "expected_total": 2, "expected_completed": 1,
+    }])
+
+    assert CounterServices.check(user_id="u0001", plan_ids=["p0001", "p0002"], cursor=cursor) == [{
+        "plan_id": "p0001", "total_task": 3, "completed_task": 1,
+        "expected_total": 2, "expected_completed": 1,
+    }]
+    sql, args = cursor.statements[0]
+    assert "d.user_id = %s AND d.plan_id IN (%s, %s)" in sql
+    assert args == ("u0001", "p0001", "p0002") * 2
+
+    assert CounterServices.check(plan_ids=[], cursor=cursor) == []
+    assert len(cursor.statements) == 1                  # nothing to check: no query
+
+
+class CounterDb:
+    """In-memory daily_plan counters and task counts behind the reconcile queries."""
+
+    in_transaction = False
+
+    def __init__(self, plans, counts):
+        self.plans = plans      # {plan_id: [total_task, completed_task]}
+        self.counts = counts    # {plan_id: (total, completed)} from tasks
+        self.pages = []         # plan_ids of every page read
+        self.recomputed = []    # plan_ids passed to every recompute
+        self.commits = 0
+        self._session_state = False
+
+    def cursor(self):
+        return CounterDbCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class CounterDbCursor(LogCursor):
+    def __init__(self, db):
+        super().__init__()
+        self.connection = db
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, args=()):
+        sql = " ".join(sql.split())
+        if sql.startswith("SELECT plan_id, total_task, completed_task FROM daily_plan"):
+            last_plan_id, limit = args
+            page = sorted(p for p in self.db.plans if p > last_plan_id)[:limit]
+            self.db.pages.append(page)
+            self.rows = [{"plan_id": p, "total_task": self.db.plans[p][0],
+                          "completed_task": self.db.plans[p][1]} for p in page]
+        elif sql.startswith("SELECT plan_id, COUNT(*)"):
+            self.rows = [{"plan_id": p, "total_task": self.db.counts[p][0],
+                          "completed_task": self.db.counts[p][1]} for p in args if p in self.db.counts]
+        elif sql.startswith("UPDATE daily_plan d"):
+            plan_ids = list(args[:len(args) // 2])
+            self.db.recomputed.append(plan_ids)
+            for p in plan_ids:
+                self.db.plans[p] = list(self.db.counts.get(p, (0, 0)))
+            self.rowcount = len(plan_ids)
+        else:
+            raise AssertionError(f"unexpected query: {sql}")
+
+
+@pytest.fixture
+def counter_db():
+    from backend.database import configure_pool, close_all_pools
+    plans = {f"p{i:04d}": [2, 1] for i in range(1, 8)}
+    counts = {p: (2, 1) for p in plans}
+    counts["p0003"] = (3, 1)             # a task insert the counters missed
+    counts["p0006"] = (2, 2)             # a status change the counters missed
+    del counts["p0007"]                  # its tasks are gone
+    db = CounterDb(plans, counts)
+    configure_pool("task_flow", lambda: db)
+    yield db
+    close_all_pools()
+
+
+def test_reconcile_pages_every_plan_and_fixes_only_drifted_ones(counter_db):
+    batches = []
+    report = CounterServices.reconcile(batch_size=3, on_batch=batches.append)
+
+    assert counter_db.pages == [["p0001", "p0002", "p0003"], ["p0004", "p0005", "p0006"], ["p0007"], []]
+    assert counter_db.recomputed == [["p0003"], ["p0006"], ["p0007"]]
+    assert counter_db.plans["p0003"] == [3, 1]
+    assert counter_db.plans["p0006"] == [2, 2]
+    assert counter_db.plans["p0007"] == [0, 0]
+    assert counter_db.commits == 3
+    assert {k: report[k] for k in ("plans", "batches", "mismatches", "corrected")} == {
+        "plans": 7, "batches": 3, "mismatches": 3, "corrected": 3,
+    }
+    assert [b["plans"] for b in batches] == [3, 6, 7]
+
+    # a second pass finds nothing left to fix
+    assert CounterServices.reconcile(batch_size=3)["mismatches"] == 0
+
+
+def test_reconcile_dry_run_writes_nothing(counter_db):
+    report = CounterServices.reconcile(batch_size=100, dry_run=True)
+
+    assert (report["mismatches"], report["corrected"]) == (3, 0)
+    assert counter_db.recomputed == []
+    with pytest.raises(ValueError):
+        CounterServices.reconcile(batch_size=0)
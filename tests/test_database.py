@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+import threading
+import pytest
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.in_transaction = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError("server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.open = False
+
+
+def test_pool_is_bounded_and_times_out():
+    pool = ConnectionPool(FakeConnection, max_size=2, acquire_timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+
+    stats = pool.stats()
+    assert (stats["in_use"], stats["idle"], stats["created"], stats["timeouts"]) == (2, 0, 2, 1)
+
+
+def test_release_reuses_connection_and_rolls_back_open_transaction():
+    pool = ConnectionPool(FakeConnection, max_size=1)
+    connection = pool.acquire()
+    connection.in_transaction = True
+    pool.release(connection)
+
+    assert connection.rollbacks == 1
+    assert pool.acquire() is connection
+    stats = pool.stats()
+    assert (stats["created"], stats["acquired"], stats["in_use"]) == (1, 2, 1)
+
+
+def test_idle_and_lifetime_expiry_close_connections():
+    pool = ConnectionPool(FakeConnection, max_size=1, idle_timeout=0.02)
+    idle = pool.acquire()
+    pool.release(idle)
+    time.sleep(0.05)
+    assert pool.acquire() is not idle and not idle.open
+
+    pool = ConnectionPool(FakeConnection, max_size=1, max_lifetime=0.02)
+    old = pool.acquire()
+    time.sleep(0.05)
+    pool.release(old)                  # past its lifetime: closed, not pooled
+    assert not old.open and pool.stats()["idle"] == 0
+    assert pool.acquire() is not old
+
+
+def test_dead_connection_is_replaced_after_ping():
+    pool = ConnectionPool(FakeConnection, max_size=1, ping_after=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.alive = False
+    time.sleep(0.01)
+
+    replacement = pool.acquire()
+    assert replacement is not connection and not connection.open
+    assert pool.stats()["closed"] == 1
+
+
+def test_release_wakes_a_waiter():
+    pool = ConnectionPool(FakeConnection, max_size=1, acquire_timeout=5)
+    held = pool.acquire()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not got
+
+    pool.release(held)
+    waiter.join(timeout=5)
+    assert got == [held]
+    stats = pool.stats()
+    assert stats["waits"] == 1 and stats["wait_time_max"] > 0
+    assert stats["wait_time_avg"] == stats["wait_time_total"]
+
+
+def test_closed_pool_closes_idle_and_refuses_checkouts():
+    pool = ConnectionPool(FakeConnection, max_size=2)
+    idle, busy = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+
+    assert not idle.open
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    pool.release(busy)                 # returned after close: closed too
+    assert not busy.open
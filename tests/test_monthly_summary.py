@@ -0,0 +1,111 @@
+import os
+import sys
+import pytest
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.cache import user_data_cache
+from backend.monthly_summary import MonthlySummaryServices
+
+
+def month(year_month, total, completed, active):
+    return {"year_month": year_month, "total_task": total, "completed_task": completed, "active_days": active}
+
+
+def test_get_years_folds_months_into_years(monkeypatch):
+    months = [
+        month("2023-11", 4, 2, 2), month("2023-12", 6, 3, 3),
+        month("2024-01", 5, 5, 1), month("2024-02", 1, 0, 1),
+    ]
+    monkeypatch.setattr(MonthlySummaryServices, "get_months", staticmethod(lambda user_id: months))
+
+    assert MonthlySummaryServices.get_years("u0001") == [
+        {"year": "2023", "total_task": 10, "completed_task": 5, "active_days": 5},
+        {"year": "2024", "total_task": 6, "completed_task": 5, "active_days": 2},
+    ]
+
+
+class SummaryDb:
+    """users and their per-user month counts behind the backfill queries."""
+
+    in_transaction = False
+
+    def __init__(self, months):
+        self.months = months    # {user_id: months rolled up}
+        self.log = []
+        self._session_state = False
+
+    def cursor(self):
+        return SummaryCursor(self)
+
+    def commit(self):
+        self.log.append(("COMMIT", ()))
+
+    def rollback(self):
+        self.log.append(("ROLLBACK", ()))
+
+    def close(self):
+        pass
+
+
+class SummaryCursor:
+    def __init__(self, db):
+        self.db = db
+        self.connection = db
+        self.rows = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, args=()):
+        sql = " ".join(sql.split())
+        self.db.log.append((sql.split(" (")[0].split(" WHERE")[0], tuple(args)))
+        if sql.startswith("SELECT user_id FROM users"):
+            last_user_id, limit = args
+            self.rows = [{"user_id": u} for u in sorted(self.db.months) if u > last_user_id][:limit]
+        elif sql.startswith("INSERT INTO monthly_summary"):
+            self.rowcount = sum(self.db.months[u] for u in args)
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+@pytest.fixture
+def summary_db():
+    from backend.database import configure_pool, close_all_pools
+    db = SummaryDb({f"u{i:04d}": i for i in range(1, 6)})
+    configure_pool("task_flow", lambda: db)
+    user_data_cache.invalidate()
+    yield db
+    user_data_cache.invalidate()
+    close_all_pools()
+
+
+def test_backfill_pages_users_one_transaction_per_batch(summary_db):
+    generation = user_data_cache.generation("u0004")
+    report = MonthlySummaryServices.backfill(batch_size=2)
+
+    pages = [args for sql, args in summary_db.log if sql == "SELECT user_id FROM users"]
+    assert pages == [("", 2), ("u0002", 2), ("u0004", 2), ("u0005", 2)]
+    batches = [args for sql, args in summary_db.log if sql == "DELETE FROM monthly_summary"]
+    assert batches == [("u0001", "u0002"), ("u0003", "u0004"), ("u0005",)]
+    # every batch is rebuilt and committed before the next page is read
+    statements = [sql for sql, _ in summary_db.log if sql != "SELECT user_id FROM users"]
+    assert statements == ["DELETE FROM monthly_summary", "INSERT INTO monthly_summary", "COMMIT"] * 3
+    assert (report["users"], report["months"]) == (5, 15)
+    assert user_data_cache.generation("u0004") > generation
+
+
+def test_backfill_single_user_skips_paging(summary_db):
+    report = MonthlySummaryServices.backfill(user_id="u0003", batch_size=2)
+
+    assert [sql for sql, _ in summary_db.log] == [
+        "DELETE FROM monthly_summary", "INSERT INTO monthly_summary", "COMMIT",
+    ]
+    assert (report["users"], report["months"]) == (1, 3)
+    with pytest.raises(ValueError):
+        MonthlySummaryServices.backfill(batch_size=0)
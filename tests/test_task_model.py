@@ -0,0 +1,353 @@
+import os
+import sys
+import random
+from datetime import date, datetime, timedelta
+import pytest
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+from backend.database import configure_pool, close_all_pools
+from backend.cache import user_data_cache
+import models.task_model as task_model_module
+from models.task_model import UserTasks, ShowTaskView
+
+
+# 🧾 UserTasks against a connection that answers from canned rows
+
+class ScriptedCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, args=()):
+        sql = " ".join(sql.split())
+        args = tuple(args or ())
+        self.db.queries.append((sql, args))
+        if "CURRENT_TIMESTAMP" in sql:
+            self.rows = [{"now": self.db.now}]
+            return
+        self.rows = []
+        for key, rows in self.db.responses.items():
+            if key in sql:
+                self.rows = list(rows(args) if callable(rows) else rows)
+                break
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+class ScriptedDb:
+    """
+    Answers a query with the rows of the first `responses` key found in its
+    SQL (a list, or a callable taking the query args).
+    """
+
+    in_transaction = False
+
+    def __init__(self):
+        self.responses = {}
+        self.queries = []
+        self.now = datetime(2024, 1, 15, 12, 0, 0)
+
+    def cursor(self):
+        return ScriptedCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def scripted_db():
+    db = ScriptedDb()
+    configure_pool("task_flow", lambda: db)
+    user_data_cache.invalidate()
+    yield db
+    user_data_cache.invalidate()
+    close_all_pools()
+
+
+MONTH_TASKS = "dp.plan_date >= %s AND dp.plan_date < %s"
+
+
+def month_rows(rows):
+    """Response for load_month: the rows inside the queried [first, next) range."""
+    def respond(args):
+        _, first_day, next_first = args
+        return [row for row in rows if first_day.isoformat() <= row["plan_date"] < next_first.isoformat()]
+    return respond
+
+
+def with_plans(*dates):
+    user_tasks = UserTasks()
+    for i, plan_date in enumerate(dates, start=1):
+        user_tasks.index_plan(f"p{i:04d}", plan_date)
+    return user_tasks
+
+
+def test_default_month_prefers_current_month_then_latest():
+    assert UserTasks().default_month() is None
+    assert with_plans("2020-03-02", "2021-12-31", "2021-02-01").default_month() == (2021, 12)
+
+    today = date.today()
+    assert with_plans("2020-03-02", today.isoformat(), "2099-01-01").default_month() == (today.year, today.month)
+
+
+def test_load_month_uses_december_to_january_bounds(scripted_db):
+    user_tasks = with_plans("2023-12-31", "2024-01-01")
+    scripted_db.responses[MONTH_TASKS] = month_rows([
+        {"plan_date": "2023-12-31", "title": "Wrap up", "status": "Completed"},
+        {"plan_date": "2024-01-01", "title": "Plan year", "status": "Incomplete"},
+    ])
+
+    assert user_tasks.load_month("u0001", 2023, 12) == {"2023-12-31": {"Wrap up": "Completed"}}
+    month_query = [args for sql, args in scripted_db.queries if MONTH_TASKS in sql]
+    assert month_query == [("u0001", date(2023, 12, 1), date(2024, 1, 1))]
+
+
+def test_load_month_merges_months_and_tracks_loaded_months(scripted_db):
+    user_tasks = with_plans("2024-01-05", "2024-01-09", "2024-02-03")
+    scripted_db.responses[MONTH_TASKS] = month_rows([
+        {"plan_date": "2024-01-05", "title": "A", "status": "Completed"},
+        {"plan_date": "2024-02-03", "title": "B", "status": "Incomplete"},
+    ])
+
+    user_tasks.load_month("u0001", 2024, 2)
+    assert user_tasks.loaded_months == {(2024, 2)}
+    user_tasks.load_month("u0001", 2024, 1)
+
+    assert user_tasks.loaded_months == {(2024, 1), (2024, 2)}
+    assert user_tasks.user_tasks == {
+        "2024-01-05": {"A": "Completed"},
+        "2024-01-09": {},                      # plan without tasks
+        "2024-02-03": {"B": "Incomplete"},
+    }
+    assert user_tasks.synced_at == scripted_db.now
+
+
+def test_failed_month_load_is_not_marked_loaded(scripted_db, capsys):
+    user_tasks = with_plans("2024-01-05")
+    scripted_db.responses[MONTH_TASKS] = lambda args: 1 / 0
+
+    user_tasks.load_month("u0001", 2024, 1)
+    assert user_tasks.loaded_months == set()
+    assert "Error fetching user tasks for 2024-01" in capsys.readouterr().out
+
+
+# 🔄 UserTasks.sync
+
+TOMBSTONES = "FROM deleted_rows"
+CHANGED_TASKS = "t.updated_at >="
+CHANGED_PLANS = "FROM daily_plan WHERE user_id = %s AND (created_at >="
+
+
+def loaded_user(plans, loaded_months=((2024, 1),)):
+    """A UserTasks with `plans` {(plan_id, date): {title: status}} loaded, as after login."""
+    user_tasks = UserTasks()
+    for (plan_id, plan_date), tasks in plans.items():
+        user_tasks.index_plan(plan_id, plan_date)
+        user_tasks.plan_status_store.append(
+            plan_date,
+            completed_task=sum(status == "Completed" for status in tasks.values()),
+            total_task=len(tasks)
+        )
+        user_tasks.user_tasks[plan_date] = dict(tasks)
+    user_tasks.loaded_months = set(loaded_months)
+    user_tasks.refresh_show_user_tasks()
+    user_tasks.synced_at = datetime.now()
+    return user_tasks
+
+
+def test_sync_applies_tombstones_and_merges_changes_in_place(scripted_db):
+    user_tasks = loaded_user({
+        ("p0001", "2024-01-05"): {"A": "Incomplete", "B": "Completed"},
+        ("p0002", "2024-01-06"): {"C": "Incomplete"},
+        ("p0003", "2024-01-07"): {"D": "Incomplete"},
+    })
+    shown = user_tasks.show_user_task["2024-01-05"]
+    scripted_db.responses = {
+        TOMBSTONES: [
+            {"entity": "task", "plan_id": "p0001", "plan_date": "2024-01-05", "title": "B"},
+            {"entity": "plan", "plan_id": "p0002", "plan_date": "2024-01-06", "title": None},
+        ],
+        CHANGED_TASKS: [
+            {"plan_id": "p0001", "plan_date": "2024-01-05", "title": "A", "status": "Completed"},
+            {"plan_id": "p0001", "plan_date": "2024-01-05", "title": "E", "status": "Incomplete"},
+        ],
+        CHANGED_PLANS: [{"plan_id": "p0001", "plan_date": "2024-01-05", "total_task": 2, "completed_task": 1}],
+    }
+
+    assert user_tasks.sync("u0001") == {"plans": 1, "tasks": 2, "deleted": 2}
+
+    assert user_tasks.user_tasks == {
+        "2024-01-05": {"A": "Completed", "E": "Incomplete"},
+        "2024-01-07": {"D": "Incomplete"},
+    }
+    assert shown is user_tasks.user_tasks["2024-01-05"]       # merged in place
+    assert list(user_tasks.show_user_task) == ["2024-01-07", "2024-01-05"]
+    assert user_tasks.plan_ids == {"p0001": "2024-01-05", "p0003": "2024-01-07"}
+    assert "2024-01-06" not in user_tasks.plan_status_store
+    assert user_tasks.plan_status_store.get("2024-01-05")[:2] == (1, 2)
+    assert user_tasks.synced_at == scripted_db.now
+
+    # the changed-plans query also re-reads plans whose tasks changed
+    plans_query = [args for sql, args in scripted_db.queries if CHANGED_PLANS in sql]
+    assert plans_query[0][2:] == ("p0001",)
+
+
+def test_sync_plan_deleted_and_recreated_on_the_same_date(scripted_db):
+    user_tasks = loaded_user({
+        ("p0001", "2024-01-05"): {"Old": "Completed"},
+        ("p0003", "2024-01-07"): {},
+    })
+    scripted_db.responses = {
+        TOMBSTONES: [{"entity": "plan", "plan_id": "p0001", "plan_date": "2024-01-05", "title": None}],
+        CHANGED_TASKS: [{"plan_id": "p0009", "plan_date": "2024-01-05", "title": "New", "status": "Incomplete"}],
+        CHANGED_PLANS: [{"plan_id": "p0009", "plan_date": "2024-01-05", "total_task": 1, "completed_task": 0}],
+    }
+
+    user_tasks.sync("u0001")
+
+    assert user_tasks.plan_ids == {"p0009": "2024-01-05", "p0003": "2024-01-07"}
+    assert user_tasks.plan_id_for_date("2024-01-05") == "p0009"
+    assert user_tasks.user_tasks["2024-01-05"] == {"New": "Incomplete"}
+    assert user_tasks.show_user_task["2024-01-05"] == {"New": "Incomplete"}
+    assert user_tasks.plan_status_store.get("2024-01-05")[:2] == (0, 1)
+
+
+def test_sync_keeps_unloaded_months_as_counters_only(scripted_db):
+    user_tasks = loaded_user({("p0001", "2024-01-05"): {"A": "Incomplete"}})
+    scripted_db.responses = {
+        TOMBSTONES: [],
+        CHANGED_TASKS: [{"plan_id": "p0002", "plan_date": "2023-06-01", "title": "Old", "status": "Completed"}],
+        CHANGED_PLANS: [{"plan_id": "p0002", "plan_date": "2023-06-01", "total_task": 1, "completed_task": 1}],
+    }
+
+    assert user_tasks.sync("u0001") == {"plans": 1, "tasks": 1, "deleted": 0}
+
+    assert user_tasks.plan_ids["p0002"] == "2023-06-01"
+    assert user_tasks.plan_status_store.get("2023-06-01")[:2] == (1, 1)
+    assert "2023-06-01" not in user_tasks.user_tasks          # its month's tasks load on demand
+    assert user_tasks.loaded_months == {(2024, 1)}
+    assert not any(MONTH_TASKS in sql for sql, _ in scripted_db.queries)
+
+
+def test_sync_ignores_tombstones_of_unknown_plans(scripted_db):
+    user_tasks = loaded_user({("p0001", "2024-01-05"): {"A": "Incomplete"}})
+    scripted_db.responses = {
+        TOMBSTONES: [
+            {"entity": "plan", "plan_id": "p0042", "plan_date": "2024-01-09", "title": None},
+            {"entity": "task", "plan_id": "p0042", "plan_date": "2024-01-09", "title": "A"},
+        ],
+    }
+
+    user_tasks.sync("u0001")
+    assert user_tasks.user_tasks == {"2024-01-05": {"A": "Incomplete"}}
+    assert user_tasks.plan_ids == {"p0001": "2024-01-05"}
+
+
+# 🗄️ Shared reads through user_data_cache
+
+PLANS = "FROM daily_plan WHERE user_id = %s ORDER BY plan_date ASC"
+
+
+def test_read_racing_a_write_is_not_served_after_it(scripted_db):
+    plan_rows = [{"plan_id": "p0001", "plan_date": "2024-01-05", "total_task": 0, "completed_task": 0}]
+
+    def read_then_concurrent_write(args):
+        rows = list(plan_rows)
+        # another session commits add_plan and invalidates while this read is in flight
+        plan_rows.append({"plan_id": "p0002", "plan_date": "2024-01-06", "total_task": 0, "completed_task": 0})
+        user_data_cache.invalidate("u0001")
+        return rows
+
+    scripted_db.responses[PLANS] = read_then_concurrent_write
+    first = UserTasks()
+    first.set_user_plan("u0001")
+    assert first.plan_ids == {"p0001": "2024-01-05"}
+
+    scripted_db.responses[PLANS] = lambda args: list(plan_rows)
+    second = UserTasks()
+    second.set_user_plan("u0001")              # the stale snapshot is not served
+    assert second.plan_ids == {"p0001": "2024-01-05", "p0002": "2024-01-06"}
+
+    queries = len(scripted_db.queries)
+    UserTasks().set_user_plan("u0001")        # nothing written since: a cache hit
+    assert len(scripted_db.queries) == queries
+
+
+# 📅 ShowTaskView order: today → future (ascending) → past (descending)
+
+def custom_sort(d, today):
+    """The per-render sort key ShowTaskView replaced."""
+    if d == today:
+        return (0, 0)
+    elif d > today:
+        return (1, (d - today).days)
+    else:
+        return (2, -(d - today).days)
+
+
+def set_today(monkeypatch, today):
+    class FixedDate(date):
+        @classmethod
+        def today(cls):
+            return today
+    monkeypatch.setattr(task_model_module, "date", FixedDate)
+
+
+def test_show_task_view_matches_the_sort_it_replaced(monkeypatch):
+    rng = random.Random(11)
+    for _ in range(200):
+        today = date(2024, 1, 1) + timedelta(days=rng.randint(0, 365))
+        set_today(monkeypatch, today)
+        days = {today + timedelta(days=rng.randint(-40, 40)) for _ in range(rng.randint(0, 25))}
+        tasks = {d.isoformat(): {} for d in days}
+
+        expected = [d.isoformat() for d in sorted(days, key=lambda d: custom_sort(d, today))]
+        assert list(ShowTaskView(tasks)) == expected
+        assert list(ShowTaskView.from_sorted(sorted(tasks), tasks.values())) == expected
+
+
+def test_show_task_view_insert_and_delete_keep_the_order(monkeypatch):
+    set_today(monkeypatch, date(2024, 1, 10))
+    view = ShowTaskView({"2024-01-08": {}, "2024-01-12": {}})
+
+    view["2024-01-10"] = {"A": "Incomplete"}
+    view["2024-01-11"] = {}
+    view["2024-01-02"] = {}
+    view["2024-01-12"] = {"B": "Completed"}       # replace: no duplicate date
+    assert list(view) == ["2024-01-10", "2024-01-11", "2024-01-12", "2024-01-08", "2024-01-02"]
+    assert len(view) == 5 and view["2024-01-12"] == {"B": "Completed"}
+
+    del view["2024-01-10"]
+    del view["2024-01-02"]
+    assert list(view) == ["2024-01-11", "2024-01-12", "2024-01-08"]
+    assert "2024-01-10" not in view
+    with pytest.raises(KeyError):
+        del view["2024-01-10"]
+
+
+def test_show_task_view_follows_a_change_of_day(monkeypatch):
+    view = ShowTaskView({d: {} for d in ("2024-01-09", "2024-01-10", "2024-01-11")})
+
+    set_today(monkeypatch, date(2024, 1, 10))
+    assert list(view) == ["2024-01-10", "2024-01-11", "2024-01-09"]
+    set_today(monkeypatch, date(2024, 1, 11))     # midnight passes, nothing re-sorted
+    assert list(view) == ["2024-01-11", "2024-01-10", "2024-01-09"]
+    set_today(monkeypatch, date(2024, 1, 15))     # today has no plan
+    assert list(view) == ["2024-01-11", "2024-01-10", "2024-01-09"]
@@ -0,0 +1,393 @@
+import os
+import sys
+import pymysql
+import pytest
+from datetime import datetime, timedelta
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
+
+import backend.tasks as tasks_module
+from backend.database import (SqlConnection, ConnectionPool, configure_pool, close_all_pools,
+                              mark_session_state)
+from backend.migrate import Migrations
+from backend.cache import user_data_cache
+from backend.tasks import TaskSerives, TaskWriteQueue
+from models.task_model import UserTasks
+
+
+def test_split_statements_honours_delimiter():
+    sql = """
+        -- header comment
+        DROP TRIGGER IF EXISTS trg_a;
+        CREATE INDEX idx_a ON tasks (plan_id);
+
+        DELIMITER $$
+        CREATE TRIGGER trg_a
+        AFTER INSERT ON tasks
+        FOR EACH ROW
+        BEGIN
+            UPDATE daily_plan SET total_task = total_task + 1 WHERE plan_id = NEW.plan_id;
+        END$$
+        DELIMITER ;
+
+        SELECT 1;
+    """
+    statements = Migrations.split_statements(sql)
+
+    assert len(statements) == 4
+    assert statements[0] == "DROP TRIGGER IF EXISTS trg_a"
+    assert statements[2].startswith("CREATE TRIGGER trg_a")
+    assert statements[2].endswith("END")
+    assert "total_task + 1 WHERE plan_id = NEW.plan_id;" in statements[2]
+    assert statements[3] == "SELECT 1"
+
+
+def test_shipped_migrations_are_ordered_and_parse():
+    migrations = Migrations.discover()
+
+    versions = [m["version"] for m in migrations]
+    assert versions == sorted(versions) == list(range(1, len(versions) + 1))
+    for migration in migrations:
+        with open(migration["path"], encoding="utf-8") as f:
+            assert Migrations.split_statements(f.read())
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;")
+    (tmp_path / "0001_b.sql").write_text("SELECT 2;")
+    with pytest.raises(ValueError):
+        Migrations.discover(str(tmp_path))
+
+
+def test_pending_skips_applied_and_rejects_edited_scripts(tmp_path):
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;")
+    (tmp_path / "0002_b.sql").write_text("SELECT 2;")
+    (tmp_path / "0003_c.sql").write_text("SELECT 3;")
+    migrations = Migrations.discover(str(tmp_path))
+    applied = {1: migrations[0]["checksum"]}
+
+    assert [m["version"] for m in Migrations.pending(applied, migrations)] == [2, 3]
+    assert [m["version"] for m in Migrations.pending(applied, migrations, target=2)] == [2]
+    with pytest.raises(RuntimeError):
+        Migrations.pending({1: "0" * 64}, migrations)
+
+
+def test_sync_past_tombstone_retention_reloads(monkeypatch):
+    user_tasks = UserTasks()
+    user_tasks.index_plan("p0001", "2024-01-01")
+    user_tasks.user_tasks["2024-01-01"] = {"Old task": "Completed"}
+    user_tasks.loaded_months.add((2024, 1))
+    user_tasks.synced_at = datetime.now() - timedelta(days=30)
+    loads = []
+
+    def fake_load(user_id):
+        loads.append((user_id, dict(user_tasks.plan_ids), dict(user_tasks.user_tasks)))
+        user_tasks.index_plan("p0002", "2024-02-01")
+
+    monkeypatch.setattr(user_tasks, "set_show_user_tasks", fake_load)
+
+    assert user_tasks.sync("u0001") == {"plans": 1, "tasks": 0, "deleted": 0}
+    assert loads == [("u0001", {}, {})]
+    assert user_tasks.plan_ids == {"p0002": "2024-02-01"}
+
+
+# 🧾 TaskWriteQueue against a connection that records its statements
+
+class RecordingCursor:
+    def __init__(self, db):
+        self.db = db
+        self.connection = db
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, args=()):
+        sql = " ".join(sql.split())
+        self.db.log.append(sql)
+        if self.db.fail and sql.startswith(self.db.fail_on):
+            raise RuntimeError("database unavailable")
+        self.db.pending.append((sql, tuple(args or ())))
+        if sql.startswith("UPDATE id_sequence"):
+            self.db.last_id += args[0]
+        self.rowcount = 1
+
+    def executemany(self, sql, rows):
+        for args in rows:
+            self.execute(sql, args)
+
+    def fetchone(self):
+        return {"last_value": self.db.last_id}
+
+
+class RecordingDb:
+    """Statements become `committed` on commit and are dropped on rollback."""
+
+    def __init__(self):
+        self.committed = []
+        self.pending = []
+        self.last_id = 0
+        self.fail = False
+        self.fail_on = ("UPDATE tasks", "DELETE FROM tasks")
+        self.log = []           # every statement, COMMIT and ROLLBACK
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    in_transaction = False
+
+    def commit(self):
+        self.log.append("COMMIT")
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+        self.pending = []
+
+    def close(self):
+        pass
+
+    def task_writes(self):
+        return [(sql.split(" WHERE")[0], args) for sql, args in self.committed
+                if sql.startswith(("UPDATE tasks", "DELETE FROM tasks", "INSERT INTO tasks"))]
+
+
+@pytest.fixture
+def queue_db(monkeypatch):
+    db = RecordingDb()
+    configure_pool("task_flow", lambda: db)
+    queue = TaskWriteQueue(window=3600)   # flushed by the tests only
+    monkeypatch.setattr(tasks_module, "task_write_queue", queue)
+    yield db, queue
+    close_all_pools()
+
+
+def user_tasks_with(tasks):
+    user_tasks = UserTasks()
+    user_tasks.index_plan("p0001", "2024-01-01")
+    user_tasks.user_tasks["2024-01-01"] = dict(tasks)
+    user_tasks.plan_status_store.append(
+        "2024-01-01",
+        completed_task=sum(status == "Completed" for status in tasks.values()),
+        total_task=len(tasks)
+    )
+    return user_tasks
+
+
+def test_queue_coalesces_changes_per_task(queue_db):
+    db, queue = queue_db
+    user_tasks = user_tasks_with({"A": "Incomplete", "B": "Incomplete", "C": "Completed"})
+
+    queue.toggle("u0001", user_tasks, "2024-01-01", "A")
+    queue.toggle("u0001", user_tasks, "2024-01-01", "A")   # back to stored: cancelled
+    queue.toggle("u0001", user_tasks, "2024-01-01", "B")
+    queue.toggle("u0001", user_tasks, "2024-01-01", "C")
+    queue.remove("u0001", user_tasks, "2024-01-01", "C")   # delete supersedes the toggle
+    assert queue.pending() == 2
+    assert user_tasks.plan_status_store.get("2024-01-01")[:2] == (1, 2)
+
+    generation = user_data_cache.generation("u0001")
+    assert queue.flush() == 2
+    assert user_data_cache.generation("u0001") != generation   # cached charts rebuilt
+    assert db.task_writes() == [
+        ("UPDATE tasks SET status = %s, incomplete_reason = %s", ("Completed", None, "p0001", "B")),
+        ("DELETE FROM tasks", ("p0001", "C")),
+    ]
+    assert queue.flush() == 0
+
+
+def test_failed_flush_requeues_without_overwriting_newer_changes(queue_db):
+    db, queue = queue_db
+    user_tasks = user_tasks_with({"A": "Incomplete", "B": "Incomplete"})
+    queue.toggle("u0001", user_tasks, "2024-01-01", "A")
+    queue.toggle("u0001", user_tasks, "2024-01-01", "B")
+
+    db.fail = True
+    with pytest.raises(RuntimeError):
+        queue.flush()
+    queue._timer.cancel()
+    assert queue.pending() == 2 and db.task_writes() == []
+
+    queue.remove("u0001", user_tasks, "2024-01-01", "B")   # newer than the failed batch
+    db.fail = False
+    assert queue.flush() == 2
+    assert db.task_writes() == [
+        ("UPDATE tasks SET status = %s, incomplete_reason = %s", ("Completed", None, "p0001", "A")),
+        ("DELETE FROM tasks", ("p0001", "B")),
+    ]
+
+
+def test_readding_a_removed_task_takes_over_its_queued_delete(queue_db):
+    db, queue = queue_db
+    user_tasks = user_tasks_with({"A": "Completed", "B": "Incomplete"})
+
+    TaskSerives.remove_task("u0001", user_tasks, "2024-01-01", "A")
+    assert TaskSerives.add_tasks("u0001", user_tasks, "2024-01-01", ["A"]) == ["t0001"]
+
+    # the old row goes in the same transaction as, and before, the new one
+    assert db.task_writes() == [
+        ("DELETE FROM tasks", ("p0001", "A")),
+        ("INSERT INTO tasks (task_id, plan_id, title, status, incomplete_reason) VALUES (%s, %s, %s, %s, %s)",
+         ("t0001", "p0001", "A", "Incomplete", "")),
+    ]
+    assert queue.pending() == 0
+    assert queue.flush() == 0
+    assert user_tasks.user_tasks["2024-01-01"] == {"B": "Incomplete", "A": "Incomplete"}
+
+
+def test_failed_readd_keeps_the_queued_delete(queue_db):
+    db, queue = queue_db
+    user_tasks = user_tasks_with({"A": "Incomplete"})
+    TaskSerives.remove_task("u0001", user_tasks, "2024-01-01", "A")
+
+    db.fail = True
+    with pytest.raises(RuntimeError):
+        TaskSerives.add_tasks("u0001", user_tasks, "2024-01-01", ["A"])
+    queue._timer.cancel()
+    assert queue.pending() == 1 and db.task_writes() == []
+
+    db.fail = False
+    assert queue.flush() == 1
+    assert db.task_writes() == [("DELETE FROM tasks", ("p0001", "A"))]
+
+
+def test_failed_bulk_insert_clears_the_trigger_switch_and_rolls_back(queue_db):
+    db, queue = queue_db
+    user_tasks = user_tasks_with({"A": "Incomplete"})
+    db.fail, db.fail_on = True, ("INSERT INTO tasks",)
+
+    with pytest.raises(RuntimeError):
+        TaskSerives.add_tasks("u0001", user_tasks, "2024-01-01", ["B"])
+
+    assert db.log[-3].startswith("INSERT INTO tasks")
+    assert db.log[-2:] == ["SET @disable_counter_triggers = NULL", "ROLLBACK"]
+    assert "COMMIT" not in db.log and db.committed == []
+    assert user_tasks.user_tasks["2024-01-01"] == {"A": "Incomplete"}
+
+
+def test_pool_resets_session_state_or_discards_the_connection():
+    resets = []
+
+    class Connection:
+        open = True
+        in_transaction = False
+        fail_reset = False
+
+        def close(self):
+            self.open = False
+
+    def reset(connection):
+        resets.append(connection)
+        if connection.fail_reset:
+            raise RuntimeError("lost connection")
+
+    pool = ConnectionPool(Connection, max_size=1, reset=reset)
+    first = pool.acquire()
+    pool.release(first)                # nothing flagged: no reset
+    assert pool.acquire() is first and resets == []
+
+    mark_session_state(first)
+    pool.release(first)
+    assert resets == [first] and pool.acquire() is first
+
+    mark_session_state(first)
+    first.fail_reset = True
+    pool.release(first)                # reset failed: closed, not reused
+    assert not first.open
+    second = pool.acquire()
+    assert second is not first
+    pool.release(second)
+    assert resets == [first, first]
+
+
+# 🔍 EXPLAIN checks of the hot queries (need the task_flow MySQL database)
+
+EXPLAIN_USER = "explain_u"
+EXPLAIN_PLAN = "explain_p"
+
+
+@pytest.fixture
+def mysql_cursor():
+    try:
+        SqlConnection().open_connection().close()
+    except pymysql.Error:
+        pytest.skip("task_flow MySQL database not available")
+
+    connect = SqlConnection()
+    connect.connect()
+    try:
+        with connect.connection.cursor() as cursor:
+            # the tests only read the schema; migrating is left to the operator
+            cursor.execute(
+                "SELECT COUNT(*) AS n FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME = 'idx_tasks_plan_created'"
+            )
+            if not cursor.fetchone()["n"]:
+                pytest.skip("task_flow is not migrated (python -m backend.migrate)")
+
+            # sample rows, rolled back afterwards
+            cursor.execute(
+                "INSERT INTO users (user_id, username, email, password) VALUES (%s, %s, %s, %s)",
+                (EXPLAIN_USER, "Explain", "explain@example.com", "x")
+            )
+            cursor.execute(
+                "INSERT INTO daily_plan (plan_id, user_id, plan_date) VALUES (%s, %s, %s)",
+                (EXPLAIN_PLAN, EXPLAIN_USER, "2024-01-15")
+            )
+            cursor.executemany(
+                "INSERT INTO tasks (task_id, plan_id, title, status, incomplete_reason) VALUES (%s, %s, %s, %s, %s)",
+                [(f"explain_t{i}", EXPLAIN_PLAN, f"Task {i}", "Incomplete", "") for i in range(20)]
+            )
+            yield cursor
+    finally:
+        connect.connection.rollback()
+        connect.disconnect()
+        close_all_pools()
+
+
+def explain(cursor, sql, args):
+    cursor.execute("EXPLAIN " + sql, args)
+    return {row["table"]: row for row in cursor.fetchall()}
+
+
+def test_user_task_load_uses_covering_index(mysql_cursor):
+    plan = explain(mysql_cursor, """
+        SELECT dp.plan_id, dp.plan_date, dp.total_task, dp.completed_task,
+               t.title, t.status
+        FROM daily_plan dp
+        LEFT JOIN tasks t ON t.plan_id = dp.plan_id
+        WHERE dp.user_id = %s
+        ORDER BY dp.plan_date ASC, t.created_at ASC
+    """, (EXPLAIN_USER,))
+
+    assert plan["dp"]["key"] == "user_id"
+    assert plan["t"]["key"] == "idx_tasks_plan_created"
+    assert "Using index" in (plan["t"]["Extra"] or "")
+
+
+def test_month_load_uses_covering_index(mysql_cursor):
+    plan = explain(mysql_cursor, """
+        SELECT dp.plan_date, t.title, t.status
+        FROM tasks t
+        JOIN daily_plan dp ON t.plan_id = dp.plan_id
+        WHERE dp.user_id = %s AND dp.plan_date >= %s AND dp.plan_date < %s
+        ORDER BY dp.plan_date ASC, t.created_at ASC
+    """, (EXPLAIN_USER, "2024-01-01", "2024-02-01"))
+
+    assert plan["dp"]["key"] == "user_id"
+    assert plan["t"]["key"] == "idx_tasks_plan_created"
+    assert "Using index" in (plan["t"]["Extra"] or "")
+
+
+def test_login_lookup_uses_email_index(mysql_cursor):
+    plan = explain(
+        mysql_cursor,
+        "SELECT user_id, username, email, password, theme FROM users WHERE email = %s",
+        ("explain@example.com",)
+    )
+
+    assert plan["users"]["key"] == "email"